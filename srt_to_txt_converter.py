@@ -1,18 +1,2357 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+# 没有图形环境的服务器上可以不安装tkinter，此时只能使用转换引擎
+try:
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox
+    HAS_TK = True
+except ImportError:
+    HAS_TK = False
+import argparse
+import codecs
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import multiprocessing
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import compress, islice
+from array import array
+from collections import OrderedDict, deque, namedtuple
 import os
 import re
 import subprocess
 import platform
+import queue
+import sqlite3
 from pathlib import Path
 import urllib.parse
 
-# 尝试导入tkinterdnd2用于文件拖拽功能
-try:
-    from tkinterdnd2 import DND_FILES, TkinterDnD
-    HAS_DND = True
-except ImportError:
-    HAS_DND = False
+# 正则表达式解析器（用于提取搜索条件中的字面文本）
+try:
+    import re._parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# 尝试导入tkinterdnd2用于文件拖拽功能
+try:
+    from tkinterdnd2 import DND_FILES, TkinterDnD
+    HAS_DND = True
+except ImportError:
+    HAS_DND = False
+
+# 程序数据目录（增量转换清单等）
+APP_DATA_DIR = os.path.join(os.path.expanduser('~'), '.srt_to_txt_converter')
+
+# 默认的增量转换清单文件
+DEFAULT_MANIFEST_PATH = os.path.join(APP_DATA_DIR, 'manifest.json')
+
+# 字幕内容全文索引
+CONTENT_INDEX_PATH = os.path.join(APP_DATA_DIR, 'content_index.db')
+
+# 编码探测时读取的样本大小（字节）
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# 按优先级排列的BOM及其对应编码
+_ENCODING_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# 样本探测成功但后面的内容无法解码时，依次换用的候选编码
+_FALLBACK_ENCODINGS = ('utf-8', 'gbk')
+
+# 编码探测结果缓存：{(文件路径, 修改时间, 文件大小): 编码}
+_encoding_cache = {}
+
+
+# 单条字幕：序号、开始/结束时间（毫秒，无法解析时为-1）和字幕文本
+Cue = namedtuple('Cue', ['index', 'start_ms', 'end_ms', 'text'])
+
+# SRT时间戳行，例如：00:01:02,345 --> 00:01:04,000
+_TIMESTAMP_RE = re.compile(
+    r'(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})'
+)
+
+
+def _parse_cue_block(block):
+    """把一个字幕块（已去掉换行符的行列表）解析为Cue，没有字幕文本时返回None"""
+    if len(block) < 3:
+        return None
+
+    # 跳过序号和时间戳，提取字幕文本
+    text = '\n'.join(block[2:]).strip()
+    if not text:
+        return None
+
+    index_line = block[0].strip().lstrip('\ufeff')
+    index = int(index_line) if index_line.isdigit() else -1
+
+    match = _TIMESTAMP_RE.search(block[1])
+    if match:
+        h1, m1, s1, ms1, h2, m2, s2, ms2 = match.groups()
+        start_ms = ((int(h1) * 60 + int(m1)) * 60 + int(s1)) * 1000 + int(ms1.ljust(3, '0'))
+        end_ms = ((int(h2) * 60 + int(m2)) * 60 + int(s2)) * 1000 + int(ms2.ljust(3, '0'))
+    else:
+        start_ms = end_ms = -1
+
+    return Cue(index, start_ms, end_ms, text)
+
+
+def iter_srt_cues(lines):
+    """从行迭代器中逐条产出Cue（流式解析，内存占用与文件大小无关）
+
+    字幕块以空行（或只含空白字符的行）分隔，每个块的前两行为序号和时间戳，
+    其余行为字幕文本。与原先按整个文件切分的解析规则保持一致。
+    """
+    block = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if line.strip():
+            block.append(line)
+            continue
+        # 遇到空行，结束当前字幕块
+        cue = _parse_cue_block(block)
+        if cue is not None:
+            yield cue
+        block = []
+
+    # 处理文件末尾没有空行结尾的最后一个字幕块
+    cue = _parse_cue_block(block)
+    if cue is not None:
+        yield cue
+
+
+class CueTable:
+    """按列存储的字幕表
+
+    序号和起止时间存放在 array('q') 中，每条字幕只额外占用24字节；字幕文本单独一列。
+    适合在内存中保存合并语料的数百万条字幕。
+    replaced为True表示源文件有无法解码的字节，已用替换字符（U+FFFD）代替。
+    """
+
+    __slots__ = ('indexes', 'starts', 'ends', 'texts', 'replaced')
+
+    def __init__(self, cues=()):
+        self.indexes = array('q')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.texts = []
+        self.replaced = False
+        for cue in cues:
+            self.append(cue)
+
+    @classmethod
+    def from_file(cls, file_path):
+        """一次遍历SRT文件构建字幕表
+
+        按探测到的编码严格解码。样本全是ASCII（无法据此判断编码），而后面出现不符合该编码的字节时
+        （例如开头全是英文的GBK文件），换用下一个候选编码从头重新解析。样本本身能确定编码、
+        或所有候选编码都失败时，按探测到的编码用替换字符代替无法解码的字节，并标记replaced。
+        """
+        encoding = None
+        remaining = list(_FALLBACK_ENCODINGS)
+        while True:
+            try:
+                table = cls(iter_srt_file(file_path, encoding))
+            except UnicodeDecodeError:
+                if encoding is None:
+                    encoding = detected_encoding(file_path)
+                    if encoding not in remaining or not _sample_is_ascii(file_path):
+                        # 由BOM或样本中的非ASCII字符确定的编码不再换用其他编码
+                        break
+                remaining.remove(encoding)
+                if not remaining:
+                    break
+                encoding = remaining[0]
+                continue
+            if encoding is not None:
+                # 记住可用的编码，文件未变化时下次直接使用
+                remember_encoding(file_path, encoding)
+            return table
+
+        table = cls(iter_srt_file(file_path, errors='replace'))
+        table.replaced = True
+        return table
+
+    def append(self, cue):
+        """追加一条字幕"""
+        index, start_ms, end_ms, text = cue
+        self.indexes.append(index)
+        self.starts.append(start_ms)
+        self.ends.append(end_ms)
+        self.texts.append(text)
+
+    def extend(self, other):
+        """追加另一张字幕表的全部内容"""
+        self.indexes.extend(other.indexes)
+        self.starts.extend(other.starts)
+        self.ends.extend(other.ends)
+        self.texts.extend(other.texts)
+        self.replaced = self.replaced or other.replaced
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, i):
+        return Cue(self.indexes[i], self.starts[i], self.ends[i], self.texts[i])
+
+    def __iter__(self):
+        return map(Cue, self.indexes, self.starts, self.ends, self.texts)
+
+    def to_txt(self, separator='，'):
+        """生成TXT输出内容：字幕文本之间及末尾都加分隔符"""
+        return separator.join(self.texts) + separator
+
+    def memory_size(self):
+        """估算占用的内存字节数"""
+        return (sys.getsizeof(self.texts) + sum(map(sys.getsizeof, self.texts))
+                + self.indexes.itemsize * len(self.indexes) * 3)
+
+
+def detect_encoding(sample, is_complete=False):
+    """根据文件开头的字节样本探测编码：先检查BOM，再依次试探UTF-8、GBK，最后回退到Latin-1
+
+    参数：
+    - sample: 文件开头的原始字节
+    - is_complete: 样本是否已经包含整个文件（决定末尾不完整的多字节字符是否算错误）
+    """
+    for bom, encoding in _ENCODING_BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    for encoding in ('utf-8', 'gbk'):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=is_complete)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+
+    return 'latin-1'
+
+
+def _encoding_cache_key(file_path, stat):
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _sample_is_ascii(file_path):
+    """编码探测样本是否全是ASCII字符"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(ENCODING_SAMPLE_SIZE)
+    try:
+        sample.decode('ascii')
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def detected_encoding(file_path):
+    """返回缓存的编码探测结果（文件未打开过或已变化时为None）"""
+    return _encoding_cache.get(_encoding_cache_key(file_path, os.stat(file_path)))
+
+
+def remember_encoding(file_path, encoding):
+    """记录文件实际可用的编码（覆盖探测结果）"""
+    _encoding_cache[_encoding_cache_key(file_path, os.stat(file_path))] = encoding
+
+
+def open_srt_file(file_path, encoding=None, errors='strict'):
+    """以探测到的编码（或指定的encoding）打开SRT文件并返回文本流，整个文件只读取和解码一次
+
+    探测结果按 (路径, 修改时间, 文件大小) 缓存，文件未变化时再次打开会直接跳过探测。
+    默认严格解码：样本之后出现不符合该编码的字节时，读取过程中抛出UnicodeDecodeError，由调用方换用其他编码。
+    """
+    raw = open(file_path, 'rb', buffering=ENCODING_SAMPLE_SIZE)
+    try:
+        if encoding is None:
+            stat = os.fstat(raw.fileno())
+            cache_key = _encoding_cache_key(file_path, stat)
+            encoding = _encoding_cache.get(cache_key)
+            if encoding is None:
+                # peek只填充缓冲区而不移动读取位置，后续解码直接复用这部分字节
+                sample = raw.peek(ENCODING_SAMPLE_SIZE)[:ENCODING_SAMPLE_SIZE]
+                encoding = detect_encoding(sample, is_complete=len(sample) >= stat.st_size)
+                _encoding_cache[cache_key] = encoding
+        return io.TextIOWrapper(raw, encoding=encoding, errors=errors)
+    except Exception:
+        raw.close()
+        raise
+
+
+def iter_srt_file(file_path, encoding=None, errors='strict'):
+    """流式读取SRT文件并逐条产出Cue，encoding和errors的含义见open_srt_file"""
+    with open_srt_file(file_path, encoding, errors) as f:
+        for cue in iter_srt_cues(f):
+            yield cue
+
+
+class ParseCache:
+    """SRT解析结果的LRU缓存
+
+    以文件的绝对路径为键，并记录解析时的 (修改时间, 文件大小)，文件在磁盘上变化后自动重新解析。
+    按估算的内存占用淘汰最久未使用的条目；超过上限一半的单个文件不缓存。
+    返回的CueTable由多处共享，调用方不应修改。可在多个线程中使用。
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # {绝对路径: (修改时间, 文件大小, CueTable, 估算字节数)}
+        self._lock = threading.Lock()
+
+    def get(self, file_path):
+        """返回文件的解析结果，缓存未命中时解析文件"""
+        key = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # 解析放在锁外，避免大文件解析时阻塞其他线程
+        cues = CueTable.from_file(file_path)
+        size = cues.memory_size()
+
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self.current_bytes -= old_entry[3]
+            if size <= self.max_bytes // 2:
+                self._entries[key] = (stat.st_mtime_ns, stat.st_size, cues, size)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.current_bytes -= evicted[3]
+        return cues
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """缓存统计信息"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# 解析缓存的内存上限（字节）
+PARSE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+# 预览、单文件转换和批量转换共用的解析缓存（每个进程一份）
+parse_cache = ParseCache(PARSE_CACHE_MAX_BYTES)
+
+
+def load_cue_table(file_path):
+    """解析SRT文件，文件未变化时直接使用缓存的结果"""
+    return parse_cache.get(file_path)
+
+
+def sanitize_filename(filename):
+    """清理文件名中的无效字符"""
+    # Windows系统中文件名不能包含的字符
+    invalid_chars = '<>:"/\\|?*'
+    for char in invalid_chars:
+        filename = filename.replace(char, '_')
+    return filename
+
+
+# 输出模式
+MODE_SEPARATE = 'separate'                # 每个SRT对应一个TXT
+MODE_MERGE = 'merge'                      # 所有文件合并为一个TXT
+MODE_MERGE_BY_FOLDER = 'merge_by_folder'  # 每个文件夹生成一个summary.txt
+MODE_EXPORT = 'export'                    # 每条字幕导出一条记录（JSONL / SQLite）
+
+# 输出文件已存在时的处理策略
+OVERWRITE_ASK = 'ask'          # 通过confirm_overwrite回调询问
+OVERWRITE_ALWAYS = 'overwrite'  # 总是覆盖
+OVERWRITE_NEVER = 'skip'       # 总是跳过
+OVERWRITE_RENAME = 'rename'    # 改用不冲突的文件名
+
+# 输出文件刷盘（fsync）策略
+FSYNC_NONE = 'none'                  # 不主动刷盘，由操作系统决定
+FSYNC_PER_FILE = 'per-file'          # 每个输出文件写完立即刷盘
+FSYNC_END_OF_BATCH = 'end-of-batch'  # 整批转换结束后统一刷盘
+
+# 合并输出的压缩格式
+COMPRESS_GZIP = 'gzip'
+COMPRESS_XZ = 'xz'
+
+# 合成输出压缩选项在界面上的名称（按显示顺序）
+MERGE_COMPRESS_LABELS = [
+    ("不压缩", None),
+    ("gzip (.gz)", COMPRESS_GZIP),
+    ("xz (.xz)", COMPRESS_XZ),
+]
+
+# 冲突处理策略在界面上的名称
+OVERWRITE_LABELS = {
+    OVERWRITE_ALWAYS: "覆盖",
+    OVERWRITE_NEVER: "跳过",
+    OVERWRITE_RENAME: "重命名",
+}
+
+
+def find_existing_outputs(output_files):
+    """批量检查输出文件是否已存在，返回已存在的路径集合
+
+    按输出文件夹分组，每个文件夹只扫描一次目录，避免对每个输出文件单独调用stat。
+    """
+    by_folder = {}
+    for output_file in output_files:
+        by_folder.setdefault(os.path.dirname(output_file), []).append(output_file)
+
+    existing = set()
+    for folder, paths in by_folder.items():
+        try:
+            with os.scandir(folder or '.') as entries:
+                names = {os.path.normcase(entry.name) for entry in entries}
+        except OSError:
+            # 文件夹不存在或无法访问，其中的输出文件都视为不存在
+            continue
+        for path in paths:
+            if os.path.normcase(os.path.basename(path)) in names:
+                existing.add(path)
+    return existing
+
+
+def unique_output_path(output_file, taken=(), check_disk=True):
+    """生成不与已有文件冲突的输出路径：名称 (1).txt、名称 (2).txt……
+
+    taken为本次任务中已经占用的路径，避免多个改名后的输出互相冲突。
+    check_disk为False时只检查taken（例如压缩包内的成员名）。
+    """
+    base, ext = os.path.splitext(output_file)
+    number = 1
+    while True:
+        candidate = f"{base} ({number}){ext}"
+        if candidate not in taken and not (check_disk and os.path.exists(candidate)):
+            return candidate
+        number += 1
+
+
+class ConversionJob:
+    """一次转换任务的描述，不依赖任何GUI组件
+
+    参数：
+    - files: 要转换的SRT文件路径列表（按处理顺序）
+    - mode: 输出模式（MODE_SEPARATE / MODE_MERGE / MODE_MERGE_BY_FOLDER）
+    - output_folder: 统一输出文件夹，None表示输出到源文件所在目录
+    - overwrite: 输出文件已存在时的处理策略
+    - resolutions: 按输出文件指定的冲突处理策略 {输出文件: 策略}，未列出的输出文件使用overwrite
+    - fsync: 输出文件刷盘策略（FSYNC_NONE / FSYNC_PER_FILE / FSYNC_END_OF_BATCH）
+    - archive_file: 分别输出模式下把所有TXT写入这个zip/tar压缩包，而不是逐个生成文件；
+      也可以是无参可调用对象，在转换开始时调用以获取路径，返回空值表示取消
+    - archive_compression: 压缩包的压缩方式（ARCHIVE_STORE / ARCHIVE_DEFLATE / ARCHIVE_LZMA），
+      None表示按扩展名推断
+    - export_file: 导出模式的目标文件，.jsonl（可加 .gz / .xz）或 .db / .sqlite / .sqlite3；
+      也可以是无参可调用对象，在转换开始时调用以获取路径，返回空值表示取消
+    - compress: 合并输出（包括每个文件夹的summary）的压缩格式（COMPRESS_GZIP / COMPRESS_XZ），
+      输出文件名会加上 .gz / .xz 后缀；None表示不压缩
+    - show_merge_path: 合并输出时是否用源文件绝对路径作为段落标题
+    - merge_output_file: 合并输出的目标文件；也可以是无参可调用对象，
+      在解析完成后调用以获取路径，返回空值表示取消
+    - manifest: ConversionManifest，提供时只重新生成源文件或选项发生变化的输出
+    """
+
+    def __init__(self, files, mode=MODE_SEPARATE, output_folder=None,
+                 overwrite=OVERWRITE_ASK, show_merge_path=False, merge_output_file=None,
+                 manifest=None, resolutions=None, fsync=FSYNC_NONE, archive_file=None,
+                 archive_compression=None, compress=None, export_file=None):
+        self.files = list(files)
+        self.mode = mode
+        self.output_folder = output_folder
+        self.overwrite = overwrite
+        self.show_merge_path = show_merge_path
+        self.merge_output_file = merge_output_file
+        self.manifest = manifest
+        self.resolutions = dict(resolutions or {})
+        self.fsync = fsync
+        self.archive_file = archive_file
+        self.archive_compression = archive_compression
+        self.compress = compress
+        self.export_file = export_file
+
+    def options_fingerprint(self):
+        """影响输出内容的选项的摘要，选项变化时增量转换会重新生成输出"""
+        options = {
+            'version': ConversionManifest.VERSION,
+            'mode': self.mode,
+            'show_merge_path': self.show_merge_path if self.mode != MODE_SEPARATE else None,
+        }
+        return hashlib.sha1(json.dumps(options, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def hash_file(file_path):
+    """计算文件内容的SHA-256（分块读取）"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """增量转换清单
+
+    记录每个输出文件由哪些源文件、以什么选项生成，以JSON格式保存：
+    {输出文件: {'options': 选项摘要, 'size': 输出大小, 'mtime': 输出修改时间,
+               'sources': [[源文件, 大小, 修改时间, 内容哈希], ...]}}
+    源文件先按大小和修改时间快速比较，不一致时再比较内容哈希（文件只是被touch或复制时不会重新转换）。
+    输出文件被删除或修改后也会重新生成。
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """读取清单文件，文件不存在或损坏时从空清单开始"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == self.VERSION:
+            self.entries = data.get('outputs', {})
+
+    def save(self):
+        """保存清单（先写临时文件再替换，避免中途退出留下损坏的清单）"""
+        if not self.dirty:
+            return
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        temp_path = create_temp_file(self.path)
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'outputs': self.entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.dirty = False
+
+    def is_up_to_date(self, output_file, sources, options):
+        """判断输出文件是否仍由同样的源文件内容和选项生成"""
+        entry = self.entries.get(os.path.abspath(output_file))
+        if entry is None or entry['options'] != options or len(entry['sources']) != len(sources):
+            return False
+
+        try:
+            stat = os.stat(output_file)
+        except OSError:
+            return False
+        if stat.st_size != entry['size'] or stat.st_mtime_ns != entry['mtime']:
+            return False
+
+        for recorded, source in zip(entry['sources'], sources):
+            path, size, mtime, content_hash = recorded
+            if path != os.path.abspath(source):
+                return False
+            try:
+                stat = os.stat(source)
+                if stat.st_size == size and stat.st_mtime_ns == mtime:
+                    continue
+                if stat.st_size != size or hash_file(source) != content_hash:
+                    return False
+            except OSError:
+                return False
+            # 内容未变，只是修改时间变了：更新记录，下次不必再计算哈希
+            recorded[2] = stat.st_mtime_ns
+            self.dirty = True
+
+        return True
+
+    def owns_output(self, output_file):
+        """输出文件是否由之前的转换生成且之后未被修改（只是源文件或选项变了，重新生成时不必询问）"""
+        entry = self.entries.get(os.path.abspath(output_file))
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(output_file)
+        except OSError:
+            return False
+        return stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime']
+
+    def record(self, output_file, sources, options):
+        """记录输出文件刚由sources以options生成"""
+        try:
+            stat = os.stat(output_file)
+            recorded_sources = []
+            for source in sources:
+                source_stat = os.stat(source)
+                recorded_sources.append([os.path.abspath(source), source_stat.st_size,
+                                         source_stat.st_mtime_ns, hash_file(source)])
+        except OSError:
+            return
+        self.entries[os.path.abspath(output_file)] = {
+            'options': options,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'sources': recorded_sources,
+        }
+        self.dirty = True
+
+
+class ConversionResult:
+    """转换结果汇总
+
+    - converted: 成功转换（或成功合并进输出文件）的源文件
+    - outputs: 成功写入的输出文件
+    - skipped_outputs: 因不覆盖而跳过的输出文件
+    - unchanged: 未重新写入的输出文件（增量转换时源文件和选项都未变化，或新内容与已有输出完全相同）
+    - failed: 失败记录，每项为 {'path': 路径, 'kind': 'file'/'folder'/'output', 'reason': 原因}
+    - cancelled: 合并、打包或导出时没有提供目标文件
+    - stopped: 转换被中途取消
+    - output_file: 打包输出或导出时的目标文件路径
+    - exported_cues: 导出的字幕记录数
+    - decode_replaced: 含有无法解码的字节、已用替换字符代替的源文件
+    """
+
+    def __init__(self, job):
+        self.mode = job.mode
+        self.output_folder = job.output_folder
+        self.output_file = None
+        self.exported_cues = 0
+        self.converted = []
+        self.outputs = []
+        self.skipped_outputs = []
+        self.unchanged = []
+        self.failed = []
+        self.decode_replaced = []
+        self.cancelled = False
+        self.stopped = False
+
+    def add_failure(self, path, reason, kind='file'):
+        self.failed.append({'path': path, 'kind': kind, 'reason': reason})
+
+    def format_failures(self, failures=None):
+        """按界面显示的格式列出失败项（默认列出全部失败项）"""
+        lines = []
+        for failure in self.failed if failures is None else failures:
+            name = os.path.basename(failure['path'])
+            if failure['kind'] == 'folder':
+                lines.append(f"文件夹 {name} ({failure['reason']})")
+            else:
+                lines.append(f"{name} ({failure['reason']})")
+        return lines
+
+    def to_dict(self):
+        """转换为可序列化的字典"""
+        return {
+            'mode': self.mode,
+            'output_file': self.output_file,
+            'converted': len(self.converted),
+            'outputs': list(self.outputs),
+            'skipped_outputs': list(self.skipped_outputs),
+            'unchanged': len(self.unchanged),
+            'failed': list(self.failed),
+            'cancelled': self.cancelled,
+            'stopped': self.stopped,
+            'exported_cues': self.exported_cues,
+            'decode_replaced': list(self.decode_replaced),
+        }
+
+
+def collect_srt_files(paths, recursive=False):
+    """从文件和文件夹路径中收集SRT文件（去重并保持顺序）"""
+    srt_files = []
+    seen = set()
+
+    def add(file_path):
+        if file_path not in seen:
+            seen.add(file_path)
+            srt_files.append(file_path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    for file in sorted(files):
+                        if file.lower().endswith('.srt'):
+                            add(os.path.join(root, file))
+            else:
+                for file in sorted(os.listdir(path)):
+                    full_path = os.path.join(path, file)
+                    if file.lower().endswith('.srt') and os.path.isfile(full_path):
+                        add(full_path)
+        elif os.path.isfile(path) and path.lower().endswith('.srt'):
+            add(path)
+
+    return srt_files
+
+
+def format_duration(seconds):
+    """把秒数格式化为 时:分:秒 或 分:秒"""
+    seconds = int(round(seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def _file_size(file_path):
+    """获取文件大小，文件不可访问时返回0"""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+
+_COMPRESS_SUFFIXES = {
+    COMPRESS_GZIP: '.gz',
+    COMPRESS_XZ: '.xz',
+}
+
+
+def compression_for(file_path):
+    """根据扩展名（.gz / .xz）判断文本文件的压缩格式，未压缩时返回None"""
+    name = file_path.lower()
+    for compression, suffix in _COMPRESS_SUFFIXES.items():
+        if name.endswith(suffix):
+            return compression
+    return None
+
+
+def compressed_path(file_path, compression):
+    """给输出路径加上压缩格式对应的后缀（已有后缀时不重复添加）"""
+    if compression and compression_for(file_path) != compression:
+        return file_path + _COMPRESS_SUFFIXES[compression]
+    return file_path
+
+
+def _open_binary(file_path, mode, compression):
+    if compression == COMPRESS_GZIP:
+        return gzip.open(file_path, mode, compresslevel=6)
+    if compression == COMPRESS_XZ:
+        return lzma.open(file_path, mode)
+    return open(file_path, mode)
+
+
+def open_text_file(file_path, mode='r', compression=None):
+    """以UTF-8编码打开文本文件，gzip/xz压缩的文件在读写时透明地解压和压缩
+
+    compression为None时按扩展名判断；临时文件等没有对应扩展名的文件需要显式指定。
+    """
+    if compression is None:
+        compression = compression_for(file_path)
+    if compression is None:
+        return open(file_path, mode, encoding='utf-8')
+    return io.TextIOWrapper(_open_binary(file_path, mode + 'b', compression), encoding='utf-8')
+
+
+def create_temp_file(output_file):
+    """在输出文件所在目录创建一个新的临时文件并返回路径：.文件名.随机串.tmp
+
+    文件名每次都不同且以独占方式创建，不会覆盖用户已有的文件，同时写入同一输出的任务也不会互相干扰。
+    与tempfile.mkstemp的区别是权限按umask设置，替换后的输出文件与直接创建的文件权限相同。
+    """
+    folder, name = os.path.split(os.path.abspath(output_file))
+    while True:
+        temp_file = os.path.join(folder, f".{name}.{os.urandom(4).hex()}.tmp")
+        try:
+            os.close(os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+        except FileExistsError:
+            continue
+        return temp_file
+
+
+def write_text_file(output_file, content, fsync=False):
+    """以UTF-8编码写入文本文件（输出文件名以 .gz / .xz 结尾时压缩写入）
+
+    先写入同一目录下的临时文件再原子替换，写入中途出错或程序崩溃都不会留下不完整的输出文件。
+    fsync为True时在替换前把内容刷到磁盘，替换后再刷新目录项。
+    """
+    temp_file = create_temp_file(output_file)
+    try:
+        with open_text_file(temp_file, 'w', compression_for(output_file)) as f:
+            f.write(content)
+        if fsync:
+            fsync_file(temp_file)
+        os.replace(temp_file, output_file)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    if fsync:
+        fsync_directory(os.path.dirname(output_file))
+
+
+def fsync_file(file_path):
+    """把已写入的文件内容刷到磁盘"""
+    # Windows上只能对以写方式打开的文件调用fsync
+    fd = os.open(file_path, os.O_RDWR if os.name == 'nt' else os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(folder):
+    """把目录项的变化（新建、改名）刷到磁盘；Windows及不支持的文件系统上忽略"""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(folder or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# 后台写入队列中最多同时等待写入的输出文件数
+WRITE_BEHIND_MAX_PENDING = 8
+
+# 写入策略：不在任务中写入，返回内容交给主进程的后台写入队列
+WRITE_DEFERRED = 'deferred'
+
+
+class WriteBehindQueue:
+    """后台写入队列
+
+    输出文件在单独的线程中按提交顺序写入，当前线程可以继续解析下一个文件。
+    等待写入的文件数有上限，超过时submit会等最早的写入完成，避免内容在内存中堆积。
+    完成回调on_done(状态, 附加信息)按提交顺序在调用submit/defer/close的线程中执行，
+    不需要写入的结果也通过defer排队，保证汇总顺序与提交顺序一致。
+    """
+
+    def __init__(self, fsync=False, max_pending=WRITE_BEHIND_MAX_PENDING):
+        self.fsync = fsync
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = deque()  # [(Future或None, on_done, 状态, 附加信息)]
+
+    def submit(self, output_file, content, on_done):
+        """提交一个写入任务，写入完成后以 ('converted', None) 或 ('write_failed', 错误信息) 调用on_done"""
+        future = self._executor.submit(write_text_file, output_file, content, self.fsync)
+        self._pending.append((future, on_done, None, None))
+        self._finish_ready()
+        while len(self._pending) > self.max_pending:
+            self._finish_first()
+
+    def defer(self, on_done, status, info):
+        """排队一个不需要写入的结果，轮到它时以 (status, info) 调用on_done"""
+        self._pending.append((None, on_done, status, info))
+        self._finish_ready()
+
+    def close(self):
+        """等待所有写入完成并执行剩余的回调"""
+        try:
+            while self._pending:
+                self._finish_first()
+        finally:
+            self._executor.shutdown()
+
+    def _finish_ready(self):
+        while self._pending and (self._pending[0][0] is None or self._pending[0][0].done()):
+            self._finish_first()
+
+    def _finish_first(self):
+        future, on_done, status, info = self._pending.popleft()
+        if future is not None:
+            try:
+                future.result()
+                status, info = 'converted', None
+            except (IOError, OSError, PermissionError) as write_error:
+                status, info = 'write_failed', str(write_error)
+        on_done(status, info)
+
+
+# 压缩包的压缩方式
+ARCHIVE_STORE = 'store'      # 不压缩
+ARCHIVE_DEFLATE = 'deflate'  # zip使用deflate，tar使用gzip
+ARCHIVE_LZMA = 'lzma'        # zip使用lzma，tar使用xz
+
+_ZIP_COMPRESSION = {
+    ARCHIVE_STORE: zipfile.ZIP_STORED,
+    ARCHIVE_DEFLATE: zipfile.ZIP_DEFLATED,
+    ARCHIVE_LZMA: zipfile.ZIP_LZMA,
+}
+_TAR_MODES = {
+    ARCHIVE_STORE: 'w',
+    ARCHIVE_DEFLATE: 'w:gz',
+    ARCHIVE_LZMA: 'w:xz',
+}
+
+
+def archive_format_for(archive_file, compression=None):
+    """根据扩展名确定压缩包格式，返回 ('zip' / 'tar', 压缩方式)；compression为None时按扩展名推断"""
+    name = archive_file.lower()
+    if name.endswith('.zip'):
+        archive_format, default_compression = 'zip', ARCHIVE_DEFLATE
+    elif name.endswith(('.tar.gz', '.tgz')):
+        archive_format, default_compression = 'tar', ARCHIVE_DEFLATE
+    elif name.endswith(('.tar.xz', '.txz')):
+        archive_format, default_compression = 'tar', ARCHIVE_LZMA
+    elif name.endswith('.tar'):
+        archive_format, default_compression = 'tar', ARCHIVE_STORE
+    else:
+        raise ValueError(f"不支持的压缩包格式：{os.path.basename(archive_file)}"
+                         f"（支持 .zip / .tar / .tar.gz / .tar.xz）")
+    return archive_format, compression or default_compression
+
+
+class TempFileWriter:
+    """先写入同一目录下的临时文件、完成后原子替换目标文件的输出
+
+    子类实现_open()、add()和finish()；commit()替换目标文件，discard()删除临时文件，原文件保持不变。
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.temp_file = create_temp_file(output_file)
+        try:
+            self._open()
+        except BaseException:
+            os.remove(self.temp_file)
+            raise
+
+    def _open(self):
+        """打开刚创建的临时文件准备写入"""
+        raise NotImplementedError
+
+    def finish(self):
+        """结束写入，之后临时文件是完整的输出（可以重复调用）"""
+        raise NotImplementedError
+
+    def describe(self):
+        """覆盖确认时用于对比的新内容说明"""
+        raise NotImplementedError
+
+    def commit(self, fsync=False):
+        """完成写入并替换目标文件"""
+        self.finish()
+        if fsync:
+            fsync_file(self.temp_file)
+        os.replace(self.temp_file, self.output_file)
+        if fsync:
+            fsync_directory(os.path.dirname(self.output_file))
+
+    def discard(self):
+        """放弃写入，删除临时文件"""
+        try:
+            self.finish()
+        except (IOError, OSError, sqlite3.Error):
+            # 临时文件反正要删除，关闭时的错误（例如磁盘已满）不再报告
+            pass
+        if os.path.exists(self.temp_file):
+            os.remove(self.temp_file)
+
+
+class ArchiveWriter(TempFileWriter):
+    """把转换结果逐个写入zip或tar压缩包
+
+    成员的修改时间取源文件的修改时间，源文件不变时生成的压缩包内容也不变。
+    """
+
+    def __init__(self, archive_file, compression=None):
+        self.names = []
+        self._taken = set()
+        self._format, self._compression = archive_format_for(archive_file, compression)
+        super().__init__(archive_file)
+
+    def _open(self):
+        if self._format == 'zip':
+            self._zip = zipfile.ZipFile(self.temp_file, 'w', compression=_ZIP_COMPRESSION[self._compression])
+            self._tar = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(self.temp_file, _TAR_MODES[self._compression])
+
+    def add(self, name, content, mtime):
+        """写入一个成员，同名时改名为 名称 (1).txt，返回实际使用的成员名"""
+        if name in self._taken:
+            name = unique_output_path(name, self._taken, check_disk=False)
+        self._taken.add(name)
+        self.names.append(name)
+
+        # 与直接写入TXT文件时的换行符保持一致
+        if os.linesep != '\n':
+            content = content.replace('\n', os.linesep)
+        data = content.encode('utf-8')
+        if self._zip is not None:
+            # zip的时间戳不能早于1980年
+            info = zipfile.ZipInfo(name, date_time=max(time.localtime(mtime)[:6], (1980, 1, 1, 0, 0, 0)))
+            info.compress_type = self._zip.compression
+            info.external_attr = 0o644 << 16
+            self._zip.writestr(info, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(mtime)
+            info.mode = 0o644
+            self._tar.addfile(info, io.BytesIO(data))
+        return name
+
+    def finish(self):
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
+
+    def describe(self):
+        return "压缩包中将包含以下文件：\n" + "\n".join(self.names)
+
+
+# 导出格式
+EXPORT_JSONL = 'jsonl'
+EXPORT_SQLITE = 'sqlite'
+
+# SQLite导出时每批executemany插入的记录数
+EXPORT_BATCH_SIZE = 10000
+
+
+def export_format_for(export_file):
+    """根据扩展名确定导出格式：.jsonl / .ndjson（可加 .gz / .xz）为JSONL，.db / .sqlite / .sqlite3 为SQLite"""
+    name = export_file.lower()
+    suffix = _COMPRESS_SUFFIXES.get(compression_for(name))
+    if suffix:
+        name = name[:-len(suffix)]
+    if name.endswith(('.jsonl', '.ndjson')):
+        return EXPORT_JSONL
+    if name.endswith(('.db', '.sqlite', '.sqlite3')) and not suffix:
+        return EXPORT_SQLITE
+    raise ValueError(f"不支持的导出格式：{os.path.basename(export_file)}"
+                     f"（支持 .jsonl / .jsonl.gz / .jsonl.xz / .db / .sqlite）")
+
+
+def _json_number(value):
+    """字幕序号和时间缺失时记为-1，导出为null"""
+    return 'null' if value < 0 else str(value)
+
+
+class CueExportWriter(TempFileWriter):
+    """把字幕逐条导出为JSONL或SQLite记录
+
+    每条记录包含源文件路径、所在文件夹、序号、开始和结束时间（毫秒）以及文本，缺失的序号和时间为null。
+    JSONL逐行流式写入，扩展名为 .gz / .xz 时边写边压缩。SQLite中源文件和字幕分表存放
+    （sources、cues），视图cue_records提供与JSONL相同的字段；插入按批executemany，
+    整个导出在一个事务中完成，临时数据库关闭日志和同步，完成后再原子替换目标文件。
+    """
+
+    def __init__(self, export_file):
+        self.format = export_format_for(export_file)
+        self.file_count = 0
+        self.cue_count = 0
+        self._finished = False
+        super().__init__(export_file)
+
+    def _open(self):
+        if self.format == EXPORT_JSONL:
+            self._compression = compression_for(self.output_file)
+            self._out = open_text_file(self.temp_file, 'w', self._compression)
+            self._db = None
+            return
+
+        self._out = None
+        self._pending = []
+        # 临时文件是刚创建的空文件，SQLite把它当作空数据库使用
+        self._db = sqlite3.connect(self.temp_file, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=OFF')
+        self._db.execute('PRAGMA synchronous=OFF')
+        self._db.execute('CREATE TABLE sources (id INTEGER PRIMARY KEY, path TEXT NOT NULL, folder TEXT NOT NULL)')
+        self._db.execute('CREATE TABLE cues (source_id INTEGER NOT NULL REFERENCES sources(id), '
+                         'cue_index INTEGER, start_ms INTEGER, end_ms INTEGER, text TEXT NOT NULL)')
+        self._db.execute('CREATE VIEW cue_records AS SELECT sources.path AS source, sources.folder AS folder, '
+                         'cues.cue_index AS cue_index, cues.start_ms AS start_ms, cues.end_ms AS end_ms, '
+                         'cues.text AS text FROM cues JOIN sources ON sources.id = cues.source_id')
+        self._db.execute('BEGIN')
+
+    def add(self, srt_file, cues):
+        """导出一个源文件的全部字幕"""
+        source = os.path.abspath(srt_file)
+        folder = os.path.dirname(source)
+        self.file_count += 1
+        self.cue_count += len(cues)
+
+        if self._db is None:
+            # 源文件和文件夹对同一文件的所有记录都相同，只序列化一次
+            prefix = '{"source": %s, "folder": %s, ' % (
+                json.dumps(source, ensure_ascii=False), json.dumps(folder, ensure_ascii=False))
+            self._out.writelines(
+                '%s"index": %s, "start_ms": %s, "end_ms": %s, "text": %s}\n' % (
+                    prefix, _json_number(index), _json_number(start), _json_number(end),
+                    json.dumps(text, ensure_ascii=False))
+                for index, start, end, text in zip(cues.indexes, cues.starts, cues.ends, cues.texts))
+            return
+
+        source_id = self._db.execute('INSERT INTO sources (path, folder) VALUES (?, ?)',
+                                     (source, folder)).lastrowid
+        pending = self._pending
+        for index, start, end, text in zip(cues.indexes, cues.starts, cues.ends, cues.texts):
+            pending.append((source_id,
+                            index if index >= 0 else None,
+                            start if start >= 0 else None,
+                            end if end >= 0 else None,
+                            text))
+            if len(pending) >= EXPORT_BATCH_SIZE:
+                self._flush()
+
+    def _flush(self):
+        self._db.executemany('INSERT INTO cues (source_id, cue_index, start_ms, end_ms, text) '
+                             'VALUES (?, ?, ?, ?, ?)', self._pending)
+        del self._pending[:]
+
+    def finish(self):
+        if self._finished:
+            return
+        self._finished = True
+        if self._db is None:
+            self._out.close()
+            return
+        try:
+            self._flush()
+            # 数据全部插入后再建索引，比边插入边维护索引快
+            self._db.execute('CREATE INDEX cues_source ON cues (source_id)')
+            self._db.execute('COMMIT')
+        finally:
+            self._db.close()
+
+    def describe(self):
+        if self._db is None:
+            return read_text_preview(self.temp_file, MERGE_PREVIEW_CHARS, self._compression)
+        return f"SQLite数据库：{self.file_count} 个文件，共 {self.cue_count} 条字幕记录"
+
+
+# 计算文本内容哈希时每次编码的字符数
+CONTENT_HASH_CHUNK_CHARS = 256 * 1024
+
+
+def content_digest(content):
+    """按write_text_file写入后的字节计算 (字节数, SHA-256)
+
+    分块编码，不会生成整份内容的字节副本；换行符按文本模式写入时的规则转换。
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for start in range(0, len(content), CONTENT_HASH_CHUNK_CHARS):
+        chunk = content[start:start + CONTENT_HASH_CHUNK_CHARS]
+        if os.linesep != '\n':
+            chunk = chunk.replace('\n', os.linesep)
+        data = chunk.encode('utf-8')
+        size += len(data)
+        digest.update(data)
+    return size, digest.hexdigest()
+
+
+def decompressed_digest(file_path, compression):
+    """流式解压文件并计算解压后内容的 (字节数, SHA-256)"""
+    digest = hashlib.sha256()
+    size = 0
+    with _open_binary(file_path, 'rb', compression) as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            size += len(chunk)
+            digest.update(chunk)
+    return size, digest.hexdigest()
+
+
+def output_is_identical(output_file, content):
+    """判断已存在的输出文件是否与新内容完全相同：先比较大小，相同时再比较哈希
+
+    压缩的输出文件比较解压后的内容（压缩文件头中的时间戳等不影响结果）。
+    """
+    compression = compression_for(output_file)
+    try:
+        if compression is not None:
+            return decompressed_digest(output_file, compression) == content_digest(content)
+        existing_size = os.path.getsize(output_file)
+        size, digest = content_digest(content)
+        if size != existing_size:
+            return False
+        return hash_file(output_file) == digest
+    except (OSError, EOFError, lzma.LZMAError):
+        return False
+
+
+def files_identical(file_a, file_b, compression=None):
+    """判断两个文件内容是否完全相同：先比较大小，相同时再比较哈希
+
+    compression不为None时两个文件都按该格式解压后比较。
+    """
+    try:
+        if compression is not None:
+            return decompressed_digest(file_a, compression) == decompressed_digest(file_b, compression)
+        if os.path.getsize(file_a) != os.path.getsize(file_b):
+            return False
+        return hash_file(file_a) == hash_file(file_b)
+    except (OSError, EOFError, lzma.LZMAError):
+        return False
+
+
+def truncate_preview(text, limit):
+    """预览内容超过limit个字符时截断并加上说明"""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f"\n\n……（仅显示前 {limit} 个字符）"
+
+
+def read_text_preview(file_path, limit, compression=None):
+    """读取文本文件开头的最多limit个字符作为预览（压缩文件只解压需要的部分）"""
+    with open_text_file(file_path, 'r', compression) as f:
+        return truncate_preview(f.read(limit + 1), limit)
+
+
+# 合并输出覆盖确认时，对比窗口中新内容预览的最大字符数
+MERGE_PREVIEW_CHARS = 200000
+
+# 文件数少于该值时不启动进程池（进程启动开销大于并行收益）
+PARALLEL_MIN_FILES = 16
+
+# 提交给进程池的单个任务块最多包含的文件数
+PARALLEL_CHUNK_SIZE = 64
+
+
+def _parallel_chunk_size(total, jobs):
+    """让每个工作进程大约分到4个任务块，兼顾负载均衡和进程间通信开销"""
+    return max(1, min(PARALLEL_CHUNK_SIZE, total // (jobs * 4)))
+
+
+def _parse_task(file_path):
+    """工作进程中执行的解析任务，返回 (CueTable, None) 或 (None, 错误信息)"""
+    try:
+        return CueTable.from_file(file_path), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _finish_output(output_file, content, write_policy, check_identical, fsync):
+    """按写入策略处理生成好的输出内容，返回 (状态, 附加信息)
+
+    write_policy：True=直接写入，False=不写入（输出已存在且不覆盖），
+    None=不写入并返回内容，由主进程确认覆盖后再写入，WRITE_DEFERRED=返回内容交给主进程的后台写入队列。
+    check_identical为True（输出文件已存在）时，新内容与已有文件完全相同则不写入也不询问。
+    状态为 'converted' / 'identical' / 'skipped' / 'confirm' / 'write' / 'write_failed'。
+    """
+    if check_identical and output_is_identical(output_file, content):
+        return 'identical', None
+    if write_policy is None:
+        return 'confirm', content
+    if write_policy == WRITE_DEFERRED:
+        return 'write', content
+    if not write_policy:
+        return 'skipped', None
+
+    try:
+        write_text_file(output_file, content, fsync=fsync)
+    except (IOError, OSError, PermissionError) as write_error:
+        return 'write_failed', str(write_error)
+    return 'converted', None
+
+
+def _convert_separate_task(srt_file, output_file, write_policy, check_identical=False, fsync=False,
+                           parse=CueTable.from_file):
+    """分别输出模式下转换单个文件
+
+    写入相关参数的含义见_finish_output。返回 (状态, 附加信息, 是否有字符被替换)，
+    状态为_finish_output的状态之一，或 'empty' / 'error'。
+    """
+    try:
+        cues = parse(srt_file)
+        if not cues:
+            return 'empty', None, cues.replaced
+        content = cues.to_txt()
+    except Exception as e:
+        return 'error', str(e), False
+
+    return _finish_output(output_file, content, write_policy, check_identical, fsync) + (cues.replaced,)
+
+
+def _parse_chunk(files):
+    """工作进程中执行的解析任务块，返回按顺序对应的结果列表"""
+    return [_parse_task(file_path) for file_path in files]
+
+
+def _convert_separate_chunk(tasks):
+    """工作进程中执行的任务块，tasks中每项为 (源文件, 输出文件, 写入策略, 是否比较已有内容, 是否刷盘)，
+    返回按顺序对应的结果列表
+    """
+    return [_convert_separate_task(*task) for task in tasks]
+
+
+def merge_section_text(srt_file, cues, show_merge_path=False):
+    """生成合并输出中单个文件的段落：文件名 + 换行 + 内容"""
+    if show_merge_path:
+        # 显示绝对路径（不含扩展名）
+        filename = os.path.splitext(os.path.normpath(srt_file))[0]
+    else:
+        # 只显示文件名（不含扩展名）
+        filename = os.path.splitext(os.path.basename(srt_file))[0]
+    return f"{filename}\n{cues.to_txt()}"
+
+
+def _write_folder_summary(sections, output_file, write_policy, check_identical=False, fsync=False):
+    """按写入策略输出文件夹的summary，返回 (状态, 附加信息)，参数和状态的含义见_finish_output"""
+    if not sections:
+        return 'empty', None
+    # 用空行连接每个文件的处理结果
+    return _finish_output(output_file, '\n\n'.join(sections), write_policy, check_identical, fsync)
+
+
+def _merge_folder_task(folder_path, files, output_file, write_policy, show_merge_path, check_identical=False,
+                       fsync=False, parse=CueTable.from_file):
+    """按文件夹合并模式下处理一个文件夹：按顺序解析其中的文件并输出summary
+
+    返回 (状态, 附加信息, 各文件结果)，各文件结果与files一一对应，
+    每项为 ('merged', 是否有字符被替换) 或 ('empty' / 'error', 错误信息)。
+    """
+    sections = []
+    file_outcomes = []
+    for srt_file in files:
+        try:
+            cues = parse(srt_file)
+        except Exception as e:
+            file_outcomes.append(('error', str(e)))
+            continue
+        if not cues:
+            file_outcomes.append(('empty', None))
+            continue
+        sections.append(merge_section_text(srt_file, cues, show_merge_path))
+        # 合并成功的文件在附加信息中记录是否有字符被替换
+        file_outcomes.append(('merged', cues.replaced))
+
+    status, info = _write_folder_summary(sections, output_file, write_policy, check_identical, fsync)
+    return status, info, file_outcomes
+
+
+def _merge_folder_chunk(tasks):
+    """工作进程中执行的任务块，tasks中每项为 (文件夹, 文件列表, 输出文件, 写入策略, 是否显示路径,
+    是否比较已有内容, 是否刷盘)
+    """
+    return [_merge_folder_task(*task) for task in tasks]
+
+
+class ConversionEngine:
+    """与GUI无关的转换引擎
+
+    按ConversionJob执行转换并返回ConversionResult。过程中的事件通过on_event回调
+    以字典形式报告（'type'字段区分事件类型），覆盖确认通过confirm_overwrite回调完成。
+    jobs大于1时在进程池中并行处理，结果仍按输入顺序汇总。
+
+    可以在其他线程中调用cancel()，引擎会在处理完当前文件后停止。每处理完一个源文件
+    发出一次'progress'事件，包含已处理的文件数和字节数。
+
+    在当前进程中生成的输出交给WriteBehindQueue在后台线程写入，解析下一个文件与写入磁盘可以重叠。
+    """
+
+    def __init__(self, on_event=None, confirm_overwrite=None, jobs=1):
+        self.on_event = on_event
+        self.confirm_overwrite = confirm_overwrite
+        self.jobs = max(1, jobs or 1)
+        self._cancel_event = threading.Event()
+        self._progress = {}
+        self._decode_replaced = []
+
+    def cancel(self):
+        """请求在处理完当前文件后停止转换"""
+        self._cancel_event.set()
+
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    def run(self, job):
+        """执行转换任务"""
+        result = ConversionResult(job)
+        self._progress = {'done': 0, 'total': len(job.files), 'bytes_done': 0, 'total_bytes': 0}
+        self._decode_replaced = []
+        if self.on_event is not None:
+            self._progress['total_bytes'] = sum(_file_size(f) for f in job.files)
+        self._emit('started', mode=job.mode, total=len(job.files),
+                   total_bytes=self._progress['total_bytes'])
+
+        self.writer = WriteBehindQueue(fsync=job.fsync == FSYNC_PER_FILE)
+        try:
+            if job.mode == MODE_SEPARATE:
+                self._convert_separate(job, result)
+            elif job.mode == MODE_MERGE_BY_FOLDER:
+                self._convert_merge_by_folder(job, result)
+            elif job.mode == MODE_MERGE:
+                self._convert_merge_all(job, result)
+            elif job.mode == MODE_EXPORT:
+                self._convert_export(job, result)
+            else:
+                raise ValueError(f"未知的输出模式：{job.mode}")
+        finally:
+            self.writer.close()
+
+        if job.fsync == FSYNC_END_OF_BATCH:
+            self._fsync_outputs(result)
+
+        result.stopped = self.cancel_requested()
+        result.decode_replaced = list(OrderedDict.fromkeys(self._decode_replaced))
+        if job.manifest is not None:
+            job.manifest.save()
+        self._emit('finished', result=result)
+        return result
+
+    def parse(self, file_path):
+        """解析SRT文件（使用共享的解析缓存）"""
+        cues = load_cue_table(file_path)
+        if cues.replaced:
+            self._decode_replaced.append(file_path)
+        return cues
+
+    def use_pool(self, files):
+        """文件足够多且允许多个工作进程时才使用进程池"""
+        return self.jobs > 1 and len(files) >= PARALLEL_MIN_FILES
+
+    def parse_many(self, files):
+        """按输入顺序产出 (文件, CueTable, 错误信息)，解析失败时CueTable为None"""
+        if not self.use_pool(files):
+            for srt_file in files:
+                if self.cancel_requested():
+                    return
+                try:
+                    yield srt_file, self.parse(srt_file), None
+                except Exception as e:
+                    yield srt_file, None, str(e)
+            return
+
+        for srt_file, (cues, error) in self._run_in_pool(_parse_chunk, files, lambda e: (None, str(e))):
+            if cues is not None and cues.replaced:
+                self._decode_replaced.append(srt_file)
+            yield srt_file, cues, error
+
+    def _run_in_pool(self, worker, items, failed_outcome):
+        """在进程池中按块执行worker，按输入顺序逐个产出 (元素, 结果)
+
+        worker接收一个元素列表并返回等长的结果列表；工作进程异常退出时，
+        整块元素的结果都用failed_outcome(异常)代替。同时在途的任务块数量有上限，
+        避免一次性提交数万个任务。请求取消后不再提交新的任务块，尚未开始的任务块直接撤销，
+        已经开始执行的任务块仍会完整汇报结果。
+        """
+        chunksize = _parallel_chunk_size(len(items), self.jobs)
+        chunks = (items[i:i + chunksize] for i in range(0, len(items), chunksize))
+        in_flight = deque()
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            def submit(count):
+                for chunk in islice(chunks, count):
+                    in_flight.append((chunk, executor.submit(worker, chunk)))
+
+            submit(self.jobs * 2)
+            try:
+                while in_flight:
+                    chunk, future = in_flight.popleft()
+                    if self.cancel_requested():
+                        if future.cancel():
+                            continue
+                    else:
+                        submit(1)
+
+                    try:
+                        outcomes = future.result()
+                    except Exception as e:
+                        outcomes = [failed_outcome(e)] * len(chunk)
+                    for item, outcome in zip(chunk, outcomes):
+                        yield item, outcome
+            finally:
+                # 提前结束时撤销还没开始的任务块，避免退出时等待它们全部执行完
+                for chunk, future in in_flight:
+                    future.cancel()
+
+    def output_path_for(self, job, srt_file):
+        """分别输出模式下源文件对应的TXT路径"""
+        if job.output_folder:
+            # 输出到指定文件夹，文件名格式：原文件名(绝对父目录路径).txt
+            base_name = os.path.splitext(os.path.basename(srt_file))[0]
+            parent_dir = os.path.normpath(os.path.dirname(srt_file))
+            safe_filename = sanitize_filename(f"{base_name}({parent_dir})")
+            return os.path.join(job.output_folder, f"{safe_filename}.txt")
+        # 输出到原文件所在目录
+        return os.path.splitext(srt_file)[0] + '.txt'
+
+    def separate_outputs(self, job):
+        """分别输出模式下每个源文件的输出路径，返回 [(源文件, 输出文件)]
+
+        多个源文件对应同一个输出文件时（例如a.srt和a.SRT），后面的源文件改用不冲突的文件名，
+        避免并行写入同一个文件。
+        """
+        outputs = [(srt_file, self.output_path_for(job, srt_file)) for srt_file in job.files]
+        taken = {output_file for _, output_file in outputs}
+        seen = set()
+        for position, (srt_file, output_file) in enumerate(outputs):
+            key = os.path.normcase(os.path.abspath(output_file))
+            if key in seen:
+                output_file = unique_output_path(output_file, taken, check_disk=False)
+                taken.add(output_file)
+                outputs[position] = (srt_file, output_file)
+                key = os.path.normcase(os.path.abspath(output_file))
+            seen.add(key)
+        return outputs
+
+    def archive_root(self, files):
+        """打包输出时成员路径的基准目录：所有源文件所在目录的公共上级目录"""
+        folders = {os.path.dirname(os.path.abspath(srt_file)) for srt_file in files}
+        try:
+            return os.path.commonpath(list(folders)) if folders else ''
+        except ValueError:
+            # Windows上源文件分布在不同驱动器
+            return ''
+
+    def archive_member_name(self, job, srt_file, root):
+        """打包输出时源文件对应的成员名，沿用分别输出模式的命名规则
+
+        输出到同一个文件夹时为 原文件名(绝对父目录路径).txt；否则保留相对于root的目录结构。
+        """
+        output_file = self.output_path_for(job, srt_file)
+        if job.output_folder:
+            return os.path.basename(output_file)
+        output_file = os.path.abspath(output_file)
+        if root:
+            output_file = os.path.relpath(output_file, root)
+        else:
+            output_file = os.path.splitdrive(output_file)[1].lstrip('\\/')
+        # 压缩包内统一使用 / 作为路径分隔符
+        return output_file.replace(os.sep, '/')
+
+    def summary_path_for(self, job, folder_path):
+        """按文件夹合并模式下文件夹对应的summary路径"""
+        if job.output_folder:
+            # 输出到指定文件夹，使用文件夹路径作为文件名后缀
+            safe_filename = sanitize_filename(f"summary({os.path.normpath(folder_path)})")
+            output_file = os.path.join(job.output_folder, f"{safe_filename}.txt")
+        else:
+            # 在每个文件夹下生成summary.txt
+            output_file = os.path.join(folder_path, "summary.txt")
+        return compressed_path(output_file, job.compress)
+
+    def merge_section(self, job, srt_file, cues):
+        """生成合并输出中单个文件的段落：文件名 + 换行 + 内容"""
+        return merge_section_text(srt_file, cues, job.show_merge_path)
+
+    def plan_outputs(self, job):
+        """列出任务将要生成的输出文件，返回 [(输出文件, 对应的源文件列表)]"""
+        if job.mode == MODE_SEPARATE and job.archive_file:
+            if callable(job.archive_file):
+                return []
+            return [(job.archive_file, list(job.files))]
+        if job.mode == MODE_EXPORT:
+            if not job.export_file or callable(job.export_file):
+                return []
+            return [(job.export_file, list(job.files))]
+        if job.mode == MODE_SEPARATE:
+            return [(output_file, [srt_file]) for srt_file, output_file in self.separate_outputs(job)]
+        if job.mode == MODE_MERGE_BY_FOLDER:
+            folder_groups = {}
+            for file_path in job.files:
+                folder_groups.setdefault(os.path.dirname(file_path), []).append(file_path)
+            return [(self.summary_path_for(job, folder_path), files)
+                    for folder_path, files in folder_groups.items()]
+        if job.merge_output_file and not callable(job.merge_output_file):
+            return [(compressed_path(job.merge_output_file, job.compress), list(job.files))]
+        return []
+
+    def find_conflicts(self, job):
+        """规划阶段：返回输出文件已经存在、需要用户决定如何处理的 [(输出文件, 源文件列表)]"""
+        return self.classify_existing_outputs(job)[0]
+
+    def classify_existing_outputs(self, job):
+        """规划阶段：把已存在的输出文件分为 (冲突, 预期的重新生成)，两者都是 [(输出文件, 源文件列表)]
+
+        增量转换时，清单认为仍是最新的输出不会被写入，不算冲突；由之前的转换生成且之后未被修改、
+        只因源文件或选项变化而过期的输出是预期的重新生成，写入时由plan_write直接覆盖，也不需要询问。
+        """
+        plan = self.plan_outputs(job)
+        existing = find_existing_outputs([output_file for output_file, _ in plan])
+        conflicts = []
+        rewrites = []
+        options = job.options_fingerprint()
+        for output_file, sources in plan:
+            if output_file not in existing:
+                continue
+            if job.manifest is not None:
+                if job.manifest.is_up_to_date(output_file, sources, options):
+                    continue
+                if job.manifest.owns_output(output_file):
+                    rewrites.append((output_file, sources))
+                    continue
+            conflicts.append((output_file, sources))
+        return conflicts, rewrites
+
+    def preview_output(self, job, sources):
+        """生成某个输出文件的新内容（合并输出只生成开头部分的预览），用于冲突时对比"""
+        if job.mode == MODE_EXPORT:
+            return f"将导出 {len(sources)} 个文件的字幕记录"
+        if job.mode == MODE_SEPARATE and job.archive_file:
+            root = self.archive_root(sources)
+            return "压缩包中将包含以下文件：\n" + "\n".join(
+                self.archive_member_name(job, srt_file, root) for srt_file in sources)
+        if job.mode == MODE_SEPARATE:
+            return self.parse(sources[0]).to_txt()
+        return self.merge_preview(job, sources)
+
+    def plan_write(self, job, output_file, existing, taken):
+        """根据冲突处理策略确定实际的输出路径和写入策略
+
+        existing为已存在的输出文件集合，taken为本次任务已占用的输出路径（改名时会加入新路径）。
+        增量转换时，由之前的转换生成且之后未被修改的输出直接重新生成，不受冲突处理策略影响。
+        返回 (输出文件, 写入策略)，写入策略的含义同_convert_separate_task。
+        """
+        if output_file not in existing:
+            return output_file, True
+        if job.manifest is not None and job.manifest.owns_output(output_file):
+            return output_file, True
+        policy = job.resolutions.get(output_file, job.overwrite)
+        if policy == OVERWRITE_ALWAYS:
+            return output_file, True
+        if policy == OVERWRITE_RENAME:
+            renamed = unique_output_path(output_file, taken)
+            taken.add(renamed)
+            return renamed, True
+        if policy == OVERWRITE_ASK and self.confirm_overwrite is not None:
+            return output_file, None
+        return output_file, False
+
+    def merge_preview(self, job, files, limit=None):
+        """生成合并输出开头部分的预览，用于覆盖确认时对比内容
+
+        只解析到预览长度足够为止，不会为了预览把全部内容放进内存。
+        """
+        if limit is None:
+            limit = MERGE_PREVIEW_CHARS
+        parts = []
+        length = 0
+        for srt_file in files:
+            try:
+                cues = self.parse(srt_file)
+            except Exception:
+                continue
+            if not cues:
+                continue
+            section = self.merge_section(job, srt_file, cues)
+            if parts:
+                section = '\n\n' + section
+            parts.append(section)
+            length += len(section)
+            if length >= limit:
+                break
+        return truncate_preview(''.join(parts), limit)
+
+    def should_write(self, job, output_file, new_content):
+        """根据覆盖策略判断是否写入输出文件
+
+        new_content 可以是字符串，也可以是按需生成对比内容的函数。
+        """
+        if not os.path.exists(output_file):
+            return True
+        if job.overwrite == OVERWRITE_ALWAYS:
+            return True
+        if job.overwrite == OVERWRITE_ASK and self.confirm_overwrite is not None:
+            return self.confirm_overwrite(output_file, new_content)
+        return False
+
+    def _fsync_outputs(self, result):
+        """整批转换结束后把所有输出文件及其所在目录刷到磁盘"""
+        for output_file in result.outputs:
+            try:
+                fsync_file(output_file)
+            except OSError as e:
+                result.add_failure(output_file, f"刷新到磁盘失败: {str(e)}", kind='output')
+        for folder in {os.path.dirname(output_file) for output_file in result.outputs}:
+            fsync_directory(folder)
+
+    def _advance(self, srt_file):
+        """记录一个源文件处理完毕并发出进度事件"""
+        progress = self._progress
+        progress['done'] += 1
+        if self.on_event is not None:
+            progress['bytes_done'] += _file_size(srt_file)
+            self._emit('progress', path=srt_file, **progress)
+
+    def _emit(self, event_type, **data):
+        if self.on_event is not None:
+            data['type'] = event_type
+            self.on_event(data)
+
+    def _convert_separate(self, job, result):
+        """分别转换每个文件
+
+        先确定每个文件的输出路径和写入策略，再逐个（或在进程池中按块并行）完成解析、
+        拼接和写入。结果始终按输入顺序汇总，需要确认覆盖的文件由主进程依次处理。
+        """
+        if job.archive_file:
+            self._convert_separate_archive(job, result)
+            return
+
+        options = job.options_fingerprint()
+        planned = []
+        for srt_file, output_file in self.separate_outputs(job):
+            if job.manifest is not None and job.manifest.is_up_to_date(output_file, [srt_file], options):
+                result.unchanged.append(output_file)
+                self._advance(srt_file)
+                continue
+            planned.append((srt_file, output_file))
+
+        # 一次性检查所有输出文件是否已存在（每个输出文件夹扫描一次）
+        taken = {output_file for _, output_file in planned}
+        existing = find_existing_outputs(taken)
+        tasks = []
+        for srt_file, output_file in planned:
+            output_file, write_policy = self.plan_write(job, output_file, existing, taken)
+            tasks.append((srt_file, output_file, write_policy, output_file in existing,
+                          job.fsync == FSYNC_PER_FILE))
+
+        if self.use_pool(tasks):
+            outcomes = self._run_in_pool(_convert_separate_chunk, tasks, lambda e: ('error', str(e), False))
+        else:
+            outcomes = self._run_separate_serial(tasks)
+
+        for task, (status, info, replaced) in outcomes:
+            if replaced:
+                self._decode_replaced.append(task[0])
+            self._record_separate(job, result, task[0], task[1], status, info)
+
+    def _convert_separate_archive(self, job, result):
+        """分别转换每个文件，把所有TXT写入一个压缩包（不使用增量转换清单）"""
+        root = self.archive_root(job.files)
+
+        def add(writer, srt_file, cues):
+            writer.add(self.archive_member_name(job, srt_file, root), cues.to_txt(), os.path.getmtime(srt_file))
+
+        self._convert_into_writer(job, result, job.archive_file, "压缩包",
+                                  lambda path: ArchiveWriter(path, job.archive_compression), add)
+
+    def _convert_export(self, job, result):
+        """把所有字幕逐条导出为JSONL或SQLite记录"""
+        def add(writer, srt_file, cues):
+            writer.add(srt_file, cues)
+            result.exported_cues += len(cues)
+
+        self._convert_into_writer(job, result, job.export_file, "导出文件", CueExportWriter, add)
+
+    def _convert_into_writer(self, job, result, target, label, open_writer, add):
+        """按顺序解析所有源文件，逐个交给一个TempFileWriter写入同一个目标文件
+
+        target为目标路径，也可以是返回路径的函数；label用于错误信息。边解析边写入临时文件，
+        完成后替换目标文件；取消、出错或不覆盖时原文件保持不变。目标文件已存在且新内容完全相同时不写入。
+        """
+        if callable(target):
+            target = target()
+        if not target:
+            result.cancelled = True
+            return
+
+        existing = find_existing_outputs([target])
+        target, write_policy = self.plan_write(job, target, existing, {target})
+        result.output_file = target
+
+        try:
+            writer = open_writer(target)
+        except (IOError, OSError, ValueError, sqlite3.Error) as e:
+            result.add_failure(target, f"无法创建{label}: {str(e)}", kind='output')
+            return
+
+        committed = False
+        written_files = []
+        try:
+            for srt_file, cues, error in self.parse_many(job.files):
+                self._advance(srt_file)
+                if error is not None:
+                    result.add_failure(srt_file, error)
+                elif not cues:
+                    result.add_failure(srt_file, "无字幕内容")
+                else:
+                    add(writer, srt_file, cues)
+                    written_files.append(srt_file)
+                    continue
+                self._emit('file_failed', path=srt_file)
+
+            if not written_files or self.cancel_requested():
+                return
+            writer.finish()
+
+            if target in existing:
+                if files_identical(writer.temp_file, target, compression_for(target)):
+                    # 内容与已有文件相同，不写入，保留原文件的修改时间
+                    result.unchanged.append(target)
+                    return
+                # 与分别输出模式一致：先检查内容是否相同，再按不覆盖或询问的策略处理
+                if write_policy is False or (
+                        write_policy is None and not self.should_write(job, target, writer.describe)):
+                    result.skipped_outputs.append(target)
+                    return
+            writer.commit(fsync=job.fsync == FSYNC_PER_FILE)
+            committed = True
+        except (IOError, OSError, PermissionError, sqlite3.Error) as write_error:
+            result.add_failure(target, f"写入{label}失败: {str(write_error)}", kind='output')
+            return
+        finally:
+            if not committed:
+                writer.discard()
+
+        result.converted.extend(written_files)
+        result.outputs.append(target)
+        for srt_file in written_files:
+            self._emit('file_converted', path=srt_file, output=target)
+
+    def _run_separate_serial(self, tasks):
+        """在当前进程中逐个执行分别转换任务，产出 (任务, 结果)，需要写入的内容交给后台写入队列"""
+        for task in tasks:
+            if self.cancel_requested():
+                return
+            srt_file, output_file, write_policy, check_identical, fsync = task
+            if write_policy is True:
+                write_policy = WRITE_DEFERRED
+            yield task, _convert_separate_task(srt_file, output_file, write_policy, check_identical, fsync,
+                                               parse=self.parse)
+
+    def _record_separate(self, job, result, srt_file, output_file, status, info):
+        """汇总单个文件的转换结果，需要确认覆盖的文件在这里询问，需要写入的内容交给后台写入队列"""
+        if status == 'confirm':
+            status = 'write' if self.should_write(job, output_file, info) else 'skipped'
+
+        def on_done(status, info):
+            self._finish_separate(job, result, srt_file, output_file, status, info)
+
+        if status == 'write':
+            self.writer.submit(output_file, info, on_done)
+        else:
+            self.writer.defer(on_done, status, info)
+
+    def _finish_separate(self, job, result, srt_file, output_file, status, info):
+        """记录单个文件的最终结果"""
+        self._advance(srt_file)
+        if status == 'converted':
+            result.converted.append(srt_file)
+            result.outputs.append(output_file)
+            if job.manifest is not None:
+                job.manifest.record(output_file, [srt_file], job.options_fingerprint())
+            self._emit('file_converted', path=srt_file, output=output_file)
+            return
+        if status == 'identical':
+            # 内容与已有输出相同，不写入，保留原文件的修改时间
+            result.unchanged.append(output_file)
+            if job.manifest is not None:
+                job.manifest.record(output_file, [srt_file], job.options_fingerprint())
+            return
+
+        if status == 'empty':
+            result.add_failure(srt_file, "无字幕内容")
+        elif status == 'skipped':
+            result.add_failure(srt_file, "用户选择不覆盖")
+            result.skipped_outputs.append(output_file)
+        elif status == 'write_failed':
+            result.add_failure(srt_file, f"写入失败: {info}")
+        else:
+            result.add_failure(srt_file, info)
+        self._emit('file_failed', path=srt_file)
+
+    def _iter_sections(self, job, files, result):
+        """按顺序解析文件并产出 (文件, 合并段落, 是否出错)
+
+        无字幕内容的文件段落为None；解析出错的文件段落为None且标记为出错。两者都会记入失败列表。
+        """
+        for srt_file, cues, error in self.parse_many(files):
+            self._advance(srt_file)
+            if error is None and not cues:
+                result.add_failure(srt_file, "无字幕内容")
+                self._emit('file_failed', path=srt_file)
+                yield srt_file, None, False
+            elif error is not None:
+                result.add_failure(srt_file, error)
+                self._emit('file_failed', path=srt_file)
+                yield srt_file, None, True
+            else:
+                yield srt_file, self.merge_section(job, srt_file, cues), False
+
+    def _convert_merge_by_folder(self, job, result):
+        """按文件夹合并文件，每个文件夹生成一个summary
+
+        文件夹数量足够时，以文件夹为单位在进程池中并行处理（每个工作进程负责解析并写入整个文件夹）；
+        文件夹较少时按文件并行解析，再由当前进程按顺序写入。结果始终按文件夹的顺序汇总。
+        """
+        # 按文件夹分组文件（保持首次出现的顺序）
+        folder_groups = {}
+        for file_path in job.files:
+            folder_groups.setdefault(os.path.dirname(file_path), []).append(file_path)
+
+        options = job.options_fingerprint()
+        planned = []
+        for folder_path, files in folder_groups.items():
+            output_file = self.summary_path_for(job, folder_path)
+            if job.manifest is not None and job.manifest.is_up_to_date(output_file, files, options):
+                result.unchanged.append(output_file)
+                for srt_file in files:
+                    self._advance(srt_file)
+                continue
+            planned.append((folder_path, files, output_file))
+
+        # 一次性检查所有summary是否已存在（每个输出文件夹扫描一次）
+        taken = {output_file for _, _, output_file in planned}
+        existing = find_existing_outputs(taken)
+        tasks = []
+        for folder_path, files, output_file in planned:
+            output_file, write_policy = self.plan_write(job, output_file, existing, taken)
+            tasks.append((folder_path, files, output_file, write_policy, job.show_merge_path,
+                          output_file in existing, job.fsync == FSYNC_PER_FILE))
+
+        if self.use_pool(job.files) and len(tasks) >= self.jobs:
+            outcomes = self._run_in_pool(_merge_folder_chunk, tasks, lambda e: ('error', str(e), None))
+        else:
+            outcomes = self._run_folders_inline(tasks)
+
+        for task, outcome in outcomes:
+            self._record_folder(job, result, task, outcome)
+
+    def _run_folders_inline(self, tasks):
+        """在当前进程中按顺序生成每个文件夹的summary，产出 (任务, 结果)
+
+        解析交给parse_many，文件较多时仍会在进程池中按文件并行解析；需要写入的内容交给后台写入队列。
+        """
+        parsed = self.parse_many([srt_file for task in tasks for srt_file in task[1]])
+        for task in tasks:
+            folder_path, files, output_file, write_policy, show_merge_path, check_identical, fsync = task
+            if write_policy is True:
+                write_policy = WRITE_DEFERRED
+            sections = []
+            file_outcomes = []
+            for srt_file, cues, error in islice(parsed, len(files)):
+                if error is not None:
+                    file_outcomes.append(('error', error))
+                elif not cues:
+                    file_outcomes.append(('empty', None))
+                else:
+                    sections.append(merge_section_text(srt_file, cues, show_merge_path))
+                    file_outcomes.append(('merged', cues.replaced))
+
+            if self.cancel_requested():
+                # 被取消时当前文件夹可能只解析了一部分，不生成不完整的summary
+                return
+            status, info = _write_folder_summary(sections, output_file, write_policy, check_identical, fsync)
+            yield task, (status, info, file_outcomes)
+
+    def _record_folder(self, job, result, task, outcome):
+        """汇总单个文件夹的结果，需要确认覆盖的summary在这里询问，需要写入的内容交给后台写入队列"""
+        output_file = task[2]
+        status, info, file_outcomes = outcome
+        if status == 'confirm':
+            status = 'write' if self.should_write(job, output_file, info) else 'skipped'
+
+        def on_done(status, info):
+            self._finish_folder(job, result, task, status, info, file_outcomes)
+
+        if status == 'write':
+            self.writer.submit(output_file, info, on_done)
+        else:
+            self.writer.defer(on_done, status, info)
+
+    def _finish_folder(self, job, result, task, status, info, file_outcomes):
+        """记录单个文件夹及其中各文件的最终结果"""
+        folder_path, files, output_file = task[:3]
+        if file_outcomes is None:
+            # 工作进程异常退出，整个文件夹的文件都记为失败
+            file_outcomes = [('error', info)] * len(files)
+
+        merged_files = []
+        has_errors = False
+        for srt_file, (file_status, error) in zip(files, file_outcomes):
+            self._advance(srt_file)
+            if file_status == 'merged':
+                merged_files.append(srt_file)
+                if error:
+                    # 合并成功时第二项表示是否有字符被替换
+                    self._decode_replaced.append(srt_file)
+                continue
+            if file_status == 'empty':
+                result.add_failure(srt_file, "无字幕内容")
+            else:
+                has_errors = True
+                result.add_failure(srt_file, error)
+            self._emit('file_failed', path=srt_file)
+
+        if status == 'skipped':
+            result.add_failure(folder_path, "用户选择不覆盖summary.txt", kind='folder')
+            result.skipped_outputs.append(output_file)
+        elif status == 'write_failed':
+            result.add_failure(folder_path, f"写入summary.txt失败: {info}", kind='folder')
+        elif status == 'identical':
+            # 内容与已有summary相同，不写入，保留原文件的修改时间
+            result.unchanged.append(output_file)
+            if job.manifest is not None and not has_errors:
+                job.manifest.record(output_file, files, job.options_fingerprint())
+        elif status == 'converted':
+            result.converted.extend(merged_files)
+            result.outputs.append(output_file)
+            # 有文件解析出错时不记入清单，下次重新尝试
+            if job.manifest is not None and not has_errors:
+                job.manifest.record(output_file, files, job.options_fingerprint())
+            for srt_file in merged_files:
+                self._emit('file_converted', path=srt_file, output=output_file)
+
+    def _convert_merge_all(self, job, result):
+        """合并所有文件到一个TXT
+
+        先确定输出文件，再边解析边把每个文件的段落写入临时文件，内存占用与文件总量无关。
+        目标文件已存在时，新内容与其完全相同则不写入也不询问（记为未变化），否则在全部生成后再按策略跳过或确认是否覆盖。
+        完成后替换目标文件；取消、出错或不覆盖时删除临时文件，原文件保持不变。
+        """
+        if not job.files:
+            return
+
+        output_file = job.merge_output_file
+        if callable(output_file):
+            output_file = output_file()
+        if not output_file:
+            # 没有提供目标文件（例如用户取消了保存）
+            result.cancelled = True
+            return
+        output_file = compressed_path(output_file, job.compress)
+        compression = compression_for(output_file)
+
+        existing = find_existing_outputs([output_file])
+        output_file, write_policy = self.plan_write(job, output_file, existing, {output_file})
+
+        temp_file = None
+        out = None
+        merged_files = []
+        try:
+            for srt_file, section, failed in self._iter_sections(job, job.files, result):
+                if section is None:
+                    continue
+                if out is None:
+                    # 有内容时才创建临时文件，压缩输出时边写边压缩
+                    temp_file = create_temp_file(output_file)
+                    out = open_text_file(temp_file, 'w', compression)
+                else:
+                    # 用空行分隔每个文件的处理结果
+                    out.write('\n\n')
+                out.write(section)
+                merged_files.append(srt_file)
+            if out is None or self.cancel_requested():
+                return
+            out.close()
+            if job.fsync == FSYNC_PER_FILE:
+                fsync_file(temp_file)
+
+            if output_file in existing:
+                if files_identical(temp_file, output_file, compression):
+                    # 内容与已有文件相同，不写入，保留原文件的修改时间
+                    result.unchanged.append(output_file)
+                    return
+                # 不覆盖时同样先检查内容是否相同；对比用的新内容只在需要时从临时文件读取开头部分
+                if write_policy is False or (write_policy is None and not self.should_write(
+                        job, output_file, lambda: read_text_preview(temp_file, MERGE_PREVIEW_CHARS, compression))):
+                    result.skipped_outputs.append(output_file)
+                    return
+            os.replace(temp_file, output_file)
+            if job.fsync == FSYNC_PER_FILE:
+                fsync_directory(os.path.dirname(output_file))
+        except (IOError, OSError, PermissionError) as write_error:
+            result.add_failure(output_file, f"写入合并文件失败: {str(write_error)}", kind='output')
+            return
+        finally:
+            if out is not None:
+                out.close()
+            if temp_file is not None and os.path.exists(temp_file):
+                os.remove(temp_file)
+
+        result.converted.extend(merged_files)
+        result.outputs.append(output_file)
+        for srt_file in merged_files:
+            self._emit('file_converted', path=srt_file, output=output_file)
+
+
+# 更新内容索引时每批提交的文件数（提交后这批文件即可被搜索到）
+CONTENT_INDEX_BATCH = 200
+
+# 少于这个字符数的查询无法使用trigram索引，改为逐行匹配
+CONTENT_INDEX_MIN_MATCH_CHARS = 3
+
+
+def _sqlite_regexp(pattern, text):
+    """SQLite的REGEXP运算符（不区分大小写，re模块会缓存编译结果）"""
+    return text is not None and re.search(pattern, text, re.IGNORECASE) is not None
+
+
+class ContentIndex:
+    """字幕内容全文索引
+
+    把每个SRT文件解析后的字幕文本保存在SQLite数据库中，记录文件大小和修改时间，
+    文件新增或变化时才重新解析。SQLite支持FTS5的trigram分词时建立全文索引，
+    不少于3个字符的查询（包括中文）直接走索引；不支持时退化为普通表逐行匹配，仍然不需要读取SRT文件。
+    update()可以在后台线程中执行，同时在界面线程中search()。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            self._open()
+        except sqlite3.DatabaseError:
+            # 索引文件损坏（或由不支持FTS5的SQLite打开）时重新建立
+            if self._db is not None:
+                self._db.close()
+            os.remove(path)
+            self._open()
+
+    def _open(self):
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.create_function('regexp', 2, _sqlite_regexp)
+        self._db.execute('CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, '
+                         'size INTEGER NOT NULL, mtime INTEGER NOT NULL)')
+        try:
+            self._db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS file_text USING fts5(text, tokenize='trigram')")
+            self.fts = True
+        except sqlite3.OperationalError:
+            self._db.execute('CREATE TABLE IF NOT EXISTS file_text (text TEXT NOT NULL)')
+            self.fts = False
+        self._db.execute('SELECT count(*) FROM file_text').fetchone()
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stale_files(self, paths):
+        """返回需要（重新）索引的文件：尚未索引，或大小、修改时间已变化"""
+        with self._lock:
+            known = {path: (size, mtime) for path, size, mtime in
+                     self._db.execute('SELECT path, size, mtime FROM files')}
+        stale = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(os.path.abspath(path)) != (stat.st_size, stat.st_mtime_ns):
+                stale.append(path)
+        return stale
+
+    def update(self, paths, engine=None, on_progress=None):
+        """重新索引新增或变化的文件，返回重新索引的文件数
+
+        engine用于（并行）解析，可以通过engine.cancel()中途停止；on_progress(已索引数, 总数)每提交一批调用一次。
+        解析失败的文件以空文本记录，文件变化前不会反复解析。
+        """
+        if engine is None:
+            engine = ConversionEngine()
+        stale = self.stale_files(paths)
+        records = []
+        done = 0
+        for srt_file, cues, error in engine.parse_many(stale):
+            try:
+                stat = os.stat(srt_file)
+            except OSError:
+                continue
+            text = '\n'.join(cues.texts) if cues else ''
+            records.append((os.path.abspath(srt_file), stat.st_size, stat.st_mtime_ns, text))
+            if len(records) >= CONTENT_INDEX_BATCH:
+                done += len(records)
+                self._store(records)
+                records = []
+                if on_progress is not None:
+                    on_progress(done, len(stale))
+        if records:
+            self._store(records)
+        return len(stale)
+
+    def _store(self, records):
+        """在一个事务中写入一批 (路径, 大小, 修改时间, 文本)"""
+        with self._lock, self._db:
+            for path, size, mtime, text in records:
+                row = self._db.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+                if row is None:
+                    file_id = self._db.execute('INSERT INTO files (path, size, mtime) VALUES (?, ?, ?)',
+                                               (path, size, mtime)).lastrowid
+                else:
+                    file_id = row[0]
+                    self._db.execute('UPDATE files SET size = ?, mtime = ? WHERE id = ?', (size, mtime, file_id))
+                    self._db.execute('DELETE FROM file_text WHERE rowid = ?', (file_id,))
+                self._db.execute('INSERT INTO file_text (rowid, text) VALUES (?, ?)', (file_id, text))
+
+    def search(self, query, regex=False):
+        """返回字幕内容包含query（不区分大小写）的文件绝对路径集合，正则表达式无效时抛出re.error"""
+        if regex:
+            re.compile(query)
+            condition, params = 'file_text.text REGEXP ?', (query,)
+        elif self.fts and len(query) >= CONTENT_INDEX_MIN_MATCH_CHARS:
+            # trigram分词下，带引号的短语查询就是子串匹配
+            condition, params = 'file_text MATCH ?', ('"%s"' % query.replace('"', '""'),)
+        else:
+            escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            condition, params = "file_text.text LIKE ? ESCAPE '\\'", ('%' + escaped + '%',)
+        with self._lock:
+            rows = self._db.execute('SELECT files.path FROM file_text JOIN files ON files.id = file_text.rowid '
+                                    'WHERE ' + condition, params).fetchall()
+        return {row[0] for row in rows}
+
+
+# 三字组索引查询时最多取多少个三字组求交集（其余交给逐个核实）
+TRIGRAM_MAX_INTERSECT = 4
+
+
+def regex_literals(pattern):
+    """提取正则表达式的每个匹配都必须包含的字面文本（小写），不足3个字符的不返回
+
+    只取最外层连续的普通字符，遇到分支、重复、分组、字符集等就中断，结果可能偏少但不会遗漏匹配。
+    有大小写之分的非ASCII字符也会中断（忽略大小写时可能对应多种写法）。
+    """
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error:
+        return []
+    
+    literals = []
+    run = []
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            char = chr(av)
+            if av < 128 or char.lower() == char.upper():
+                run.append(char.lower())
+                continue
+        if run:
+            literals.append(''.join(run))
+            run = []
+    if run:
+        literals.append(''.join(run))
+    return [literal for literal in literals if len(literal) >= 3]
+
+
+class TrigramIndex:
+    """文本的三字组倒排索引，用于快速找出可能包含某个子串的条目
+
+    条目用整数编号，每个三字组记录包含它的条目编号。查询时取子串中各三字组对应编号的交集作为候选，
+    候选仍需调用方逐个核实。删除的条目只从候选中排除，超过现有条目数时重建索引。
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings = {}
+        self._texts = {}
+        self._removed = 0
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, entry_id, text):
+        self._texts[entry_id] = text
+        postings = self._postings
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            ids = postings.get(gram)
+            if ids is None:
+                ids = postings[gram] = array('q')
+            ids.append(entry_id)
+
+    def discard(self, entry_id):
+        if self._texts.pop(entry_id, None) is None:
+            return
+        self._removed += 1
+        if self._removed > len(self._texts):
+            texts = self._texts
+            self.clear()
+            for entry_id, text in texts.items():
+                self.add(entry_id, text)
+
+    def candidates(self, literals):
+        """返回可能包含所有literals的条目编号集合；literals都不足3个字符时返回None（无法缩小范围）"""
+        grams = {literal[i:i + 3] for literal in literals for i in range(len(literal) - 2)}
+        if not grams:
+            return None
+        
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is None:
+                return set()
+            postings.append(ids)
+        
+        # 从最短的编号列表开始求交集，候选足够少之后剩下的交给调用方核实
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:TRIGRAM_MAX_INTERSECT]:
+            result.intersection_update(ids)
+        if self._removed:
+            texts = self._texts
+            result = {entry_id for entry_id in result if entry_id in texts}
+        return result
+
+
+class EntryMask(bytearray):
+    """按条目编号记录是否选中（或可见）的字节掩码，每个条目一个字节（0或1）
+
+    多个掩码之间的整体运算先转换为整数再按位计算，一次完成，不需要逐个条目循环。
+    参与运算的掩码长度必须相同。
+    """
+
+    def _value(self):
+        return int.from_bytes(self, 'little')
+
+    def _assign(self, value):
+        self[:] = value.to_bytes(len(self), 'little')
+
+    def ids(self):
+        """返回值为1的条目编号（从小到大）"""
+        return list(compress(range(len(self)), self))
+
+    def union_update(self, other):
+        self._assign(self._value() | other._value())
+
+    def difference_update(self, other):
+        value = self._value()
+        self._assign(value ^ (value & other._value()))
+
+    def symmetric_difference_update(self, other):
+        self._assign(self._value() ^ other._value())
+
+    def intersection(self, other):
+        result = EntryMask(len(self))
+        result._assign(self._value() & other._value())
+        return result
+
+    def difference(self, other):
+        result = EntryMask(self)
+        result.difference_update(other)
+        return result
+
+
+# 文件列表每行的高度、左右边距（像素）
+FILE_ROW_HEIGHT = 26
+FILE_ROW_PADX = 5
+
+# 文件列表行控件共用的绑定标签（鼠标滚轮）
+FILE_ROW_TAG = 'FileListRow'
+
+# 批量添加文件时每次界面空闲处理的文件数
+FILE_ADD_CHUNK_SIZE = 2000
+
+# 搜索框停止输入多久后开始搜索（毫秒）
+SEARCH_DEBOUNCE_MS = 150
+
+# 一次勾选变化或添加涉及的文件不超过这个数量时逐个移动到新位置，否则整体重新排序
+SORT_INCREMENTAL_LIMIT = 256
+
 
 class SRTToTXTConverter:
     def __init__(self, root):
@@ -20,9 +2359,29 @@ class SRTToTXTConverter:
         self.root.title("SRT字幕转TXT工具")
         self.root.geometry("650x710")  # 增加高度以容纳搜索框和新选项
         
-        # 存储文件信息：{文件路径: {'var': BooleanVar, 'frame': Frame}}
+        # 存储文件信息：{文件路径: {'folder': 文件夹, 'order': 添加顺序（同时是文件编号）, ...}}
         self.file_items = {}
         
+        # 按文件编号记录的勾选状态、是否在搜索结果中、是否仍在列表中（已删除的编号三者都为0）
+        self.selection = EntryMask()
+        self.visible_mask = EntryMask()
+        self.live_mask = EntryMask()
+        
+        # 文件列表视图：只为可见区域创建行控件，滚动时复用
+        self.sorted_paths = []  # 按当前排序方式排列的全部文件
+        self.display_order = []  # 当前显示的文件（排序后、经过搜索过滤）
+        self.list_rows = []  # 可复用的行控件
+        self.list_refresh_pending = False
+        
+        # 文件名搜索相关变量
+        self.sort_spec = (None, None, 'name_key')  # 当前排序方式：(勾选分组, 文件名升降序, 排序用的字段)
+        self.entry_paths = {}  # 文件编号（添加顺序）到路径
+        self.name_index = TrigramIndex()  # 文件名的三字组索引
+        self.path_index = TrigramIndex()  # 完整路径的三字组索引
+        self.search_after_id = None  # 等待执行的搜索
+        self.last_search = None  # 上一次普通文本搜索：(搜索的字段, 小写的搜索文本, 匹配的文件)
+        self.search_error = False  # 当前搜索条件是否为无效的正则表达式
+        
         # 文件覆盖选择状态：None=未选择, True=全部覆盖, False=全部不覆盖
         self.overwrite_all = None
         
@@ -40,7 +2399,7 @@ class SRTToTXTConverter:
         self.drag_start_y = None
         self.drag_rect = None
         self.is_dragging = False
-        self.drag_highlighted_items = set()  # 存储拖拽过程中高亮的文件项
+        self.drag_range = (0, 0)  # 拖拽过程中高亮的行在显示顺序中的范围 (起始, 结束)
         
         # 文件拖拽导入相关变量
         self.is_drag_over = False  # 是否有文件拖拽到区域上方
@@ -56,8 +2415,26 @@ class SRTToTXTConverter:
             "txt文本总结笔记": "对TXT文本文件内容进行智能总结，生成要点笔记"
         }
         
+        # 后台转换相关变量
+        self.conversion_engine = None  # 正在运行的转换引擎，None表示没有转换在进行
+        self.conversion_queue = queue.Queue()  # 后台转换线程发给界面线程的消息
+        self.conversion_result_handler = None  # 转换结束后显示结果的方法
+        self.conversion_started_at = None
+        
+        # 字幕内容搜索相关变量
+        self.content_index = None  # 字幕内容全文索引，第一次使用时打开
+        self.content_index_thread = None  # 正在更新索引的后台线程
+        self.content_index_progress = None  # 后台线程报告的 (已索引数, 总数)
+        self.content_index_changed = 0  # 本次更新重新索引的文件数
+        self.content_index_pending = False  # 更新过程中又有新文件，结束后需要再更新一次
+        self.content_index_after_id = None
+        self.content_search_hits = None  # 最近一次内容搜索命中的文件（绝对路径）
+        
         # 创建GUI界面
         self.create_widgets()
+        
+        # 关闭窗口时停止正在进行的转换
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def create_widgets(self):
         # 主框架
@@ -131,6 +2508,15 @@ class SRTToTXTConverter:
         self.process_search_only_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(search_frame, text="只处理搜索结果", variable=self.process_search_only_var).pack(side=tk.RIGHT, padx=(0, 10))
         
+        # 搜索字幕内容选项（使用持久化的全文索引）
+        self.content_search_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="搜索字幕内容", variable=self.content_search_var,
+                       command=self.on_content_search_changed).pack(side=tk.RIGHT, padx=(0, 10))
+        
+        # 字幕索引进度
+        self.content_index_label = ttk.Label(search_frame, text="", foreground="gray")
+        self.content_index_label.pack(side=tk.LEFT, padx=(10, 0))
+        
         # 文件列表显示区域
         # 根据是否支持拖拽功能显示不同的标题
         if HAS_DND:
@@ -140,24 +2526,19 @@ class SRTToTXTConverter:
         list_frame = ttk.LabelFrame(main_frame, text=list_title, padding="10")
         list_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         
-        # 创建滚动区域
+        # 创建滚动区域：Canvas上只放可见的几行，滚动时把行控件重新绑定到新的文件
         canvas = tk.Canvas(list_frame, height=200)
         scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
-        self.scrollable_frame = ttk.Frame(canvas)
         
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.configure(yscrollcommand=self.on_list_yview)
+        canvas.bind("<Configure>", self.on_list_resized)
         
         canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
         # 存储canvas引用以便后续使用
         self.canvas = canvas
+        self.list_scrollbar = scrollbar
         
         # 绑定拖拽框选事件
         canvas.bind("<Button-1>", self.on_drag_start)
@@ -175,12 +2556,6 @@ class SRTToTXTConverter:
             except Exception as e:
                 print(f"拖拽功能初始化失败: {e}")
         
-        # 绑定点击事件来清除选中状态（在scrollable_frame上）
-        def clear_selection_on_click(event):
-            self.clear_selected_file()
-        
-        self.scrollable_frame.bind("<Button-1>", clear_selection_on_click)
-        
         # 绑定鼠标滚轮事件
         self.bind_mousewheel(canvas)
         
@@ -194,10 +2569,11 @@ class SRTToTXTConverter:
         self.root.bind("<Control-v>", self.on_paste_files)
         self.root.bind("<Control-V>", self.on_paste_files)
         
+        # 窗口重新获得焦点时字幕文件可能已在其他程序中修改过，检查字幕索引是否需要更新
+        self.root.bind("<FocusIn>", self.on_window_focus)
+        
         # 绑定Canvas右键菜单事件
         canvas.bind("<Button-3>", self.show_canvas_context_menu)
-        # 也给scrollable_frame绑定右键事件，确保空白区域都能响应
-        self.scrollable_frame.bind("<Button-3>", self.show_canvas_context_menu)
         
         # 全选/取消全选按钮和显示选项
         select_frame = ttk.Frame(list_frame)
@@ -262,9 +2638,21 @@ class SRTToTXTConverter:
         
         # 输出模式选择
         self.output_mode = tk.StringVar(value="separate")
-        ttk.Radiobutton(option_frame, text="输出对应文件（每个SRT对应一个TXT）",
+        separate_frame = ttk.Frame(option_frame)
+        separate_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        
+        ttk.Radiobutton(separate_frame, text="输出对应文件（每个SRT对应一个TXT）",
                        variable=self.output_mode, value="separate",
-                       command=self.on_output_mode_changed).grid(row=0, column=0, sticky=tk.W)
+                       command=self.on_output_mode_changed).pack(side=tk.LEFT)
+        
+        # 打包输出选项（放在输出对应文件右边，只在该模式下显示）
+        self.archive_output_var = tk.BooleanVar(value=False)
+        self.archive_output_checkbox = ttk.Checkbutton(
+            separate_frame,
+            text="打包为一个压缩文件（zip/tar）",
+            variable=self.archive_output_var
+        )
+        self.archive_output_checkbox.pack(side=tk.LEFT, padx=(20, 0))
         
         # 合成输出选项行
         merge_frame = ttk.Frame(option_frame)
@@ -294,9 +2682,26 @@ class SRTToTXTConverter:
         # 初始状态下不显示
         self.merge_by_folder_checkbox.pack_forget()
         
+        # 合成输出的压缩选项（放在按文件夹合并选项右边，初始隐藏）
+        self.merge_compress_var = tk.StringVar(value=MERGE_COMPRESS_LABELS[0][0])
+        self.merge_compress_frame = ttk.Frame(merge_frame)
+        ttk.Label(self.merge_compress_frame, text="压缩：").pack(side=tk.LEFT)
+        ttk.Combobox(self.merge_compress_frame, textvariable=self.merge_compress_var, state="readonly", width=10,
+                     values=[label for label, _ in MERGE_COMPRESS_LABELS]).pack(side=tk.LEFT)
+        # 初始状态下不显示
+        self.merge_compress_frame.pack_forget()
+        
+        # 导出字幕记录选项行
+        export_frame = ttk.Frame(option_frame)
+        export_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        
+        ttk.Radiobutton(export_frame, text="导出字幕记录（JSONL / SQLite，每条字幕一条记录）",
+                       variable=self.output_mode, value="export",
+                       command=self.on_output_mode_changed).pack(side=tk.LEFT)
+        
         # 输出文件夹选项
         output_folder_frame = ttk.Frame(option_frame)
-        output_folder_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        output_folder_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
         
         # 输出到同一个文件夹里选项
         self.output_to_same_folder_var = tk.BooleanVar(value=False)
@@ -310,9 +2715,14 @@ class SRTToTXTConverter:
         self.select_output_folder_btn.pack(side=tk.LEFT, padx=(10, 0))
         self.select_output_folder_btn.config(state=tk.DISABLED)  # 初始禁用
         
+        # 增量转换选项：源文件和选项都未变化时跳过
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(output_folder_frame, text="增量转换（跳过未变化的文件）",
+                       variable=self.incremental_var).pack(side=tk.LEFT, padx=(20, 0))
+        
         # 输出文件夹路径显示
         output_path_frame = ttk.Frame(option_frame)
-        output_path_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        output_path_frame.grid(row=4, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
         
         ttk.Label(output_path_frame, text="输出文件夹：").pack(side=tk.LEFT)
         self.output_folder_label = ttk.Label(output_path_frame, text="未选择", foreground="gray")
@@ -322,8 +2732,18 @@ class SRTToTXTConverter:
         convert_frame = ttk.Frame(main_frame)
         convert_frame.grid(row=5, column=0, columnspan=2, pady=(10, 0))
         
-        ttk.Button(convert_frame, text="转换选中文件",
-                  command=self.convert_selected_files, style="Accent.TButton").pack()
+        self.convert_button = ttk.Button(convert_frame, text="转换选中文件",
+                                         command=self.convert_selected_files, style="Accent.TButton")
+        self.convert_button.pack()
+        
+        # 转换进度（只在转换过程中显示）
+        self.progress_frame = ttk.Frame(convert_frame)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, orient=tk.HORIZONTAL,
+                                            length=450, mode="determinate")
+        self.progress_bar.pack(side=tk.LEFT)
+        self.cancel_button = ttk.Button(self.progress_frame, text="取消", command=self.cancel_conversion)
+        self.cancel_button.pack(side=tk.LEFT, padx=(10, 0))
+        self.progress_label = ttk.Label(convert_frame, text="", foreground="gray")
         
         # 配置网格权重
         self.root.columnconfigure(0, weight=1)
@@ -333,17 +2753,35 @@ class SRTToTXTConverter:
         list_frame.columnconfigure(0, weight=1)
         list_frame.rowconfigure(0, weight=1)
     
+    def on_close(self):
+        """关闭窗口"""
+        if self.conversion_engine is not None:
+            self.conversion_engine.cancel()
+        self.root.destroy()
+    
     def on_output_mode_changed(self):
         """输出模式变化时的回调"""
         if self.output_mode.get() == "merge":
             # 显示合成输出文件名显示选项（在合成输出右边）
             self.show_merge_path_checkbox.pack(side=tk.LEFT, padx=(20, 0))
             self.merge_by_folder_checkbox.pack(side=tk.LEFT, padx=(20, 0))
+            self.merge_compress_frame.pack(side=tk.LEFT, padx=(20, 0))
+            # 隐藏打包输出选项
+            self.archive_output_checkbox.pack_forget()
+            self.archive_output_var.set(False)
         else:
             # 隐藏合成输出文件名显示选项
             self.show_merge_path_checkbox.pack_forget()
             self.merge_by_folder_checkbox.pack_forget()
             self.merge_by_folder_var.set(False)
+            self.merge_compress_frame.pack_forget()
+            self.merge_compress_var.set(MERGE_COMPRESS_LABELS[0][0])
+            if self.output_mode.get() == "separate":
+                self.archive_output_checkbox.pack(side=tk.LEFT, padx=(20, 0))
+            else:
+                # 导出字幕记录时不使用打包输出
+                self.archive_output_checkbox.pack_forget()
+                self.archive_output_var.set(False)
     
     def on_output_folder_changed(self):
         """输出文件夹选项变化时的回调"""
@@ -376,84 +2814,174 @@ class SRTToTXTConverter:
             filetypes=[("SRT文件", "*.srt"), ("所有文件", "*.*")]
         )
         
-        for file in files:
-            if file not in self.file_items:
-                # 对于单独选择的文件，文件夹路径就是文件所在目录
-                folder_path = os.path.dirname(file)
-                self.add_file_item(file, folder_path)
+        if files:
+            self.add_file_items(files)
     
     def select_folder(self):
         """选择文件夹并获取其中所有SRT文件"""
         folder = filedialog.askdirectory(title="选择包含SRT文件的文件夹")
         
         if folder:
-            srt_files = []
+            recursive = self.recursive_var.get()
             
-            if self.recursive_var.get():
-                # 递归搜索子文件夹
-                for root, dirs, files in os.walk(folder):
-                    for file in files:
+            def iter_srt_files():
+                if recursive:
+                    # 递归搜索子文件夹
+                    for root, dirs, files in os.walk(folder):
+                        for file in files:
+                            if file.lower().endswith('.srt'):
+                                yield os.path.join(root, file)
+                else:
+                    # 只搜索当前文件夹
+                    for file in os.listdir(folder):
                         if file.lower().endswith('.srt'):
-                            full_path = os.path.join(root, file)
-                            if full_path not in self.file_items:
-                                srt_files.append(full_path)
-                                self.add_file_item(full_path, root)  # 传递文件夹路径
-            else:
-                # 只搜索当前文件夹
-                for file in os.listdir(folder):
-                    if file.lower().endswith('.srt'):
-                        full_path = os.path.join(folder, file)
-                        if full_path not in self.file_items:
-                            srt_files.append(full_path)
-                            self.add_file_item(full_path, folder)  # 传递文件夹路径
+                            yield os.path.join(folder, file)
             
-            if srt_files:
-                search_type = "递归搜索" if self.recursive_var.get() else "当前文件夹"
-                messagebox.showinfo("成功", f"通过{search_type}找到并添加了 {len(srt_files)} 个SRT文件")
-            else:
-                search_type = "递归搜索" if self.recursive_var.get() else "当前文件夹"
-                messagebox.showwarning("警告", f"通过{search_type}没有找到新的SRT文件")
+            def report(added_count):
+                search_type = "递归搜索" if recursive else "当前文件夹"
+                if added_count:
+                    messagebox.showinfo("成功", f"通过{search_type}找到并添加了 {added_count} 个SRT文件")
+                else:
+                    messagebox.showwarning("警告", f"通过{search_type}没有找到新的SRT文件")
+            
+            # 边搜索边添加，大文件夹也不会卡住界面
+            self.add_file_items(iter_srt_files(), on_done=report)
+    
+    def add_file_items(self, paths, on_done=None):
+        """批量添加文件，已在列表中的文件会被跳过
+        
+        paths可以是生成器（例如边遍历文件夹边产出）。每次界面空闲时添加一批，
+        批与批之间界面照常响应；全部添加后只排序和过滤一次，然后调用on_done(添加的文件数)。
+        """
+        paths = iter(paths)
+        added_paths = []
+        
+        def add_chunk():
+            taken = 0
+            for file_path in islice(paths, FILE_ADD_CHUNK_SIZE):
+                taken += 1
+                if file_path not in self.file_items:
+                    self.insert_file_item(file_path)
+                    added_paths.append(file_path)
+            added_count = len(added_paths)
+            
+            if taken == FILE_ADD_CHUNK_SIZE:
+                # 还有剩余的文件：先显示已添加的部分，下次空闲时继续
+                self.search_status_label.config(text=f"正在添加文件：已添加 {added_count} 个", foreground="gray")
+                self.refresh_file_list()
+                self.root.after_idle(add_chunk)
+                return
+            
+            if added_count:
+                self.place_added_files(added_paths)
+                if self.content_search_var.get():
+                    self.schedule_content_index()
+            self.filter_file_list()
+            if on_done is not None:
+                on_done(added_count)
+        
+        self.root.after_idle(add_chunk)
+    
+    def place_added_files(self, added_paths):
+        """把刚添加到列表末尾的文件移到排序位置
+        
+        文件不多时逐个二分插入，不必重新计算所有文件的排序键；大批导入（或添加期间列表已重新排序）时整体重新排序。
+        """
+        count = len(added_paths)
+        sorted_start = len(self.sorted_paths) - count
+        visible_paths = [file_path for file_path in added_paths
+                         if self.visible_mask[self.file_items[file_path]['order']]]
+        display_start = len(self.display_order) - len(visible_paths)
+        if (count > SORT_INCREMENTAL_LIMIT or self.sorted_paths[sorted_start:] != added_paths
+                or self.display_order[display_start:] != visible_paths):
+            self.sort_file_list()
+            return
+        
+        del self.sorted_paths[sorted_start:]
+        del self.display_order[display_start:]
+        for file_path in added_paths:
+            self.insert_sorted_entry(file_path)
+    
+    def insert_file_item(self, file_path, folder_path=None):
+        """记录文件项并放到列表末尾，不刷新界面"""
+        # 存储文件信息，包括文件夹路径和原始顺序
+        self.file_items[file_path] = {
+            'folder': folder_path or os.path.dirname(file_path),  # 存储文件夹路径
+            'order': self.file_order_counter,  # 存储原始添加顺序
+            # 预先计算搜索用的小写文本（文件名和完整路径）
+            'name_key': os.path.basename(file_path).lower(),
+            'path_key': os.path.normpath(file_path).lower(),
+            # 字幕内容索引按绝对路径记录
+            'abs_path': os.path.abspath(file_path)
+        }
+        
+        # 加入三字组索引，文件编号就是添加顺序
+        item_info = self.file_items[file_path]
+        self.selection.append(1)  # 默认选中
+        self.visible_mask.append(1)
+        self.live_mask.append(1)
+        self.entry_paths[item_info['order']] = file_path
+        self.name_index.add(item_info['order'], item_info['name_key'])
+        self.path_index.add(item_info['order'], item_info['path_key'])
+        
+        # 文件集合变化后，不能再在上次的搜索结果中继续筛选
+        self.last_search = None
+        
+        # 增加顺序计数器
+        self.file_order_counter += 1
+        
+        # 新文件显示在列表末尾，调用方需要时再重新排序和过滤
+        item_info['sort_key'] = self.sort_key_for(item_info)
+        self.sorted_paths.append(file_path)
+        self.display_order.append(file_path)
+    
+    def display_text_for(self, file_path):
+        """文件在列表中显示的文本"""
+        if self.show_folder_path_var.get():
+            # 显示绝对路径，确保使用正确的路径分隔符
+            return os.path.normpath(file_path)
+        return os.path.basename(file_path)  # 只显示文件名
     
-    def add_file_item(self, file_path, folder_path=None):
-        """添加文件项到列表"""
-        # 创建复选框变量
-        var = tk.BooleanVar(value=True)  # 默认选中
+    def create_list_row(self):
+        """创建一个可复用的文件行控件"""
+        row = {'path': None, 'index': None, 'text': None, 'checked': None, 'highlight': None}
         
         # 创建文件项框架
-        item_frame = ttk.Frame(self.scrollable_frame)
-        item_frame.pack(fill=tk.X, padx=5, pady=2)
+        item_frame = ttk.Frame(self.canvas)
         
         # 配置框架的列权重，让文本可以扩展
         item_frame.columnconfigure(1, weight=1)
         
-        # 创建复选框（不包含文本）
-        checkbox = ttk.Checkbutton(item_frame, variable=var)
-        checkbox.grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        # 创建复选框（不包含文本），变量只反映当前绑定的文件，点击后写回勾选状态
+        row['var'] = tk.BooleanVar(value=False)
         
-        # 创建文件名标签，支持自动换行和工具提示
-        # 根据显示选项决定显示内容
-        if self.show_folder_path_var.get():
-            # 显示完整路径，确保使用正确的路径分隔符
-            display_text = os.path.normpath(file_path)
-        else:
-            display_text = os.path.basename(file_path)  # 只显示文件名
+        def on_checkbox_clicked():
+            if row['path'] in self.file_items:
+                entry_id = self.file_items[row['path']]['order']
+                self.selection[entry_id] = row['var'].get()
+                self.on_files_checked([entry_id])
         
+        checkbox = ttk.Checkbutton(item_frame, variable=row['var'], command=on_checkbox_clicked)
+        checkbox.grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        
+        # 创建文件名标签（单行显示，完整路径见工具提示）
         file_label = tk.Label(
             item_frame,
-            text=display_text,
             anchor=tk.W,
             justify=tk.LEFT,
-            wraplength=700,  # 增加换行宽度以适应路径
             bg=self.root.cget('bg')  # 使用窗口背景色
         )
         file_label.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 5))
         
         # 添加工具提示显示完整路径，确保使用正确的路径分隔符
-        self.create_tooltip(file_label, os.path.normpath(file_path))
+        self.create_tooltip(file_label, lambda: os.path.normpath(row['path'] or ''))
         
         # 绑定标签点击事件来切换复选框状态
         def toggle_checkbox(event):
-            var.set(not var.get())
+            if row['path'] in self.file_items:
+                entry_id = self.file_items[row['path']]['order']
+                self.selection[entry_id] ^= 1
+                self.on_files_checked([entry_id])
             # 左键点击时清除选中状态
             self.clear_selected_file()
         
@@ -461,28 +2989,117 @@ class SRTToTXTConverter:
         
         # 绑定右键菜单
         def show_context_menu(event):
-            self.show_file_context_menu(event, file_path)
+            if row['path'] in self.file_items:
+                self.show_file_context_menu(event, row['path'])
         
         file_label.bind("<Button-3>", show_context_menu)  # 右键点击
         
-        # 存储文件信息，包括文件夹路径和原始顺序
-        self.file_items[file_path] = {
-            'var': var,
-            'frame': item_frame,
-            'checkbox': checkbox,
-            'label': file_label,
-            'folder': folder_path or os.path.dirname(file_path),  # 存储文件夹路径
-            'order': self.file_order_counter  # 存储原始添加顺序
-        }
-        
-        # 增加顺序计数器
-        self.file_order_counter += 1
-        
-        # 更新滚动区域
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # 行内空白处可以开始拖拽框选
+        item_frame.bind("<Button-1>", self.on_drag_start)
+        item_frame.bind("<B1-Motion>", self.on_drag_motion)
+        item_frame.bind("<ButtonRelease-1>", self.on_drag_end)
+        item_frame.bind("<Button-3>", self.show_canvas_context_menu)
+        
+        # 鼠标在行上时也能滚动列表
+        for widget in (item_frame, checkbox, file_label):
+            widget.bindtags((FILE_ROW_TAG,) + widget.bindtags())
+        
+        row['frame'] = item_frame
+        row['checkbox'] = checkbox
+        row['label'] = file_label
+        row['window'] = self.canvas.create_window(
+            FILE_ROW_PADX, 0, window=item_frame, anchor="nw",
+            width=max(self.canvas.winfo_width() - 2 * FILE_ROW_PADX, 1), height=FILE_ROW_HEIGHT - 4)
+        self.list_rows.append(row)
+        return row
+    
+    def schedule_list_refresh(self):
+        """在界面空闲时刷新文件列表（连续添加多个文件时只刷新一次）"""
+        if not self.list_refresh_pending:
+            self.list_refresh_pending = True
+            self.root.after_idle(self.refresh_file_list)
+    
+    def refresh_file_list(self):
+        """更新滚动区域并重新绑定可见行"""
+        self.list_refresh_pending = False
+        width = self.canvas.winfo_width()
+        self.canvas.configure(scrollregion=(0, 0, width, len(self.display_order) * FILE_ROW_HEIGHT))
+        self.refresh_visible_rows()
+    
+    def rebuild_display_order(self, display_order=None):
+        """按排序结果和搜索结果重新生成显示顺序（display_order为已按排序排列的可见文件时直接使用）"""
+        if display_order is None:
+            file_items = self.file_items
+            visible_mask = self.visible_mask
+            display_order = [path for path in self.sorted_paths if visible_mask[file_items[path]['order']]]
+        self.display_order = display_order
+        self.refresh_file_list()
+    
+    def refresh_visible_rows(self, force=False):
+        """把行控件绑定到当前可见的文件；force为True时重新设置每行的文本"""
+        first = max(int(self.canvas.canvasy(0)) // FILE_ROW_HEIGHT, 0)
+        last = min(first + self.canvas.winfo_height() // FILE_ROW_HEIGHT + 2, len(self.display_order))
+        
+        while len(self.list_rows) < last - first:
+            self.create_list_row()
+        
+        for offset, row in enumerate(self.list_rows):
+            index = first + offset
+            if index >= last:
+                if row['path'] is not None:
+                    self.canvas.itemconfigure(row['window'], state='hidden')
+                    row['path'] = None
+                    row['index'] = None
+                continue
+            
+            file_path = self.display_order[index]
+            if row['path'] is None:
+                self.canvas.itemconfigure(row['window'], state='normal')
+            # 只移动位置变化的行
+            if index != row['index']:
+                self.canvas.coords(row['window'], FILE_ROW_PADX, index * FILE_ROW_HEIGHT + 2)
+                row['index'] = index
+            row['path'] = file_path
+            self.render_list_row(row, force)
+    
+    def render_list_row(self, row, force=False):
+        """设置行控件的复选框、文本和高亮状态（只修改有变化的部分）"""
+        file_path = row['path']
+        checked = bool(self.selection[self.file_items[file_path]['order']])
+        if force or checked != row['checked']:
+            row['var'].set(checked)
+            row['checked'] = checked
+        
+        text = self.display_text_for(file_path)
+        if force or text != row['text']:
+            row['label'].configure(text=text)
+            row['text'] = text
+        
+        first, last = self.drag_range
+        highlight = file_path == self.selected_file or first <= row['index'] < last
+        if force or highlight != row['highlight']:
+            if highlight:
+                row['frame'].configure(relief=tk.SOLID, borderwidth=2)
+                row['label'].configure(bg='lightblue')
+            else:
+                row['frame'].configure(relief=tk.FLAT, borderwidth=0)
+                row['label'].configure(bg=self.root.cget('bg'))
+            row['highlight'] = highlight
+    
+    def on_list_yview(self, first, last):
+        """Canvas视图变化（滚动、缩放）时更新滚动条和可见行"""
+        self.list_scrollbar.set(first, last)
+        self.refresh_visible_rows()
+    
+    def on_list_resized(self, event):
+        """Canvas大小变化时调整行宽"""
+        width = max(event.width - 2 * FILE_ROW_PADX, 1)
+        for row in self.list_rows:
+            self.canvas.itemconfigure(row['window'], width=width)
+        self.refresh_file_list()
     
     def create_tooltip(self, widget, text):
-        """为控件创建工具提示"""
+        """为控件创建工具提示（text也可以是返回文本的函数，在显示时调用）"""
         def on_enter(event):
             tooltip = tk.Toplevel()
             tooltip.wm_overrideredirect(True)
@@ -490,7 +3107,7 @@ class SRTToTXTConverter:
             
             label = tk.Label(
                 tooltip,
-                text=text,
+                text=text() if callable(text) else text,
                 background="lightyellow",
                 relief="solid",
                 borderwidth=1,
@@ -538,25 +3155,13 @@ class SRTToTXTConverter:
         canvas.bind('<Enter>', bind_to_mousewheel)
         canvas.bind('<Leave>', unbind_from_mousewheel)
         
-        # 同时为scrollable_frame绑定事件，确保在内容区域也能滚动
-        def bind_frame_mousewheel(event):
-            canvas.bind_all("<MouseWheel>", on_mousewheel)
-            canvas.bind_all("<Button-4>", on_mousewheel)
-            canvas.bind_all("<Button-5>", on_mousewheel)
-        
-        def unbind_frame_mousewheel(event):
-            canvas.unbind_all("<MouseWheel>")
-            canvas.unbind_all("<Button-4>")
-            canvas.unbind_all("<Button-5>")
-        
-        self.scrollable_frame.bind('<Enter>', bind_frame_mousewheel)
-        self.scrollable_frame.bind('<Leave>', unbind_frame_mousewheel)
+        # 同时为文件行控件绑定滚轮事件，确保在内容区域也能滚动
+        canvas.bind_class(FILE_ROW_TAG, "<MouseWheel>", on_mousewheel)
+        canvas.bind_class(FILE_ROW_TAG, "<Button-4>", on_mousewheel)
+        canvas.bind_class(FILE_ROW_TAG, "<Button-5>", on_mousewheel)
     
     def on_show_path_changed(self):
         """显示路径选项变化时的回调"""
-        # 更新所有文件项的显示文本
-        for file_path, item_info in self.file_items.items():
-            self.update_file_display_text(file_path, item_info)
         # 重新执行排序（因为排序依据可能发生变化）
         self.sort_file_list()
         # 重新应用搜索过滤
@@ -652,107 +3257,201 @@ class SRTToTXTConverter:
             self._updating_sort_options = False
     
     def sort_file_list(self):
-        """根据选择的排序方式对文件列表进行排序，实现分层排序逻辑"""
+        """根据选择的排序方式对文件列表进行排序，实现分层排序逻辑
+        
+        每个文件的排序键 (勾选分组, 文件名或路径, 添加顺序) 预先算好保存在sort_key中，
+        之后添加少量文件或勾选状态变化时只需二分查找新位置，不必整体重新排序。
+        """
+        # 检查是否选择了勾选状态排序：先按勾选状态分组
+        if self.sort_checked_first_var.get():
+            partition = 'checked'
+        elif self.sort_unchecked_first_var.get():
+            partition = 'unchecked'
+        else:
+            partition = None
         
-        # 获取所有文件项
-        all_items = list(self.file_items.items())
+        # 检查是否选择了文件名排序：在每个组内按文件名（显示路径时按绝对路径）排序
+        if self.sort_name_asc_var.get():
+            name_order = 'asc'
+        elif self.sort_name_desc_var.get():
+            name_order = 'desc'
+        else:
+            name_order = None
         
-        # 检查是否选择了勾选状态排序
-        has_checked_sort = self.sort_checked_first_var.get() or self.sort_unchecked_first_var.get()
-        # 检查是否选择了文件名排序
-        has_name_sort = self.sort_name_asc_var.get() or self.sort_name_desc_var.get()
+        self.sort_spec = (partition, name_order, 'path_key' if self.show_folder_path_var.get() else 'name_key')
+        for item_info in self.file_items.values():
+            item_info['sort_key'] = self.sort_key_for(item_info)
         
-        if has_checked_sort and has_name_sort:
-            # 分层排序：先按勾选状态分组，然后在每个组内按文件名排序
-            
-            # 分离已勾选和未勾选的文件
-            checked_items = []
-            unchecked_items = []
-            
-            for file_path, item_info in all_items:
-                if item_info['var'].get():
-                    checked_items.append((file_path, item_info))
-                else:
-                    unchecked_items.append((file_path, item_info))
-            
-            # 定义文件名排序函数
-            def sort_by_filename(items):
-                if self.sort_name_asc_var.get():
-                    # 文件名升序
-                    if self.show_folder_path_var.get():
-                        # 按绝对路径排序
-                        return sorted(items, key=lambda x: (x[0].lower(), x[1]['order']))
-                    else:
-                        # 按文件名排序
-                        return sorted(items, key=lambda x: (os.path.basename(x[0]).lower(), x[1]['order']))
-                elif self.sort_name_desc_var.get():
-                    # 文件名降序
-                    if self.show_folder_path_var.get():
-                        # 按绝对路径排序
-                        return sorted(items, key=lambda x: (x[0].lower(), x[1]['order']), reverse=True)
-                    else:
-                        # 按文件名排序
-                        return sorted(items, key=lambda x: (os.path.basename(x[0]).lower(), x[1]['order']), reverse=True)
-                else:
-                    # 如果没有文件名排序，按原序列排序
-                    return sorted(items, key=lambda x: x[1]['order'])
+        # 按新的顺序重新显示文件项（上次的搜索结果顺序随之失效）
+        self.sorted_paths = self.sort_paths(self.file_items)
+        self.last_search = None
+        self.rebuild_display_order()
+    
+    def sort_key_for(self, item_info):
+        """按当前排序方式计算文件的排序键：(勾选分组, 文件名或路径, 添加顺序)，没有对应排序时该项为常量"""
+        partition, name_order, field = self.sort_spec
+        group = 0
+        if partition is not None:
+            # 排在前面的一组为0
+            group = 0 if bool(self.selection[item_info['order']]) == (partition == 'checked') else 1
+        text = item_info[field] if name_order is not None else ''
+        return (group, text, item_info['order'])
+    
+    def sort_paths(self, paths):
+        """按文件的排序键排列paths"""
+        file_items = self.file_items
+        if self.sort_spec[1] == 'desc':
+            # 组内文件名降序：先整体降序排列，再按分组稳定排序
+            ordered = sorted(paths, key=lambda path: file_items[path]['sort_key'][1:], reverse=True)
+            ordered.sort(key=lambda path: file_items[path]['sort_key'][0])
+            return ordered
+        return sorted(paths, key=lambda path: file_items[path]['sort_key'])
+    
+    def sorted_position(self, paths, key):
+        """二分查找排序键key在已按当前排序排列的paths中的插入位置"""
+        file_items = self.file_items
+        descending = self.sort_spec[1] == 'desc'
+        lo, hi = 0, len(paths)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = file_items[paths[mid]]['sort_key']
+            if other[0] != key[0]:
+                before = other[0] < key[0]
+            elif descending:
+                before = other[1:] > key[1:]
+            else:
+                before = other[1:] < key[1:]
+            if before:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def insert_sorted_entry(self, file_path):
+        """把文件按排序键插入到排序结果中，可见时同时插入显示顺序"""
+        item_info = self.file_items[file_path]
+        key = item_info['sort_key']
+        self.sorted_paths.insert(self.sorted_position(self.sorted_paths, key), file_path)
+        if self.visible_mask[item_info['order']]:
+            self.display_order.insert(self.sorted_position(self.display_order, key), file_path)
+    
+    def remove_sorted_entry(self, file_path):
+        """从排序结果和显示顺序中移除文件（按排序键二分查找）"""
+        item_info = self.file_items[file_path]
+        lists = [self.sorted_paths]
+        if self.visible_mask[item_info['order']]:
+            lists.append(self.display_order)
+        for paths in lists:
+            index = self.sorted_position(paths, item_info['sort_key'])
+            if index >= len(paths) or paths[index] != file_path:
+                # 列表顺序与排序键不一致时（例如批量添加尚未完成）退回到线性查找
+                index = paths.index(file_path)
+            del paths[index]
+    
+    def on_files_checked(self, entry_ids):
+        """勾选状态变化后的回调：更新显示的行；按勾选状态分组排序时，把这些文件移到所属分组中的位置"""
+        if self.sort_spec[0] is not None and entry_ids:
+            if len(entry_ids) > SORT_INCREMENTAL_LIMIT:
+                self.sort_file_list()
+                return
             
-            # 对每个组内的文件按文件名排序
-            sorted_checked = sort_by_filename(checked_items)
-            sorted_unchecked = sort_by_filename(unchecked_items)
+            for entry_id in entry_ids:
+                file_path = self.entry_paths[entry_id]
+                item_info = self.file_items[file_path]
+                key = self.sort_key_for(item_info)
+                if key != item_info['sort_key']:
+                    self.remove_sorted_entry(file_path)
+                    item_info['sort_key'] = key
+                    self.insert_sorted_entry(file_path)
             
-            # 根据勾选状态排序选项决定最终顺序
-            if self.sort_checked_first_var.get():
-                # 已勾选优先：已勾选文件在前，未勾选文件在后
-                sorted_items = sorted_checked + sorted_unchecked
-            else:  # self.sort_unchecked_first_var.get()
-                # 未勾选优先：未勾选文件在前，已勾选文件在后
-                sorted_items = sorted_unchecked + sorted_checked
-                
-        elif has_checked_sort:
-            # 仅按勾选状态排序
-            if self.sort_checked_first_var.get():
-                # 已勾选优先
-                sorted_items = sorted(all_items, key=lambda x: (0 if x[1]['var'].get() else 1, x[1]['order']))
-            else:  # self.sort_unchecked_first_var.get()
-                # 未勾选优先
-                sorted_items = sorted(all_items, key=lambda x: (1 if x[1]['var'].get() else 0, x[1]['order']))
-                
-        elif has_name_sort:
-            # 仅按文件名排序
-            if self.sort_name_asc_var.get():
-                # 文件名升序
-                if self.show_folder_path_var.get():
-                    # 按绝对路径排序
-                    sorted_items = sorted(all_items, key=lambda x: (x[0].lower(), x[1]['order']))
-                else:
-                    # 按文件名排序
-                    sorted_items = sorted(all_items, key=lambda x: (os.path.basename(x[0]).lower(), x[1]['order']))
-            else:  # self.sort_name_desc_var.get()
-                # 文件名降序
-                if self.show_folder_path_var.get():
-                    # 按绝对路径排序
-                    sorted_items = sorted(all_items, key=lambda x: (x[0].lower(), x[1]['order']), reverse=True)
-                else:
-                    # 按文件名排序
-                    sorted_items = sorted(all_items, key=lambda x: (os.path.basename(x[0]).lower(), x[1]['order']), reverse=True)
-                
-        else:
-            # 原序列排序
-            sorted_items = sorted(all_items, key=lambda x: x[1]['order'])
+            # 上次搜索结果的顺序已经变化
+            self.last_search = None
+        
+        # 只有正在显示的行需要更新复选框
+        self.refresh_visible_rows()
+    
+    def on_search_changed(self, *args):
+        """搜索框内容变化时的回调"""
+        # 连续输入时只在停下来后搜索一次
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.filter_file_list)
+    
+    def flush_pending_search(self):
+        """立即执行等待中的搜索，使过滤结果与搜索框一致"""
+        if self.search_after_id is not None:
+            self.filter_file_list()
+    
+    def on_content_search_changed(self):
+        """搜索字幕内容选项变化时的回调"""
+        if self.content_search_var.get():
+            if self.content_index is None:
+                try:
+                    self.content_index = ContentIndex(CONTENT_INDEX_PATH)
+                except (OSError, sqlite3.Error) as e:
+                    self.content_search_var.set(False)
+                    messagebox.showerror("错误", f"无法打开字幕索引：{str(e)}")
+                    return
+            self.update_content_index()
+        self.filter_file_list()
+    
+    def on_window_focus(self, event):
+        """窗口获得焦点时的回调（子控件获得焦点时也会触发，只处理窗口本身）"""
+        if event.widget is self.root and self.content_search_var.get():
+            self.schedule_content_index()
+    
+    def schedule_content_index(self, delay=500):
+        """稍后更新字幕索引，连续添加文件或输入时只更新一次"""
+        if self.content_index_after_id is not None:
+            self.root.after_cancel(self.content_index_after_id)
+        self.content_index_after_id = self.root.after(delay, self.update_content_index)
+    
+    def update_content_index(self):
+        """在后台线程中索引新增或变化的文件"""
+        self.content_index_after_id = None
+        if self.content_index is None or not self.content_search_var.get():
+            return
+        if self.content_index_thread is not None:
+            # 正在更新，结束后再检查一次
+            self.content_index_pending = True
+            return
         
-        # 重新排列界面中的文件项
-        for file_path, item_info in sorted_items:
-            # 将frame移到最后（这会重新排列顺序）
-            item_info['frame'].pack_forget()
-            item_info['frame'].pack(fill=tk.X, padx=5, pady=2)
+        index = self.content_index
+        paths = list(self.file_items)
+        self.content_index_progress = None
+        self.content_index_changed = 0
         
-        # 更新滚动区域
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        def on_progress(done, total):
+            self.content_index_progress = (done, total)
+        
+        def worker():
+            try:
+                self.content_index_changed = index.update(
+                    paths, ConversionEngine(jobs=os.cpu_count() or 1), on_progress)
+            except (OSError, sqlite3.Error):
+                # 索引写入失败时保留已有的索引，下次搜索时重试
+                pass
+        
+        self.content_index_thread = threading.Thread(target=worker, daemon=True)
+        self.content_index_thread.start()
+        self.root.after(200, self.poll_content_index)
     
-    def on_search_changed(self, *args):
-        """搜索框内容变化时的回调"""
-        self.filter_file_list()
+    def poll_content_index(self):
+        """定时检查后台索引线程，结束后刷新搜索结果"""
+        if self.content_index_thread.is_alive():
+            if self.content_index_progress is not None:
+                done, total = self.content_index_progress
+                self.content_index_label.config(text=f"正在索引字幕 {done}/{total}")
+            self.root.after(200, self.poll_content_index)
+            return
+        
+        self.content_index_thread = None
+        self.content_index_label.config(text="")
+        if self.content_index_pending:
+            self.content_index_pending = False
+            self.update_content_index()
+        if self.content_index_changed and self.content_search_var.get():
+            self.filter_file_list()
     
     def clear_search(self):
         """清除搜索框内容"""
@@ -761,43 +3460,38 @@ class SRTToTXTConverter:
     
     def filter_file_list(self):
         """根据搜索条件过滤文件列表"""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+        
         search_text = self.search_var.get().strip()
+        self.search_error = False
         
         if not search_text:
             # 如果搜索框为空，显示所有文件
-            for file_path, item_info in self.file_items.items():
-                item_info['frame'].pack(fill=tk.X, padx=5, pady=2)
+            self.visible_mask[:] = self.live_mask
+            self.last_search = None
             self.search_status_label.config(text="")
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            self.rebuild_display_order()
             return
         
-        matched_count = 0
         total_count = len(self.file_items)
+        display_order = None
         
         try:
-            for file_path, item_info in self.file_items.items():
-                # 根据显示路径选项决定搜索的文本
-                if self.show_folder_path_var.get():
-                    search_target = os.path.normpath(file_path)
-                else:
-                    search_target = os.path.basename(file_path)
-                
-                # 根据正则表达式选项进行匹配
-                if self.regex_var.get():
-                    # 使用正则表达式搜索
-                    import re
-                    if re.search(search_text, search_target, re.IGNORECASE):
-                        item_info['frame'].pack(fill=tk.X, padx=5, pady=2)
-                        matched_count += 1
-                    else:
-                        item_info['frame'].pack_forget()
-                else:
-                    # 使用普通文本搜索（不区分大小写）
-                    if search_text.lower() in search_target.lower():
-                        item_info['frame'].pack(fill=tk.X, padx=5, pady=2)
-                        matched_count += 1
-                    else:
-                        item_info['frame'].pack_forget()
+            if self.content_search_var.get():
+                # 在字幕内容索引中搜索，不读取SRT文件
+                self.last_search = None
+                self.content_search_hits = self.content_index.search(search_text, self.regex_var.get())
+                matched_count = 0
+                visible_mask = self.visible_mask
+                for item_info in self.file_items.values():
+                    visible = item_info['abs_path'] in self.content_search_hits
+                    visible_mask[item_info['order']] = visible
+                    matched_count += visible
+            else:
+                display_order = self.match_file_names(search_text)
+                matched_count = len(display_order)
             
             # 更新搜索状态
             self.search_status_label.config(
@@ -807,88 +3501,145 @@ class SRTToTXTConverter:
             
         except re.error as e:
             # 正则表达式错误
+            self.search_error = True
+            self.last_search = None
             self.search_status_label.config(
                 text=f"正则表达式错误: {str(e)}",
                 foreground="red"
             )
             # 显示所有文件
-            for file_path, item_info in self.file_items.items():
-                item_info['frame'].pack(fill=tk.X, padx=5, pady=2)
+            self.visible_mask[:] = self.live_mask
         
         except Exception as e:
             # 其他错误
+            self.last_search = None
             self.search_status_label.config(
                 text=f"搜索错误: {str(e)}",
                 foreground="red"
             )
         
-        # 更新滚动区域
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # 更新显示的文件
+        self.rebuild_display_order(display_order)
     
-    def update_file_display_text(self, file_path, item_info):
-        """更新文件项的显示文本"""
-        if self.show_folder_path_var.get():
-            # 显示绝对路径，确保使用正确的路径分隔符
-            display_text = os.path.normpath(file_path)
+    def match_file_names(self, search_text):
+        """按文件名（或完整路径）搜索，更新可见掩码，按当前排序返回匹配的文件
+        
+        搜索条件只编译一次，与预先计算的小写文本比较；普通文本搜索的新条件包含上一次的条件时
+        （例如继续输入），只在上一次的结果中筛选。否则用三字组索引找出可能匹配的文件
+        （普通文本本身、正则表达式中必须出现的字面文本），只核实这些文件。正则表达式无效时抛出re.error。
+        """
+        # 根据显示路径选项决定搜索的文本
+        key = 'path_key' if self.show_folder_path_var.get() else 'name_key'
+        file_items = self.file_items
+        visible_mask = self.visible_mask
+        
+        if self.regex_var.get():
+            # 使用正则表达式搜索
+            match = re.compile(search_text, re.IGNORECASE).search
+            needle = None
+            literals = regex_literals(search_text)
         else:
-            # 只显示文件名
-            display_text = os.path.basename(file_path)
+            # 使用普通文本搜索（不区分大小写）
+            needle = search_text.lower()
+            match = None
+            literals = [needle]
+        
+        last = self.last_search
+        if needle is not None and last is not None and last[0] == key and last[1] in needle:
+            # 不在上次结果中的文件已经是不可见的，只需重新检查上次匹配的文件
+            candidates = last[2]
+        else:
+            index = self.path_index if key == 'path_key' else self.name_index
+            entry_ids = index.candidates(literals)
+            if entry_ids is None or len(entry_ids) > len(file_items) // 2:
+                # 无法缩小范围或候选很多时，直接按排序逐个检查
+                candidates = self.sorted_paths
+            else:
+                # 候选以外的文件都不匹配：先隐藏当前显示的文件，再只核实候选
+                for file_path in self.display_order:
+                    visible_mask[file_items[file_path]['order']] = 0
+                candidates = self.sort_paths([self.entry_paths[entry_id] for entry_id in entry_ids])
+        
+        matched = []
+        for file_path in candidates:
+            item_info = file_items[file_path]
+            if needle is not None:
+                visible = needle in item_info[key]
+            else:
+                visible = match(item_info[key]) is not None
+            visible_mask[item_info['order']] = visible
+            if visible:
+                matched.append(file_path)
         
-        # 更新标签文本
-        item_info['label'].config(text=display_text)
+        self.last_search = (key, needle, matched) if needle is not None else None
+        return matched
     
     def clear_all_files(self):
         """清空所有文件"""
         if self.file_items:
             result = messagebox.askyesno("确认清空", "确定要清空文件列表吗？")
             if result:
-                for file_path in list(self.file_items.keys()):
-                    self.file_items[file_path]['frame'].destroy()
                 self.file_items.clear()
-                self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+                self.selection = EntryMask()
+                self.visible_mask = EntryMask()
+                self.live_mask = EntryMask()
+                self.file_order_counter = 0
+                self.sorted_paths = []
+                self.entry_paths.clear()
+                self.name_index.clear()
+                self.path_index.clear()
+                self.last_search = None
+                self.drag_range = (0, 0)
+                self.selected_file = None
+                self.rebuild_display_order()
     
     def remove_selected_files(self):
         """删除选中的文件"""
         if self.file_items:
             result = messagebox.askyesno("确认删除", "确定要删除选择的文件吗？")
             if result:
-                to_remove = []
-                for file_path, item_info in self.file_items.items():
-                    if item_info['var'].get():
-                        to_remove.append(file_path)
+                to_remove = [self.entry_paths[entry_id] for entry_id in self.selection.ids()]
                 
                 if not to_remove:
                     messagebox.showwarning("警告", "请先勾选要删除的文件")
                     return
                 
                 for file_path in to_remove:
-                    self.file_items[file_path]['frame'].destroy()
-                    del self.file_items[file_path]
+                    entry_id = self.file_items.pop(file_path)['order']
+                    del self.entry_paths[entry_id]
+                    self.selection[entry_id] = 0
+                    self.visible_mask[entry_id] = 0
+                    self.live_mask[entry_id] = 0
+                    self.name_index.discard(entry_id)
+                    self.path_index.discard(entry_id)
+                if self.selected_file not in self.file_items:
+                    self.selected_file = None
+                self.drag_range = (0, 0)
+                self.last_search = None
                 
-                self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+                self.sorted_paths = [file_path for file_path in self.sorted_paths if file_path in self.file_items]
+                self.rebuild_display_order()
                 messagebox.showinfo("成功", f"已删除 {len(to_remove)} 个文件")
     
     def select_all_files(self):
         """全选所有显示的文件"""
-        for file_path, item_info in self.file_items.items():
-            # 只选择当前显示的文件（未被搜索过滤掉的）
-            if item_info['frame'].winfo_viewable():
-                item_info['var'].set(True)
+        # 只选择当前显示的文件（未被搜索过滤掉的）
+        changed = self.visible_mask.difference(self.selection)
+        self.selection.union_update(self.visible_mask)
+        self.on_files_checked(changed.ids())
     
     def deselect_all_files(self):
         """取消全选所有显示的文件"""
-        for file_path, item_info in self.file_items.items():
-            # 只取消选择当前显示的文件（未被搜索过滤掉的）
-            if item_info['frame'].winfo_viewable():
-                item_info['var'].set(False)
+        # 只取消选择当前显示的文件（未被搜索过滤掉的）
+        changed = self.selection.intersection(self.visible_mask)
+        self.selection.difference_update(self.visible_mask)
+        self.on_files_checked(changed.ids())
     
     def invert_selection(self):
         """反向选择所有显示的文件"""
-        for file_path, item_info in self.file_items.items():
-            # 只反向选择当前显示的文件（未被搜索过滤掉的）
-            if item_info['frame'].winfo_viewable():
-                current_value = item_info['var'].get()
-                item_info['var'].set(not current_value)
+        # 只反向选择当前显示的文件（未被搜索过滤掉的）
+        self.selection.symmetric_difference_update(self.visible_mask)
+        self.on_files_checked(self.visible_mask.ids())
     
     def on_drag_start(self, event):
         """开始拖拽选择"""
@@ -896,8 +3647,7 @@ class SRTToTXTConverter:
         self.clear_selected_file()
         
         # 记录拖拽起始位置
-        self.drag_start_x = self.canvas.canvasx(event.x)
-        self.drag_start_y = self.canvas.canvasy(event.y)
+        self.drag_start_x, self.drag_start_y = self.canvas_position(event)
         self.is_dragging = True
         
         # 清除之前的高亮
@@ -909,18 +3659,17 @@ class SRTToTXTConverter:
             return
         
         # 获取当前鼠标位置
-        current_x = self.canvas.canvasx(event.x)
-        current_y = self.canvas.canvasy(event.y)
+        current_x, current_y = self.canvas_position(event)
         
-        # 删除之前的选择框
         if self.drag_rect:
-            self.canvas.delete(self.drag_rect)
-        
-        # 绘制新的选择框
-        self.drag_rect = self.canvas.create_rectangle(
-            self.drag_start_x, self.drag_start_y, current_x, current_y,
-            outline="blue", width=2, fill="lightblue", stipple="gray25"
-        )
+            # 移动已有的选择框
+            self.canvas.coords(self.drag_rect, self.drag_start_x, self.drag_start_y, current_x, current_y)
+        else:
+            # 绘制选择框
+            self.drag_rect = self.canvas.create_rectangle(
+                self.drag_start_x, self.drag_start_y, current_x, current_y,
+                outline="blue", width=2, fill="lightblue", stipple="gray25"
+            )
         
         # 更新文件项的高亮状态
         self.update_drag_highlights(self.drag_start_x, self.drag_start_y, current_x, current_y)
@@ -931,8 +3680,7 @@ class SRTToTXTConverter:
             return
         
         # 获取最终位置
-        end_x = self.canvas.canvasx(event.x)
-        end_y = self.canvas.canvasy(event.y)
+        end_x, end_y = self.canvas_position(event)
         
         # 执行反选操作
         self.apply_drag_selection(self.drag_start_x, self.drag_start_y, end_x, end_y)
@@ -947,185 +3695,101 @@ class SRTToTXTConverter:
         self.drag_start_x = None
         self.drag_start_y = None
     
-    def update_drag_highlights(self, x1, y1, x2, y2):
-        """更新拖拽过程中的文件项高亮"""
-        # 确保坐标顺序正确
+    def canvas_position(self, event):
+        """把鼠标事件的位置换算成Canvas坐标（事件可能来自Canvas上的行控件）"""
+        x = event.x_root - self.canvas.winfo_rootx()
+        y = event.y_root - self.canvas.winfo_rooty()
+        return self.canvas.canvasx(x), self.canvas.canvasy(y)
+    
+    def rows_in_rect(self, x1, y1, x2, y2):
+        """返回与矩形相交的行在显示顺序中的范围 (起始, 结束)
+        
+        行高固定，第i行的位置就是 i*行高，直接由坐标算出行号，不需要检查每个文件项。
+        """
         min_x, max_x = min(x1, x2), max(x1, x2)
         min_y, max_y = min(y1, y2), max(y1, y2)
         
-        # 清除之前的高亮
-        self.clear_drag_highlights()
+        # 行占满除左右边距外的宽度
+        if max_x <= FILE_ROW_PADX or min_x >= self.canvas.winfo_width() - FILE_ROW_PADX:
+            return 0, 0
         
-        # 检查每个文件项是否在选择区域内
-        for file_path, item_info in self.file_items.items():
-            frame = item_info['frame']
-            if not frame.winfo_viewable():
-                continue
-            
-            try:
-                # 获取文件项相对于scrollable_frame的位置
-                frame_x = frame.winfo_x()
-                frame_y = frame.winfo_y()
-                frame_width = frame.winfo_width()
-                frame_height = frame.winfo_height()
-                
-                # 转换为Canvas坐标系
-                # 获取scrollable_frame在Canvas中的位置
-                canvas_window = self.canvas.find_all()[0] if self.canvas.find_all() else None
-                if canvas_window:
-                    scroll_x, scroll_y = self.canvas.coords(canvas_window)
-                    canvas_frame_x = frame_x + scroll_x
-                    canvas_frame_y = frame_y + scroll_y
-                    
-                    # 检查是否与选择框相交
-                    if (canvas_frame_x < max_x and canvas_frame_x + frame_width > min_x and
-                        canvas_frame_y < max_y and canvas_frame_y + frame_height > min_y):
-                        # 添加高亮效果 - 对label设置背景色，因为ttk.Frame不支持background属性
-                        frame.configure(relief="solid", borderwidth=2)
-                        label = self.file_items[file_path]['label']
-                        label.configure(background="lightblue")
-                        self.drag_highlighted_items.add(file_path)
-            except tk.TclError:
-                # 如果widget已被销毁，跳过
-                continue
+        # 第i行占据 [i*行高+2, (i+1)*行高-2)，上下各留2像素间距
+        first = max(int((min_y + 2) // FILE_ROW_HEIGHT), 0)
+        last = min(int(-((2 - max_y) // FILE_ROW_HEIGHT)), len(self.display_order))
+        return first, max(first, last)
+    
+    def update_drag_highlights(self, x1, y1, x2, y2):
+        """更新拖拽过程中的文件项高亮"""
+        first, last = self.rows_in_rect(x1, y1, x2, y2)
+        old_first, old_last = self.drag_range
+        if (first, last) == (old_first, old_last):
+            return
+        self.drag_range = (first, last)
+        
+        # 只重画进入或离开选择框的行（行控件只覆盖可见区域）
+        for row in self.list_rows:
+            index = row['index']
+            if index is not None and (old_first <= index < old_last) != (first <= index < last):
+                self.render_list_row(row)
     
     def clear_drag_highlights(self):
         """清除拖拽高亮效果"""
-        for file_path in self.drag_highlighted_items:
-            if file_path in self.file_items:
-                frame = self.file_items[file_path]['frame']
-                label = self.file_items[file_path]['label']
-                try:
-                    # 重置边框样式
-                    frame.configure(relief="flat", borderwidth=0)
-                    # 恢复label的原始背景色
-                    label.configure(background=self.root.cget('bg'))
-                except tk.TclError:
-                    # 如果配置失败，忽略错误
-                    pass
-        self.drag_highlighted_items.clear()
+        if self.drag_range != (0, 0):
+            self.drag_range = (0, 0)
+            self.refresh_visible_rows()
     
     def apply_drag_selection(self, x1, y1, x2, y2):
         """应用拖拽选择的反选操作"""
-        # 确保坐标顺序正确
-        min_x, max_x = min(x1, x2), max(x1, x2)
-        min_y, max_y = min(y1, y2), max(y1, y2)
+        first, last = self.rows_in_rect(x1, y1, x2, y2)
         
         # 对选择区域内的文件执行反选
-        for file_path, item_info in self.file_items.items():
-            frame = item_info['frame']
-            if not frame.winfo_viewable():
-                continue
-            
-            try:
-                # 获取文件项相对于scrollable_frame的位置
-                frame_x = frame.winfo_x()
-                frame_y = frame.winfo_y()
-                frame_width = frame.winfo_width()
-                frame_height = frame.winfo_height()
-                
-                # 转换为Canvas坐标系
-                # 获取scrollable_frame在Canvas中的位置
-                canvas_window = self.canvas.find_all()[0] if self.canvas.find_all() else None
-                if canvas_window:
-                    scroll_x, scroll_y = self.canvas.coords(canvas_window)
-                    canvas_frame_x = frame_x + scroll_x
-                    canvas_frame_y = frame_y + scroll_y
-                    
-                    # 检查是否与选择框相交
-                    if (canvas_frame_x < max_x and canvas_frame_x + frame_width > min_x and
-                        canvas_frame_y < max_y and canvas_frame_y + frame_height > min_y):
-                        # 执行反选
-                        current_value = item_info['var'].get()
-                        item_info['var'].set(not current_value)
-            except tk.TclError:
-                # 如果widget已被销毁，跳过
-                continue
+        changed = [self.file_items[file_path]['order'] for file_path in self.display_order[first:last]]
+        for entry_id in changed:
+            self.selection[entry_id] ^= 1
+        self.on_files_checked(changed)
     
     def get_selected_files(self):
         """获取选中的文件列表"""
-        selected = []
-        for file_path, item_info in self.file_items.items():
-            if item_info['var'].get():
-                # 如果选择了"只处理搜索结果"，则只包含当前显示的文件
-                if self.process_search_only_var.get():
-                    # 检查文件是否在当前搜索结果中（即是否可见）
-                    if self.is_file_visible_in_search(file_path):
-                        selected.append(file_path)
-                else:
-                    # 否则包含所有选中的文件
-                    selected.append(file_path)
-        return selected
+        selection = self.selection
+        # 如果选择了"只处理搜索结果"，则只包含当前显示的文件
+        if self.process_search_only_var.get():
+            # 还在等待的搜索先执行
+            self.flush_pending_search()
+            if self.search_var.get().strip():
+                if self.search_error:
+                    # 正则表达式错误时，没有文件在搜索结果中
+                    return []
+                selection = selection.intersection(self.visible_mask)
+        return [self.entry_paths[entry_id] for entry_id in selection.ids()]
     
     def is_file_visible_in_search(self, file_path):
         """检查文件是否在当前搜索结果中可见"""
-        search_text = self.search_var.get().strip()
+        # 还在等待的搜索先执行
+        self.flush_pending_search()
         
         # 如果没有搜索条件，所有文件都可见
-        if not search_text:
+        if not self.search_var.get().strip():
             return True
         
-        # 根据显示路径选项决定搜索的文本
-        if self.show_folder_path_var.get():
-            search_target = os.path.normpath(file_path)
-        else:
-            search_target = os.path.basename(file_path)
-        
-        try:
-            # 根据正则表达式选项进行匹配
-            if self.regex_var.get():
-                # 使用正则表达式搜索
-                import re
-                return bool(re.search(search_text, search_target, re.IGNORECASE))
-            else:
-                # 使用普通文本搜索（不区分大小写）
-                return search_text.lower() in search_target.lower()
-        except re.error:
-            # 正则表达式错误时，返回False
-            return False
-        except Exception:
-            # 其他错误时，返回False
+        # 正则表达式错误时，返回False
+        if self.search_error:
             return False
+        
+        return bool(self.visible_mask[self.file_items[file_path]['order']])
     
     def parse_srt_file(self, file_path):
-        """解析SRT文件，提取字幕文本"""
-        subtitles = []
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # 尝试其他编码
-            try:
-                with open(file_path, 'r', encoding='gbk') as f:
-                    content = f.read()
-            except UnicodeDecodeError:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-        
-        # 分割字幕块
-        subtitle_blocks = re.split(r'\n\s*\n', content.strip())
-        
-        for block in subtitle_blocks:
-            lines = block.strip().split('\n')
-            if len(lines) >= 3:
-                # 跳过序号和时间戳，提取字幕文本
-                subtitle_text = '\n'.join(lines[2:]).strip()
-                if subtitle_text:
-                    subtitles.append(subtitle_text)
-        
-        return subtitles
+        """解析SRT文件，返回包含序号、时间戳和字幕文本的CueTable（使用共享的解析缓存）"""
+        return load_cue_table(file_path)
     
     def sanitize_filename(self, filename):
         """清理文件名中的无效字符"""
-        # Windows系统中文件名不能包含的字符
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        return filename
+        return sanitize_filename(filename)
     
     def convert_selected_files(self):
-        """转换选中的文件"""
+        """转换选中的文件（在后台线程中执行）"""
+        if self.conversion_engine is not None:
+            return
+        
         selected_files = self.get_selected_files()
         
         if not selected_files:
@@ -1135,69 +3799,218 @@ class SRTToTXTConverter:
         try:
             if self.output_mode.get() == "separate":
                 self.convert_separate(selected_files)
+            elif self.output_mode.get() == "export":
+                self.convert_export(selected_files)
             else:
                 self.convert_merge(selected_files)
             
-            messagebox.showinfo("成功", "转换完成！")
-            
         except Exception as e:
             messagebox.showerror("错误", f"转换过程中发生错误：{str(e)}")
     
+    def build_conversion_job(self, files_to_convert, mode):
+        """根据界面选项构建转换任务"""
+        output_folder = None
+        if self.output_to_same_folder_var.get() and self.output_folder:
+            output_folder = self.output_folder
+        
+        manifest = None
+        if self.incremental_var.get():
+            manifest = ConversionManifest(DEFAULT_MANIFEST_PATH)
+        
+        compress = None
+        if mode in (MODE_MERGE, MODE_MERGE_BY_FOLDER):
+            compress = dict(MERGE_COMPRESS_LABELS).get(self.merge_compress_var.get())
+        
+        return ConversionJob(
+            files_to_convert,
+            mode=mode,
+            output_folder=output_folder,
+            overwrite=OVERWRITE_ASK,
+            show_merge_path=self.show_merge_path_var.get(),
+            manifest=manifest,
+            compress=compress
+        )
+    
+    def start_conversion(self, job, show_result, jobs=1):
+        """在后台线程中执行转换任务
+        参数：
+        - job: 转换任务
+        - show_result: 转换结束后在界面线程中调用，用于显示结果
+        - jobs: 工作进程数
+        """
+        # 重置覆盖选择状态
+        self.overwrite_all = None
+        
+        # 后台线程通过队列把事件发给界面线程，覆盖确认对话框也交给界面线程弹出
+        engine = ConversionEngine(
+            on_event=lambda event: self.conversion_queue.put(('event', event)),
+            confirm_overwrite=lambda output_file, new_content: self.call_in_ui(
+                self.check_file_overwrite, output_file, new_content),
+            jobs=jobs
+        )
+        self.conversion_engine = engine
+        self.conversion_result_handler = show_result
+        self.conversion_started_at = time.time()
+        
+        # 显示进度条和取消按钮
+        self.convert_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_bar.config(maximum=max(len(job.files), 1), value=0)
+        self.progress_label.config(text=f"0/{len(job.files)} 个文件")
+        self.progress_frame.pack(pady=(5, 0))
+        self.progress_label.pack(pady=(2, 0))
+        
+        def worker():
+            try:
+                result = engine.run(job)
+            except Exception as e:
+                self.conversion_queue.put(('error', e))
+            else:
+                self.conversion_queue.put(('done', result))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(100, self.poll_conversion_queue)
+    
+    def call_in_ui(self, func, *args):
+        """供后台线程调用：让界面线程执行func并等待其返回值"""
+        reply = queue.Queue(maxsize=1)
+        self.conversion_queue.put(('call', (func, args, reply)))
+        succeeded, value = reply.get()
+        if not succeeded:
+            raise value
+        return value
+    
+    def poll_conversion_queue(self):
+        """定时处理后台转换线程发来的消息"""
+        latest_progress = None
+        try:
+            while True:
+                kind, payload = self.conversion_queue.get_nowait()
+                if kind == 'event':
+                    if payload['type'] == 'progress':
+                        latest_progress = payload
+                elif kind == 'call':
+                    func, args, reply = payload
+                    try:
+                        reply.put((True, func(*args)))
+                    except Exception as e:
+                        reply.put((False, e))
+                else:
+                    # 转换结束（'done'或'error'）
+                    self.finish_conversion(kind, payload)
+                    return
+        except queue.Empty:
+            pass
+        
+        # 一次轮询只刷新一次进度，避免大量事件拖慢界面
+        if latest_progress is not None:
+            self.update_conversion_progress(latest_progress)
+        self.root.after(100, self.poll_conversion_queue)
+    
+    def update_conversion_progress(self, progress):
+        """更新进度条、吞吐量和剩余时间"""
+        elapsed = max(time.time() - self.conversion_started_at, 0.001)
+        done = progress['done']
+        total = progress['total']
+        files_per_sec = done / elapsed
+        bytes_per_sec = progress['bytes_done'] / elapsed
+        
+        # 按字节数估算剩余时间（文件大小差别大时比按文件数更准确）
+        if progress['total_bytes'] and bytes_per_sec > 0:
+            eta = (progress['total_bytes'] - progress['bytes_done']) / bytes_per_sec
+        elif files_per_sec > 0:
+            eta = (total - done) / files_per_sec
+        else:
+            eta = None
+        
+        text = (f"{done}/{total} 个文件  {files_per_sec:.1f} 文件/秒  "
+                f"{bytes_per_sec / (1024 * 1024):.2f} MB/秒")
+        if eta is not None:
+            text += f"  剩余约 {format_duration(eta)}"
+        
+        self.progress_bar.config(value=done)
+        if not self.conversion_engine.cancel_requested():
+            self.progress_label.config(text=text)
+    
+    def cancel_conversion(self):
+        """取消正在进行的转换（处理完当前文件后停止）"""
+        if self.conversion_engine is not None:
+            self.conversion_engine.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.progress_label.config(text="正在取消，当前文件处理完后停止...")
+    
+    def finish_conversion(self, kind, payload):
+        """后台转换结束后恢复界面并显示结果"""
+        self.conversion_engine = None
+        self.progress_frame.pack_forget()
+        self.progress_label.pack_forget()
+        self.convert_button.config(state=tk.NORMAL)
+        
+        if kind == 'error':
+            messagebox.showerror("错误", f"转换过程中发生错误：{str(payload)}")
+            return
+        
+        self.conversion_result_handler(payload)
+        if payload.stopped:
+            messagebox.showinfo("已取消", "转换已取消，已完成的文件保持不变")
+        else:
+            messagebox.showinfo("成功", "转换完成！")
+    
+    def format_result_message(self, summary, result):
+        """在结果摘要后追加输出位置和解码时有字符被替换的文件"""
+        result_msg = summary
+        if result.output_folder:
+            result_msg += f"\n输出位置：{os.path.normpath(result.output_folder)}"
+        if result.decode_replaced:
+            names = "\n".join(os.path.basename(path) for path in result.decode_replaced)
+            result_msg += f"\n\n以下文件含有无法识别编码的字节，已用替换字符代替：\n{names}"
+        return result_msg
+    
     def convert_separate(self, files_to_convert):
         """分别转换每个文件"""
-        converted_count = 0
-        failed_files = []
-        
         # 检查是否需要输出到同一个文件夹
         if self.output_to_same_folder_var.get():
             if not self.output_folder:
                 messagebox.showwarning("警告", "请先选择输出文件夹")
                 return
         
-        for srt_file in files_to_convert:
+        job = self.build_conversion_job(files_to_convert, MODE_SEPARATE)
+        if self.archive_output_var.get():
+            # 打包输出：先选择压缩包的保存位置，压缩方式由扩展名决定
+            archive_file = filedialog.asksaveasfilename(
+                title="保存压缩包",
+                defaultextension=".zip",
+                filetypes=[("ZIP压缩包", "*.zip"), ("TAR包", "*.tar"), ("TAR.GZ压缩包", "*.tar.gz"),
+                           ("TAR.XZ压缩包", "*.tar.xz")]
+            )
+            if not archive_file:
+                return
             try:
-                # 解析SRT文件
-                subtitles = self.parse_srt_file(srt_file)
-                
-                if subtitles:
-                    # 生成输出文件名
-                    if self.output_to_same_folder_var.get() and self.output_folder:
-                        # 输出到指定文件夹，文件名格式：原文件名(绝对父目录路径).txt
-                        base_name = os.path.splitext(os.path.basename(srt_file))[0]
-                        parent_dir = os.path.normpath(os.path.dirname(srt_file))
-                        # 清理文件名中的无效字符
-                        safe_filename = self.sanitize_filename(f"{base_name}({parent_dir})")
-                        new_filename = f"{safe_filename}.txt"
-                        output_file = os.path.join(self.output_folder, new_filename)
-                    else:
-                        # 输出到原文件所在目录
-                        output_file = os.path.splitext(srt_file)[0] + '.txt'
-                    
-                    # 检查文件覆盖
-                    new_content = '，'.join(subtitles) + '，'
-                    if not self.check_file_overwrite(output_file, new_content):
-                        failed_files.append(f"{os.path.basename(srt_file)} (用户选择不覆盖)")
-                        continue
-                    
-                    # 写入TXT文件
-                    try:
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            f.write('，'.join(subtitles) + '，')
-                        converted_count += 1
-                    except (IOError, OSError, PermissionError) as write_error:
-                        failed_files.append(f"{os.path.basename(srt_file)} (写入失败: {str(write_error)})")
-                else:
-                    failed_files.append(f"{os.path.basename(srt_file)} (无字幕内容)")
-                
-            except Exception as e:
-                failed_files.append(f"{os.path.basename(srt_file)} ({str(e)})")
+                archive_format_for(archive_file)
+            except ValueError as e:
+                messagebox.showerror("错误", str(e))
+                return
+            job.archive_file = archive_file
         
-        # 显示转换结果
-        result_msg = f"成功转换了 {converted_count} 个文件"
-        if self.output_to_same_folder_var.get() and self.output_folder:
-            result_msg += f"\n输出位置：{os.path.normpath(self.output_folder)}"
-        if failed_files:
-            result_msg += f"\n失败的文件：\n" + "\n".join(failed_files)
+        if not self.resolve_output_conflicts(job):
+            return
+        
+        # 每个文件相互独立，按CPU核心数并行转换
+        self.start_conversion(job, self.show_separate_result, jobs=os.cpu_count() or 1)
+    
+    def show_separate_result(self, result):
+        """显示分别转换的结果"""
+        if result.output_file:
+            # 打包输出时输出文件夹只用于成员命名，显示压缩包的位置
+            result_msg = f"成功转换了 {len(result.converted)} 个文件"
+            if result.outputs:
+                result_msg += f"\n已打包到：{os.path.normpath(result.output_file)}"
+        else:
+            result_msg = self.format_result_message(f"成功转换了 {len(result.converted)} 个文件", result)
+        if result.unchanged:
+            result_msg += f"\n跳过了 {len(result.unchanged)} 个未变化的文件"
+        if result.failed:
+            result_msg += f"\n失败的文件：\n" + "\n".join(result.format_failures())
         
         messagebox.showinfo("转换完成", result_msg)
     
@@ -1211,168 +4024,251 @@ class SRTToTXTConverter:
     
     def convert_merge_by_folder(self, files_to_convert):
         """按文件夹合并文件"""
-        # 重置覆盖选择状态
-        self.overwrite_all = None
-        
         # 检查是否需要输出到同一个文件夹
         if self.output_to_same_folder_var.get():
             if not self.output_folder:
                 messagebox.showwarning("警告", "请先选择输出文件夹")
                 return
         
-        # 按文件夹分组文件
-        folder_groups = {}
-        for file_path in files_to_convert:
-            folder_path = self.file_items[file_path]['folder']
-            if folder_path not in folder_groups:
-                folder_groups[folder_path] = []
-            folder_groups[folder_path].append(file_path)
-        
-        total_folders = len(folder_groups)
-        successful_folders = 0
-        failed_files = []
-        
-        for folder_path, files in folder_groups.items():
-            merged_content = []
-            folder_successful_count = 0
-            
-            for srt_file in files:
-                try:
-                    subtitles = self.parse_srt_file(srt_file)
-                    if subtitles:
-                        # 根据选项决定文件名格式
-                        if self.show_merge_path_var.get():
-                            # 显示绝对路径（不含扩展名）
-                            filename = os.path.splitext(os.path.normpath(srt_file))[0]
-                        else:
-                            # 只显示文件名（不含扩展名）
-                            filename = os.path.splitext(os.path.basename(srt_file))[0]
-                        
-                        # 将字幕内容用逗号连接
-                        content = '，'.join(subtitles) + '，'
-                        # 格式：文件名 + 换行 + 内容
-                        file_section = f"{filename}\n{content}"
-                        merged_content.append(file_section)
-                        folder_successful_count += 1
-                    else:
-                        failed_files.append(f"{os.path.basename(srt_file)} (无字幕内容)")
-                except Exception as e:
-                    failed_files.append(f"{os.path.basename(srt_file)} ({str(e)})")
-            
-            if merged_content:
-                # 决定输出文件位置
-                if self.output_to_same_folder_var.get() and self.output_folder:
-                    # 输出到指定文件夹，使用文件夹名作为文件名前缀
-                    folder_name = os.path.normpath(os.path.dirname(srt_file))
-                    # 清理文件名中的无效字符
-                    safe_filename = self.sanitize_filename(f"summary({folder_name})")
-                    output_file = os.path.join(self.output_folder, f"{safe_filename}.txt")
-                else:
-                    # 在每个文件夹下生成summary.txt
-                    output_file = os.path.join(folder_path, "summary.txt")
-                
-                final_content = '\n\n'.join(merged_content)
-                
-                # 检查文件覆盖
-                if not self.check_file_overwrite(output_file, final_content):
-                    failed_files.append(f"文件夹 {os.path.basename(folder_path)} (用户选择不覆盖summary.txt)")
-                    continue
-                
-                try:
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(final_content)
-                    successful_folders += 1
-                except (IOError, OSError, PermissionError) as write_error:
-                    failed_files.append(f"文件夹 {os.path.basename(folder_path)} (写入summary.txt失败: {str(write_error)})")
+        job = self.build_conversion_job(files_to_convert, MODE_MERGE_BY_FOLDER)
+        if not self.resolve_output_conflicts(job):
+            return
         
-        # 显示结果
-        result_msg = f"成功在 {successful_folders} 个文件夹中生成了summary.txt文件"
-        if self.output_to_same_folder_var.get() and self.output_folder:
-            result_msg += f"\n输出位置：{os.path.normpath(self.output_folder)}"
-        if failed_files:
-            result_msg += f"\n处理失败的文件：\n" + "\n".join(failed_files)
+        self.start_conversion(job, self.show_merge_by_folder_result, jobs=os.cpu_count() or 1)
+    
+    def show_merge_by_folder_result(self, result):
+        """显示按文件夹合并的结果"""
+        result_msg = self.format_result_message(
+            f"成功在 {len(result.outputs)} 个文件夹中生成了summary.txt文件", result)
+        if result.unchanged:
+            result_msg += f"\n跳过了 {len(result.unchanged)} 个未变化的文件夹"
+        if result.failed:
+            result_msg += f"\n处理失败的文件：\n" + "\n".join(result.format_failures())
         
         messagebox.showinfo("按文件夹合并完成", result_msg)
     
     def convert_merge_all(self, files_to_convert):
         """合并所有文件到一个TXT"""
-        # 重置覆盖选择状态
-        self.overwrite_all = None
-        
-        merged_content = []
-        failed_files = []
-        successful_count = 0
-        
-        for srt_file in files_to_convert:
-            try:
-                subtitles = self.parse_srt_file(srt_file)
-                if subtitles:
-                    # 根据选项决定文件名格式
-                    if self.show_merge_path_var.get():
-                        # 显示绝对路径（不含扩展名）
-                        filename = os.path.splitext(os.path.normpath(srt_file))[0]
-                    else:
-                        # 只显示文件名（不含扩展名）
-                        filename = os.path.splitext(os.path.basename(srt_file))[0]
-                    
-                    # 将字幕内容用逗号连接
-                    content = '，'.join(subtitles) + '，'
-                    # 格式：文件名 + 换行 + 内容
-                    file_section = f"{filename}\n{content}"
-                    merged_content.append(file_section)
-                    successful_count += 1
-                else:
-                    failed_files.append(f"{os.path.basename(srt_file)} (无字幕内容)")
-            except Exception as e:
-                failed_files.append(f"{os.path.basename(srt_file)} ({str(e)})")
-        
-        if merged_content:
+        def ask_output_file():
             # 弹窗让用户输入文件名
-            output_file = filedialog.asksaveasfilename(
+            return filedialog.asksaveasfilename(
                 title="保存合并的TXT文件",
                 defaultextension=".txt",
                 filetypes=[("TXT文件", "*.txt"), ("所有文件", "*.*")]
             )
-            
-            if not output_file:  # 用户取消了保存
-                return
-            
-            # 用换行符连接每个文件的处理结果
-            final_content = '\n\n'.join(merged_content)
-            
-            # 检查文件覆盖
-            if not self.check_file_overwrite(output_file, final_content):
-                error_msg = "用户选择不覆盖文件"
-                if failed_files:
-                    error_msg += f"\n处理失败的文件：\n" + "\n".join(failed_files)
-                messagebox.showinfo("操作取消", error_msg)
-                return
-            
-            try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(final_content)
-                
-                # 显示结果
-                result_msg = f"成功合并了 {successful_count} 个文件的内容到 {os.path.basename(output_file)}"
-                if self.output_to_same_folder_var.get() and self.output_folder:
-                    result_msg += f"\n输出位置：{os.path.normpath(self.output_folder)}"
-                if failed_files:
-                    result_msg += f"\n处理失败的文件：\n" + "\n".join(failed_files)
-                
-                messagebox.showinfo("合并完成", result_msg)
-            except (IOError, OSError, PermissionError) as write_error:
-                error_msg = f"写入合并文件失败: {str(write_error)}"
-                if failed_files:
-                    error_msg += f"\n处理失败的文件：\n" + "\n".join(failed_files)
-                messagebox.showerror("写入失败", error_msg)
-        else:
-            messagebox.showwarning("警告", "没有提取到任何字幕内容")
+        
+        job = self.build_conversion_job(files_to_convert, MODE_MERGE)
+        # 开始解析前由后台线程调用，保存对话框在界面线程中弹出
+        job.merge_output_file = lambda: self.call_in_ui(ask_output_file)
+        self.start_conversion(job, self.show_merge_all_result)
+    
+    def convert_export(self, files_to_convert):
+        """把所有字幕逐条导出为JSONL或SQLite记录"""
+        def ask_export_file():
+            while True:
+                export_file = filedialog.asksaveasfilename(
+                    title="导出字幕记录",
+                    defaultextension=".jsonl",
+                    filetypes=[("JSONL文件", "*.jsonl"), ("压缩的JSONL文件", "*.jsonl.gz *.jsonl.xz"),
+                               ("SQLite数据库", "*.db *.sqlite *.sqlite3"), ("所有文件", "*.*")]
+                )
+                if not export_file:
+                    return export_file
+                try:
+                    export_format_for(export_file)
+                    return export_file
+                except ValueError as e:
+                    messagebox.showwarning("警告", str(e))
+        
+        job = self.build_conversion_job(files_to_convert, MODE_EXPORT)
+        # 开始解析前由后台线程调用，保存对话框在界面线程中弹出
+        job.export_file = lambda: self.call_in_ui(ask_export_file)
+        self.start_conversion(job, self.show_export_result)
+    
+    def show_export_result(self, result):
+        """显示导出字幕记录的结果"""
+        if result.cancelled:
+            return
+        
+        source_failures = [f for f in result.failed if f['kind'] != 'output']
+        output_failures = [f for f in result.failed if f['kind'] == 'output']
+        failure_lines = result.format_failures(source_failures)
+        
+        if output_failures:
+            error_msg = "\n".join(result.format_failures(output_failures))
+            if failure_lines:
+                error_msg += f"\n处理失败的文件：\n" + "\n".join(failure_lines)
+            messagebox.showerror("写入失败", error_msg)
+            return
+        if result.skipped_outputs:
+            messagebox.showinfo("导出取消", "已保留原有文件，未导出字幕记录")
+            return
+        
+        result_msg = f"成功导出了 {len(result.converted)} 个文件的 {result.exported_cues} 条字幕记录"
+        if result.unchanged:
+            result_msg += "\n导出内容与已有文件相同，未重新写入"
+        if result.outputs:
+            result_msg += f"\n已导出到：{os.path.normpath(result.output_file)}"
+        if failure_lines:
+            result_msg += f"\n失败的文件：\n" + "\n".join(failure_lines)
+        
+        messagebox.showinfo("导出完成", result_msg)
+    
+    def show_merge_all_result(self, result):
+        """显示合并输出的结果"""
+        source_failures = [f for f in result.failed if f['kind'] != 'output']
+        output_failures = [f for f in result.failed if f['kind'] == 'output']
+        failure_lines = result.format_failures(source_failures)
+        
+        if result.unchanged:
+            result_msg = f"合并内容与 {os.path.basename(result.unchanged[0])} 完全相同，未重新写入"
+            if failure_lines:
+                result_msg += f"\n处理失败的文件：\n" + "\n".join(failure_lines)
+            messagebox.showinfo("合并完成", result_msg)
+            return
+        
+        if not result.converted and not result.skipped_outputs and not output_failures:
+            if not result.cancelled and not result.stopped:
+                messagebox.showwarning("警告", "没有提取到任何字幕内容")
+            return
+        
+        if result.skipped_outputs:
+            error_msg = "用户选择不覆盖文件"
+            if failure_lines:
+                error_msg += f"\n处理失败的文件：\n" + "\n".join(failure_lines)
+            messagebox.showinfo("操作取消", error_msg)
+            return
+        
+        if output_failures:
+            error_msg = output_failures[0]['reason']
+            if failure_lines:
+                error_msg += f"\n处理失败的文件：\n" + "\n".join(failure_lines)
+            messagebox.showerror("写入失败", error_msg)
+            return
+        
+        # 显示结果
+        output_file = result.outputs[0]
+        result_msg = self.format_result_message(
+            f"成功合并了 {len(result.converted)} 个文件的内容到 {os.path.basename(output_file)}", result)
+        if failure_lines:
+            result_msg += f"\n处理失败的文件：\n" + "\n".join(failure_lines)
+        
+        messagebox.showinfo("合并完成", result_msg)
 
+    def resolve_output_conflicts(self, job):
+        """转换开始前一次性找出所有已存在的输出文件，冲突的文件在一个表格中选择处理方式
+        
+        增量转换时不会被写入的最新输出和由之前的转换生成的过期输出由转换引擎处理，不列出。
+        选择结果写入job.resolutions，转换过程中不再逐个弹窗询问。返回False表示用户取消了转换。
+        """
+        planner = ConversionEngine()
+        conflicts = planner.find_conflicts(job)
+        if conflicts:
+            chosen = self.show_conflict_table(
+                conflicts, lambda sources: planner.preview_output(job, sources))
+            if chosen is None:
+                return False
+            job.resolutions = chosen
+        # 规划之后才出现的冲突不再询问，直接跳过
+        job.overwrite = OVERWRITE_NEVER
+        return True
+    
+    def show_conflict_table(self, conflicts, preview_output):
+        """显示输出文件冲突表，每一行可选择覆盖、跳过或重命名
+        参数：
+        - conflicts: [(输出文件, 源文件列表)]
+        - preview_output: 根据源文件列表生成新内容的函数（用于对比文件）
+        返回值：{输出文件: 处理策略}，取消时返回None
+        """
+        dialog = tk.Toplevel(self.root)
+        dialog.title("输出文件已存在")
+        dialog.geometry("800x500")
+        dialog.resizable(True, True)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        
+        # 居中显示
+        dialog.geometry("+%d+%d" % (self.root.winfo_rootx() + 50, self.root.winfo_rooty() + 50))
+        
+        # 默认全部跳过，避免误覆盖；表格行号即conflicts中的下标
+        choices = [OVERWRITE_NEVER] * len(conflicts)
+        result = {'resolutions': None}
+        
+        main_frame = ttk.Frame(dialog, padding="15")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(main_frame, text=f"有 {len(conflicts)} 个输出文件已存在，请选择处理方式：",
+                  font=("", 10)).pack(anchor=tk.W, pady=(0, 10))
+        
+        # 冲突表格
+        table_frame = ttk.Frame(main_frame)
+        table_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        
+        table = ttk.Treeview(table_frame, columns=('action', 'path'), show='headings', selectmode='extended')
+        table.heading('action', text="处理方式")
+        table.heading('path', text="输出文件")
+        table.column('action', width=80, stretch=False, anchor=tk.CENTER)
+        table.column('path', width=650)
+        table_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=table.yview)
+        table.configure(yscrollcommand=table_scrollbar.set)
+        table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        table_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        for row, (output_file, _) in enumerate(conflicts):
+            table.insert('', tk.END, iid=str(row),
+                         values=(OVERWRITE_LABELS[OVERWRITE_NEVER], os.path.abspath(output_file)))
+        
+        def set_choice(policy, rows):
+            for row in rows:
+                choices[int(row)] = policy
+                table.set(row, 'action', OVERWRITE_LABELS[policy])
+        
+        def compare_selected(event=None):
+            selection = table.selection()
+            if not selection:
+                return
+            output_file, sources = conflicts[int(selection[0])]
+            self.show_file_comparison(os.path.abspath(output_file), dialog,
+                                      lambda: preview_output(sources))
+        
+        table.bind('<Double-1>', compare_selected)
+        
+        # 选中行的操作
+        row_frame = ttk.Frame(main_frame)
+        row_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(row_frame, text="选中的文件：").pack(side=tk.LEFT)
+        for policy in (OVERWRITE_ALWAYS, OVERWRITE_NEVER, OVERWRITE_RENAME):
+            ttk.Button(row_frame, text=OVERWRITE_LABELS[policy],
+                       command=lambda p=policy: set_choice(p, table.selection())).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(row_frame, text="对比文件", command=compare_selected).pack(side=tk.LEFT)
+        
+        # 全部文件的操作
+        all_frame = ttk.Frame(main_frame)
+        all_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(all_frame, text="全部文件：").pack(side=tk.LEFT)
+        for policy in (OVERWRITE_ALWAYS, OVERWRITE_NEVER, OVERWRITE_RENAME):
+            ttk.Button(all_frame, text=f"全部{OVERWRITE_LABELS[policy]}",
+                       command=lambda p=policy: set_choice(p, table.get_children())).pack(side=tk.LEFT, padx=(0, 5))
+        
+        def on_start():
+            result['resolutions'] = {output_file: policy
+                                     for (output_file, _), policy in zip(conflicts, choices)}
+            dialog.destroy()
+        
+        btn_frame = ttk.Frame(main_frame)
+        btn_frame.pack(fill=tk.X)
+        ttk.Button(btn_frame, text="取消", command=dialog.destroy).pack(side=tk.RIGHT)
+        ttk.Button(btn_frame, text="开始转换", command=on_start).pack(side=tk.RIGHT, padx=(0, 5))
+        
+        # 等待用户选择
+        dialog.wait_window()
+        return result['resolutions']
+    
     def check_file_overwrite(self, output_file, new_content=None):
         """检查文件是否存在，如果存在则询问用户是否覆盖
         参数：
         - output_file: 输出文件路径
-        - new_content: 新文件内容（用于对比显示）
+        - new_content: 新文件内容（用于对比显示），也可以是按需生成内容的函数
         返回值：True=允许写入, False=跳过写入
         """
         if not os.path.exists(output_file):
@@ -1477,18 +4373,10 @@ class SRTToTXTConverter:
 
     def set_selected_file(self, file_path):
         """设置选中的文件并更新视觉反馈"""
-        # 清除之前的选中状态
-        if self.selected_file and self.selected_file in self.file_items:
-            old_item = self.file_items[self.selected_file]
-            old_item['frame'].configure(relief=tk.FLAT, borderwidth=0)
-            old_item['label'].configure(bg=self.root.cget('bg'))
-        
-        # 设置新的选中状态
-        self.selected_file = file_path
-        if file_path and file_path in self.file_items:
-            new_item = self.file_items[file_path]
-            new_item['frame'].configure(relief=tk.SOLID, borderwidth=2)
-            new_item['label'].configure(bg='lightblue')
+        if file_path == self.selected_file:
+            return
+        self.selected_file = file_path if file_path in self.file_items else None
+        self.refresh_visible_rows()
     
     def clear_selected_file(self):
         """清除选中状态"""
@@ -1525,7 +4413,7 @@ class SRTToTXTConverter:
                 return
             
             # 转换为TXT内容
-            txt_content = "，".join(subtitles)
+            txt_content = "，".join(subtitles.texts)
             
             # 创建预览窗口
             preview_dialog = tk.Toplevel(self.root)
@@ -1635,7 +4523,7 @@ class SRTToTXTConverter:
                 return
             
             # 转换为TXT内容
-            txt_content = "，".join(subtitles)
+            txt_content = "，".join(subtitles.texts)
             
             # 生成默认文件名
             base_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -1784,6 +4672,10 @@ class SRTToTXTConverter:
 
     def show_file_comparison(self, file_path, parent_dialog, new_content=None):
         """显示文件对比窗口"""
+        # 新内容可能是按需生成的（例如合并输出的预览）
+        if callable(new_content):
+            new_content = new_content()
+        
         # 创建对比窗口
         compare_dialog = tk.Toplevel(parent_dialog)
         compare_dialog.title(f"文件内容对比 - {os.path.basename(file_path)}")
@@ -1823,7 +4715,8 @@ class SRTToTXTConverter:
         # 读取现有文件内容
         if os.path.exists(file_path):
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                # 压缩的输出文件（.gz / .xz）透明解压
+                with open_text_file(file_path) as f:
                     existing_content = f.read()
                     left_text.insert(tk.END, existing_content)
             except Exception as e:
@@ -1863,7 +4756,7 @@ class SRTToTXTConverter:
         def copy_existing():
             if os.path.exists(file_path):
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
+                    with open_text_file(file_path) as f:
                         content = f.read()
                     compare_dialog.clipboard_clear()
                     compare_dialog.clipboard_append(content)
@@ -1994,22 +4887,16 @@ class SRTToTXTConverter:
                                 if file.lower().endswith('.srt'):
                                     srt_files.append(os.path.join(root, file))
             
-            # 添加文件到列表
+            # 添加文件到列表（添加完成后统一排序和过滤）
             if srt_files:
-                added_count = 0
-                for srt_file in srt_files:
-                    if srt_file not in self.file_items:
-                        self.add_file_item(srt_file)
-                        added_count += 1
+                def report(added_count):
+                    # 显示导入结果
+                    if added_count > 0:
+                        messagebox.showinfo("粘贴导入成功", f"成功导入 {added_count} 个SRT文件")
+                    else:
+                        messagebox.showinfo("粘贴导入", "所有文件都已存在于列表中")
                 
-                # 显示导入结果
-                if added_count > 0:
-                    messagebox.showinfo("粘贴导入成功", f"成功导入 {added_count} 个SRT文件")
-                    # 重新应用排序和过滤
-                    self.sort_file_list()
-                    self.filter_file_list()
-                else:
-                    messagebox.showinfo("粘贴导入", "所有文件都已存在于列表中")
+                self.add_file_items(srt_files, on_done=report)
             else:
                 messagebox.showwarning("粘贴导入失败", "剪贴板中未找到有效的SRT文件路径")
                 
@@ -2045,22 +4932,16 @@ class SRTToTXTConverter:
                             if file.lower().endswith('.srt'):
                                 srt_files.append(os.path.join(root, file))
             
-            # 添加文件到列表
+            # 添加文件到列表（添加完成后统一排序和过滤）
             if srt_files:
-                added_count = 0
-                for srt_file in srt_files:
-                    if srt_file not in self.file_items:
-                        self.add_file_item(srt_file)
-                        added_count += 1
+                def report(added_count):
+                    # 显示导入结果
+                    if added_count > 0:
+                        messagebox.showinfo("拖拽导入成功", f"成功导入 {added_count} 个SRT文件")
+                    else:
+                        messagebox.showinfo("拖拽导入", "所有文件都已存在于列表中")
                 
-                # 显示导入结果
-                if added_count > 0:
-                    messagebox.showinfo("拖拽导入成功", f"成功导入 {added_count} 个SRT文件")
-                    # 重新应用排序和过滤
-                    self.sort_file_list()
-                    self.filter_file_list()
-                else:
-                    messagebox.showinfo("拖拽导入", "所有文件都已存在于列表中")
+                self.add_file_items(srt_files, on_done=report)
             else:
                 messagebox.showwarning("拖拽导入失败", "未找到有效的SRT文件")
                 
@@ -2142,7 +5023,135 @@ class SRTToTXTConverter:
         widget.bind("<Leave>", on_leave)
 
 
-def main():
+# 命令行中的输出模式名称
+CLI_MODES = {
+    'separate': MODE_SEPARATE,
+    'merge': MODE_MERGE,
+    'merge-by-folder': MODE_MERGE_BY_FOLDER,
+    'export': MODE_EXPORT,
+}
+
+
+def build_arg_parser():
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        description="SRT字幕转TXT工具（不带参数运行时启动图形界面）"
+    )
+    subparsers = parser.add_subparsers(dest='command')
+
+    convert_parser = subparsers.add_parser('convert', help="批量转换SRT文件（无需图形界面）")
+    convert_parser.add_argument('paths', nargs='+', metavar='PATH',
+                                help="SRT文件或包含SRT文件的文件夹")
+    convert_parser.add_argument('-r', '--recursive', action='store_true',
+                                help="递归搜索子文件夹中的SRT文件")
+    convert_parser.add_argument('--mode', choices=list(CLI_MODES), default='separate',
+                                help="输出模式：separate=每个SRT对应一个TXT，merge=合并为一个文件，"
+                                     "merge-by-folder=每个文件夹生成一个summary.txt，"
+                                     "export=每条字幕导出一条JSONL / SQLite记录（默认：separate）")
+    convert_parser.add_argument('-o', '--output-folder',
+                                help="把输出文件统一放到该文件夹（文件名中附带源文件夹路径）")
+    convert_parser.add_argument('--merge-output', metavar='FILE',
+                                help="merge模式下合并输出的目标文件")
+    convert_parser.add_argument('--export-output', metavar='FILE',
+                                help="export模式下的导出文件（.jsonl / .jsonl.gz / .jsonl.xz / .db / .sqlite）")
+    convert_parser.add_argument('--archive', metavar='FILE',
+                                help="separate模式下把所有TXT写入一个压缩包（.zip / .tar / .tar.gz / .tar.xz）")
+    convert_parser.add_argument('--archive-compression', choices=[ARCHIVE_STORE, ARCHIVE_DEFLATE, ARCHIVE_LZMA],
+                                help="压缩包的压缩方式（默认按扩展名：zip和.tar.gz为deflate，.tar.xz为lzma，.tar不压缩）")
+    convert_parser.add_argument('--compress', choices=[COMPRESS_GZIP, COMPRESS_XZ],
+                                help="merge / merge-by-folder模式下压缩输出（文件名加 .gz / .xz 后缀）")
+    convert_parser.add_argument('--show-merge-path', action='store_true',
+                                help="合并输出时显示被合成文件的绝对路径")
+    convert_parser.add_argument('--overwrite', choices=[OVERWRITE_ALWAYS, OVERWRITE_NEVER, OVERWRITE_RENAME],
+                                default=OVERWRITE_NEVER,
+                                help="输出文件已存在时覆盖、跳过或改用不冲突的文件名（默认：skip）")
+    convert_parser.add_argument('--fsync', choices=[FSYNC_NONE, FSYNC_PER_FILE, FSYNC_END_OF_BATCH],
+                                default=FSYNC_NONE,
+                                help="输出文件刷盘策略：不主动刷盘、每个文件写完刷盘或整批结束后刷盘（默认：none）")
+    convert_parser.add_argument('--incremental', action='store_true',
+                                help="增量转换：跳过源文件和选项都未变化的输出")
+    convert_parser.add_argument('--manifest', default=DEFAULT_MANIFEST_PATH,
+                                help=f"增量转换清单文件（默认：{DEFAULT_MANIFEST_PATH}）")
+    convert_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                                help="并行解析的工作进程数（默认：CPU核心数）")
+    return parser
+
+
+def run_cli(parser, args):
+    """执行命令行批量转换，结果摘要以JSON输出到标准输出，返回进程退出码"""
+    if args.mode == 'merge' and not args.merge_output:
+        parser.error("merge模式需要通过 --merge-output 指定输出文件")
+    if args.jobs < 1:
+        parser.error("--jobs 必须大于0")
+    if args.archive:
+        if args.mode != 'separate':
+            parser.error("--archive 只能用于separate模式")
+        try:
+            archive_format_for(args.archive, args.archive_compression)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.compress and args.mode not in ('merge', 'merge-by-folder'):
+        parser.error("--compress 只能用于merge和merge-by-folder模式")
+    if args.mode == 'export':
+        if not args.export_output:
+            parser.error("export模式需要通过 --export-output 指定导出文件")
+        try:
+            export_format_for(args.export_output)
+        except ValueError as e:
+            parser.error(str(e))
+
+    files = collect_srt_files(args.paths, recursive=args.recursive)
+    if args.output_folder:
+        os.makedirs(args.output_folder, exist_ok=True)
+
+    job = ConversionJob(
+        files,
+        mode=CLI_MODES[args.mode],
+        output_folder=args.output_folder,
+        overwrite=args.overwrite,
+        show_merge_path=args.show_merge_path,
+        merge_output_file=args.merge_output,
+        manifest=ConversionManifest(args.manifest) if args.incremental else None,
+        fsync=args.fsync,
+        archive_file=args.archive,
+        archive_compression=args.archive_compression,
+        compress=args.compress,
+        export_file=args.export_output
+    )
+    engine = ConversionEngine(jobs=args.jobs)
+
+    started = time.time()
+    result = engine.run(job)
+
+    summary = result.to_dict()
+    summary['files'] = len(files)
+    summary['jobs'] = engine.jobs
+    summary['elapsed_seconds'] = round(time.time() - started, 3)
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write('\n')
+
+    # 有失败项时返回1，便于批处理脚本判断
+    return 1 if result.failed else 0
+
+
+def main(argv=None):
+    # 打包成exe后，进程池的子进程需要这一步才能正常启动
+    multiprocessing.freeze_support()
+    
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # 带参数运行时进入命令行模式
+    if argv:
+        parser = build_arg_parser()
+        args = parser.parse_args(argv)
+        if args.command == 'convert':
+            sys.exit(run_cli(parser, args))
+    
+    if not HAS_TK:
+        print("错误：未安装tkinter，无法启动图形界面")
+        return
+    
     # 根据是否支持拖拽功能选择不同的根窗口类型
     if HAS_DND:
         root = TkinterDnD.Tk()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# 程序是单个脚本，测试直接从仓库根目录导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_srt(path, *texts):
+    """把texts逐条写成SRT文件（第i条字幕从第i秒开始），需要时创建所在文件夹，返回路径字符串"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(''.join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\n{text}\n\n"
+                            for i, text in enumerate(texts, 1)), encoding='utf-8')
+    return str(path)
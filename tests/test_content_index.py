@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import srt_to_txt_converter as converter
+from conftest import write_srt
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = converter.ContentIndex(str(tmp_path / 'index' / 'content.db'))
+    yield index
+    index.close()
+
+
+def test_search_substring_regex_and_short_queries(tmp_path, index):
+    a = write_srt(tmp_path / 'a.srt', 'Hello World', '今天天气很好')
+    b = write_srt(tmp_path / 'b.srt', 'another line', '100% sure')
+
+    assert index.update([a, b]) == 2
+    assert index.search('hello world') == {os.path.abspath(a)}
+    assert index.search('天气很') == {os.path.abspath(a)}
+    # 不足3个字符，以及LIKE的通配符按普通字符处理
+    assert index.search('天气') == {os.path.abspath(a)}
+    assert index.search('0%') == {os.path.abspath(b)}
+    assert index.search('_') == set()
+    assert index.search(r'an\w+er', regex=True) == {os.path.abspath(b)}
+    with pytest.raises(converter.re.error):
+        index.search('(', regex=True)
+
+
+def test_only_changed_files_are_reindexed(tmp_path, index):
+    a = write_srt(tmp_path / 'a.srt', 'first')
+    b = write_srt(tmp_path / 'b.srt', 'second')
+    index.update([a, b])
+
+    assert index.update([a, b]) == 0
+
+    write_srt(tmp_path / 'a.srt', 'changed text')
+    stat = os.stat(a)
+    os.utime(a, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert index.stale_files([a, b]) == [a]
+    assert index.update([a, b]) == 1
+    assert index.search('first') == set()
+    assert index.search('changed') == {os.path.abspath(a)}
+
+
+def test_index_persists_and_recovers_from_corruption(tmp_path):
+    path = str(tmp_path / 'content.db')
+    a = write_srt(tmp_path / 'a.srt', 'persisted text')
+    index = converter.ContentIndex(path)
+    index.update([a])
+    index.close()
+
+    index = converter.ContentIndex(path)
+    assert index.stale_files([a]) == []
+    assert index.search('persisted') == {os.path.abspath(a)}
+    index.close()
+
+    with open(path, 'wb') as f:
+        f.write(b'not a database' * 100)
+    index = converter.ContentIndex(path)
+    assert index.stale_files([a]) == [a]
+    index.close()
+
+
+def test_connect_failure_is_not_hidden(tmp_path, monkeypatch):
+    path = tmp_path / 'content.db'
+    path.write_bytes(b'')
+
+    def connect(*args, **kwargs):
+        raise converter.sqlite3.DatabaseError('connect failed')
+
+    # 连接失败时重新建立索引，再次失败时抛出原来的错误
+    monkeypatch.setattr(converter.sqlite3, 'connect', connect)
+    with pytest.raises(converter.sqlite3.DatabaseError, match='connect failed'):
+        converter.ContentIndex(str(path))
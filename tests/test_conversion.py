@@ -0,0 +1,173 @@
+import gzip
+import json
+import lzma
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+import srt_to_txt_converter as converter
+from conftest import write_srt
+
+
+def make_tree(root, folders=3, per_folder=8):
+    """生成 folders × per_folder 个SRT文件，数量超过PARALLEL_MIN_FILES时可以使用进程池"""
+    files = []
+    for d in range(folders):
+        for i in range(per_folder):
+            files.append(write_srt(root / f'd{d}' / f'f{i}.srt', f'text {d}-{i}', 'second'))
+    files.append(write_srt(root / 'd0' / 'empty.srt'))
+    return files
+
+
+def read_outputs(result):
+    return {os.path.basename(path): open(path, encoding='utf-8').read() for path in result.outputs}
+
+
+@pytest.mark.parametrize('mode', [converter.MODE_SEPARATE, converter.MODE_MERGE_BY_FOLDER])
+def test_pool_and_serial_runs_agree(tmp_path, mode):
+    results = []
+    for jobs in (1, 3):
+        root = tmp_path / f'jobs{jobs}'
+        files = make_tree(root)
+        job = converter.ConversionJob(files, mode=mode, overwrite=converter.OVERWRITE_ALWAYS)
+        results.append(converter.ConversionEngine(jobs=jobs).run(job))
+
+    serial, pooled = results
+    assert [os.path.relpath(p, str(tmp_path / 'jobs1')) for p in serial.outputs] == \
+        [os.path.relpath(p, str(tmp_path / 'jobs3')) for p in pooled.outputs]
+    assert sorted(read_outputs(serial).values()) == sorted(read_outputs(pooled).values())
+    assert [f['reason'] for f in serial.failed] == [f['reason'] for f in pooled.failed] == ["无字幕内容"]
+
+
+def test_separate_output_content(tmp_path):
+    source = write_srt(tmp_path / 'a.srt', '第一句', '第二句')
+    result = converter.ConversionEngine().run(converter.ConversionJob([source]))
+
+    assert result.outputs == [str(tmp_path / 'a.txt')]
+    assert (tmp_path / 'a.txt').read_text(encoding='utf-8') == '第一句，第二句，'
+
+
+def test_identical_output_is_not_rewritten(tmp_path):
+    source = write_srt(tmp_path / 'a.srt', 'same')
+    output = tmp_path / 'a.txt'
+    output.write_text('same，', encoding='utf-8')
+    os.utime(str(output), (0, 0))
+
+    # 不覆盖也不询问：内容相同的输出直接记为未变化
+    result = converter.ConversionEngine().run(converter.ConversionJob([source], overwrite=converter.OVERWRITE_NEVER))
+
+    assert result.unchanged == [str(output)]
+    assert os.stat(str(output)).st_mtime == 0
+
+
+def test_overwrite_policies(tmp_path):
+    source = write_srt(tmp_path / 'a.srt', 'new')
+    output = tmp_path / 'a.txt'
+
+    output.write_text('old', encoding='utf-8')
+    result = converter.ConversionEngine().run(converter.ConversionJob([source], overwrite=converter.OVERWRITE_NEVER))
+    assert result.skipped_outputs == [str(output)]
+    assert output.read_text(encoding='utf-8') == 'old'
+
+    result = converter.ConversionEngine().run(converter.ConversionJob([source], overwrite=converter.OVERWRITE_RENAME))
+    assert result.outputs == [str(tmp_path / 'a (1).txt')]
+
+    asked = []
+    engine = converter.ConversionEngine(confirm_overwrite=lambda path, preview: asked.append(path) or True)
+    engine.run(converter.ConversionJob([source], overwrite=converter.OVERWRITE_ASK))
+    assert asked == [str(output)]
+    assert output.read_text(encoding='utf-8') == 'new，'
+
+
+@pytest.mark.parametrize('compress, opener', [(converter.COMPRESS_GZIP, gzip.open), (converter.COMPRESS_XZ, lzma.open)])
+def test_compressed_merge_output(tmp_path, compress, opener):
+    files = [write_srt(tmp_path / 'a.srt', 'a'), write_srt(tmp_path / 'b.srt', 'b')]
+    merged = str(tmp_path / 'merged.txt')
+    job = converter.ConversionJob(files, mode=converter.MODE_MERGE, merge_output_file=merged, compress=compress)
+
+    result = converter.ConversionEngine().run(job)
+
+    assert result.outputs == [converter.compressed_path(merged, compress)]
+    with opener(result.outputs[0], 'rt', encoding='utf-8') as f:
+        assert f.read() == 'a\na，\n\nb\nb，'
+
+
+@pytest.mark.parametrize('name', ['out.zip', 'out.tar.gz'])
+def test_archive_output(tmp_path, name):
+    files = [write_srt(tmp_path / 'src' / 'x' / 'a.srt', 'a'), write_srt(tmp_path / 'src' / 'y' / 'a.srt', 'b')]
+    archive = str(tmp_path / name)
+
+    result = converter.ConversionEngine().run(converter.ConversionJob(files, archive_file=archive))
+
+    assert result.outputs == [archive]
+    if name.endswith('.zip'):
+        with zipfile.ZipFile(archive) as z:
+            contents = {member: z.read(member).decode('utf-8') for member in z.namelist()}
+    else:
+        with tarfile.open(archive) as t:
+            contents = {member.name: t.extractfile(member).read().decode('utf-8') for member in t.getmembers()}
+    assert sorted(contents.values()) == ['a，', 'b，']
+    assert len(contents) == 2
+
+
+@pytest.mark.parametrize('mode', [converter.MODE_SEPARATE, converter.MODE_MERGE_BY_FOLDER])
+def test_cancel_before_first_file(tmp_path, mode):
+    files = [write_srt(tmp_path / f'{i}.srt', str(i)) for i in range(5)]
+    engine = converter.ConversionEngine()
+
+    def on_event(event):
+        if event['type'] == 'started':
+            engine.cancel()
+
+    engine.on_event = on_event
+    result = engine.run(converter.ConversionJob(files, mode=mode))
+
+    assert result.stopped
+    assert result.converted == []
+    assert not any(name.endswith('.txt') for name in os.listdir(str(tmp_path)))
+
+
+def test_cli_summary(tmp_path, capsys):
+    files = make_tree(tmp_path / 'src', folders=1, per_folder=2)
+    with pytest.raises(SystemExit) as exit_info:
+        converter.main(['convert', str(tmp_path / 'src'), '-r', '--overwrite', 'overwrite'])
+
+    summary = json.loads(capsys.readouterr().out)
+    # 空文件记为失败，退出码为1
+    assert exit_info.value.code == 1
+    assert summary['converted'] == len(files) - 1
+    assert summary['files'] == len(files)
+
+
+@pytest.mark.parametrize('mode', [converter.MODE_SEPARATE, converter.MODE_MERGE_BY_FOLDER, converter.MODE_MERGE])
+def test_skip_policy_reports_identical_outputs_the_same_in_every_mode(tmp_path, mode):
+    files = [write_srt(tmp_path / 'a.srt', 'a')]
+
+    def run():
+        job = converter.ConversionJob(files, mode=mode, overwrite=converter.OVERWRITE_NEVER,
+                                      merge_output_file=str(tmp_path / 'merged.txt'))
+        return converter.ConversionEngine().run(job)
+
+    output = run().outputs[0]
+    result = run()
+    assert result.unchanged == [output]
+    assert result.skipped_outputs == []
+
+    write_srt(tmp_path / 'a.srt', 'changed')
+    result = run()
+    assert result.unchanged == []
+    assert result.skipped_outputs == [output]
+
+
+def test_skip_policy_reports_identical_archive(tmp_path):
+    files = [write_srt(tmp_path / 'a.srt', 'a')]
+    archive = str(tmp_path / 'out.zip')
+    converter.ConversionEngine().run(converter.ConversionJob(files, archive_file=archive))
+    # zip成员带修改时间，源文件不变时内容完全相同
+    result = converter.ConversionEngine().run(
+        converter.ConversionJob(files, archive_file=archive, overwrite=converter.OVERWRITE_NEVER))
+
+    assert result.unchanged == [archive]
+    assert result.skipped_outputs == []
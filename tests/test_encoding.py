@@ -0,0 +1,79 @@
+import pytest
+
+import srt_to_txt_converter as converter
+
+
+def srt_block(index, text):
+    return f"{index}\n00:00:01,000 --> 00:00:02,000\n{text}\n\n"
+
+
+def write_bytes(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_gbk_after_ascii_sample(tmp_path):
+    # 开头超过探测样本大小的部分全是ASCII，中文只出现在样本之后
+    ascii_part = ''.join(srt_block(i, 'hello world') for i in range(1, 4000))
+    assert len(ascii_part) > converter.ENCODING_SAMPLE_SIZE
+    data = (ascii_part + srt_block(4000, '你好世界')).encode('gbk')
+    path = write_bytes(tmp_path, 'late_gbk.srt', data)
+
+    cues = converter.CueTable.from_file(path)
+
+    assert cues.texts[-1] == '你好世界'
+    assert len(cues) == 4000
+    assert not cues.replaced
+    # 实际可用的编码被记住
+    assert converter.detected_encoding(path) == 'gbk'
+
+
+def test_utf8_file_is_decoded_strictly(tmp_path):
+    path = write_bytes(tmp_path, 'utf8.srt', (srt_block(1, '你好') + srt_block(2, 'é')).encode('utf-8'))
+
+    cues = converter.CueTable.from_file(path)
+
+    assert cues.texts == ['你好', 'é']
+    assert not cues.replaced
+
+
+def test_bom_is_honoured(tmp_path):
+    path = write_bytes(tmp_path, 'bom.srt', srt_block(1, '字幕').encode('utf-16'))
+    assert converter.CueTable.from_file(path).texts == ['字幕']
+
+
+def test_mixed_utf8_and_gbk_falls_back_to_replacement(tmp_path):
+    # UTF-8的中文出现在样本中，样本之后又出现GBK，两种编码都无法完整解码
+    filler = ''.join(srt_block(i, 'abc') for i in range(2, 4000))
+    data = (srt_block(1, '你好').encode('utf-8') + filler.encode('ascii')
+            + srt_block(4000, '世界').encode('gbk'))
+    path = write_bytes(tmp_path, 'mixed.srt', data)
+
+    cues = converter.CueTable.from_file(path)
+
+    assert cues.replaced
+    # 按最初探测到的UTF-8解码，能解码的部分保持不变
+    assert cues.texts[0] == '你好'
+    assert '�' in cues.texts[-1]
+
+
+@pytest.mark.parametrize('mode', [converter.MODE_SEPARATE, converter.MODE_MERGE_BY_FOLDER])
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_replaced_files_are_reported(tmp_path, mode, jobs):
+    # 文件数达到PARALLEL_MIN_FILES时jobs=2会使用进程池
+    good = [write_bytes(tmp_path, f'good{i}.srt', srt_block(1, 'ok').encode('utf-8'))
+            for i in range(converter.PARALLEL_MIN_FILES)]
+    filler = ''.join(srt_block(i, 'abc') for i in range(2, 4000))
+    bad = write_bytes(tmp_path, 'bad.srt', srt_block(1, '你好').encode('utf-8') + filler.encode('ascii')
+                      + srt_block(4000, '世界').encode('gbk'))
+    out = tmp_path / 'out'
+    out.mkdir()
+
+    job = converter.ConversionJob(good + [bad], mode=mode, output_folder=str(out),
+                                  overwrite=converter.OVERWRITE_ALWAYS)
+    result = converter.ConversionEngine(jobs=jobs).run(job)
+
+    assert result.decode_replaced == [bad]
+    assert result.to_dict()['decode_replaced'] == [bad]
+    assert len(result.converted) == len(good) + 1
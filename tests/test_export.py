@@ -0,0 +1,75 @@
+import json
+
+import srt_to_txt_converter as converter
+from conftest import write_srt
+
+
+class MessageRecorder:
+    """代替tkinter.messagebox，记录弹出的对话框"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def show(title, message, **kwargs):
+            self.calls.append((name, title, message))
+        return show
+
+
+def run_export(files, export_file):
+    job = converter.ConversionJob(files, mode=converter.MODE_EXPORT, overwrite=converter.OVERWRITE_ALWAYS,
+                                  export_file=export_file)
+    return converter.ConversionEngine().run(job)
+
+
+def show_export_result(monkeypatch, result):
+    recorder = MessageRecorder()
+    monkeypatch.setattr(converter, 'messagebox', recorder)
+    app = converter.SRTToTXTConverter.__new__(converter.SRTToTXTConverter)
+    app.show_export_result(result)
+    return recorder.calls
+
+
+def test_export_jsonl(tmp_path):
+    source = write_srt(tmp_path / 'a.srt', '第一句', '第二句')
+    export_file = str(tmp_path / 'cues.jsonl')
+
+    result = run_export([source], export_file)
+
+    assert not result.failed
+    assert result.exported_cues == 2
+    with open(export_file, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record['text'] for record in records] == ['第一句', '第二句']
+
+
+def test_export_write_failure_is_shown(tmp_path, monkeypatch):
+    source = write_srt(tmp_path / 'a.srt', 'hello')
+    bad = write_srt(tmp_path / 'empty.srt')
+    # 目标文件夹不存在，无法创建导出文件
+    export_file = str(tmp_path / 'missing' / 'cues.jsonl')
+
+    result = run_export([source, bad], export_file)
+    assert [f['kind'] for f in result.failed] == ['output']
+
+    calls = show_export_result(monkeypatch, result)
+
+    assert len(calls) == 1
+    kind, title, message = calls[0]
+    assert kind == 'showerror'
+    assert 'cues.jsonl' in message
+    assert '无法创建导出文件' in message
+
+
+def test_export_source_failures_are_listed(tmp_path, monkeypatch):
+    source = write_srt(tmp_path / 'a.srt', 'hello')
+    empty = write_srt(tmp_path / 'empty.srt')
+    export_file = str(tmp_path / 'cues.jsonl')
+
+    result = run_export([source, empty], export_file)
+    calls = show_export_result(monkeypatch, result)
+
+    kind, title, message = calls[0]
+    assert kind == 'showinfo'
+    assert '1 个文件的 1 条字幕记录' in message
+    assert 'empty.srt (无字幕内容)' in message
@@ -0,0 +1,338 @@
+"""文件列表（添加、搜索、排序、勾选）的测试，用简单的替身代替Tk控件，不需要图形环境"""
+import pytest
+
+import srt_to_txt_converter as converter
+from conftest import write_srt
+
+
+class FakeVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeWidget:
+    def __init__(self, *args, **kwargs):
+        self.options = dict(kwargs)
+        self.tags = ('widget',)
+
+    def configure(self, **kwargs):
+        self.options.update(kwargs)
+
+    config = configure
+
+    def grid(self, **kwargs):
+        pass
+
+    def columnconfigure(self, *args, **kwargs):
+        pass
+
+    def bind(self, sequence, func):
+        pass
+
+    def bindtags(self, tags=None):
+        if tags is None:
+            return self.tags
+        self.tags = tags
+
+
+class FakeCanvas(FakeWidget):
+    def __init__(self, height=260):
+        super().__init__()
+        self.items = {}
+        self.height = height
+
+    def create_window(self, x, y, **kwargs):
+        item = len(self.items) + 1
+        self.items[item] = dict(kwargs, coords=(x, y), state='normal')
+        return item
+
+    def coords(self, item, *coords):
+        self.items[item]['coords'] = coords
+
+    def itemconfigure(self, item, **kwargs):
+        self.items[item].update(kwargs)
+
+    def canvasy(self, y):
+        return y
+
+    def winfo_height(self):
+        return self.height
+
+    def winfo_width(self):
+        return 400
+
+
+class FakeRoot:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, func, *args):
+        self.pending.append((func, args))
+        return len(self.pending)
+
+    def after_idle(self, func, *args):
+        self.pending.append((func, args))
+
+    def after_cancel(self, after_id):
+        pass
+
+    def cget(self, option):
+        return 'white'
+
+    def run_pending(self):
+        while self.pending:
+            func, args = self.pending.pop(0)
+            func(*args)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(converter.tk, 'Label', FakeWidget)
+    monkeypatch.setattr(converter.tk, 'BooleanVar', lambda value=False: FakeVar(value))
+    monkeypatch.setattr(converter.ttk, 'Frame', FakeWidget)
+    monkeypatch.setattr(converter.ttk, 'Checkbutton', FakeWidget)
+
+    app = converter.SRTToTXTConverter.__new__(converter.SRTToTXTConverter)
+    app.root = FakeRoot()
+    app.canvas = FakeCanvas()
+    app.list_scrollbar = FakeWidget()
+    app.search_status_label = FakeWidget()
+    app.create_tooltip = lambda widget, text: None
+    for name in ('content_search_var', 'regex_var', 'show_folder_path_var', 'process_search_only_var',
+                 'sort_name_asc_var', 'sort_name_desc_var', 'sort_checked_first_var', 'sort_unchecked_first_var'):
+        setattr(app, name, FakeVar(False))
+    app.search_var = FakeVar('')
+
+    app.file_items = {}
+    app.selection = converter.EntryMask()
+    app.visible_mask = converter.EntryMask()
+    app.live_mask = converter.EntryMask()
+    app.sorted_paths = []
+    app.display_order = []
+    app.list_rows = []
+    app.list_refresh_pending = False
+    app.file_order_counter = 0
+    app.sort_spec = (None, None, 'name_key')
+    app.entry_paths = {}
+    app.name_index = converter.TrigramIndex()
+    app.path_index = converter.TrigramIndex()
+    app.search_after_id = None
+    app.last_search = None
+    app.search_error = False
+    app.selected_file = None
+    app.drag_range = (0, 0)
+    return app
+
+
+def add(app, paths):
+    added = []
+    app.add_file_items(paths, on_done=added.append)
+    app.root.run_pending()
+    return added[0]
+
+
+def shown_paths(app):
+    return [row['path'] for row in sorted(app.list_rows, key=lambda row: row['index'] or 0)
+            if row['path'] is not None]
+
+
+def test_add_file_items_skips_duplicates(app):
+    assert add(app, ['/a/x.srt', '/a/y.srt', '/a/x.srt']) == 2
+    assert add(app, ['/a/y.srt', '/a/z.srt']) == 1
+    assert app.display_order == ['/a/x.srt', '/a/y.srt', '/a/z.srt']
+
+
+def test_added_files_respect_active_search(app):
+    add(app, ['/a/lesson1.srt', '/a/intro.srt'])
+    app.search_var.set('lesson')
+    app.filter_file_list()
+
+    add(app, ['/a/lesson2.srt', '/a/outro.srt'])
+
+    assert app.display_order == ['/a/lesson1.srt', '/a/lesson2.srt']
+    assert shown_paths(app) == ['/a/lesson1.srt', '/a/lesson2.srt']
+    assert app.search_status_label.options['text'] == "找到 2/4 个文件"
+
+
+def test_large_batches_are_added_in_chunks(app):
+    paths = [f'/a/f{i:05d}.srt' for i in range(converter.FILE_ADD_CHUNK_SIZE * 2 + 5)]
+    app.add_file_items(paths)
+
+    # 第一批在第一次空闲时添加，之后每次空闲再添加一批
+    func, args = app.root.pending.pop(0)
+    func(*args)
+    assert len(app.file_items) == converter.FILE_ADD_CHUNK_SIZE
+
+    app.root.run_pending()
+    assert len(app.file_items) == len(paths)
+    # 行控件只覆盖可见区域
+    assert len(app.list_rows) < 20
+
+
+def test_regex_and_path_search(app):
+    add(app, ['/show/s01e01.srt', '/show/s01e02.srt', '/movie/s02e01.srt'])
+    app.regex_var.set(True)
+    app.search_var.set(r's01e0\d')
+    app.filter_file_list()
+    assert app.display_order == ['/show/s01e01.srt', '/show/s01e02.srt']
+
+    app.regex_var.set(False)
+    app.show_folder_path_var.set(True)
+    app.search_var.set('movie')
+    app.filter_file_list()
+    assert app.display_order == ['/movie/s02e01.srt']
+
+
+def test_regex_literals():
+    assert converter.regex_literals(r'Lesson\d+ part') == ['lesson', ' part']
+    assert converter.regex_literals(r'(abc|abd)') == []
+    assert converter.regex_literals(r'ab.cd') == []
+    assert converter.regex_literals(r'[') == []
+
+
+def test_trigram_candidates_cover_matches():
+    index = converter.TrigramIndex()
+    texts = ['intro.srt', 'lesson01.srt', 'lesson02.srt', 'outro.srt']
+    for entry_id, text in enumerate(texts):
+        index.add(entry_id, text)
+
+    assert index.candidates(['lesson']) == {1, 2}
+    assert index.candidates(['tro.s']) == {0, 3}
+    assert index.candidates(['xyz']) == set()
+    # 不足3个字符时无法缩小范围
+    assert index.candidates(['ab']) is None
+
+    index.discard(1)
+    assert index.candidates(['lesson']) == {2}
+    index.discard(2)
+    index.discard(0)
+    # 删除的条目超过剩余条目后重建，结果不变
+    assert index.candidates(['tro']) == {3}
+    assert len(index) == 1
+
+
+def test_checked_first_sort_follows_toggles(app):
+    add(app, ['/a/c.srt', '/a/a.srt', '/a/b.srt'])
+    app.sort_checked_first_var.set(True)
+    app.sort_name_asc_var.set(True)
+    app.sort_file_list()
+    assert app.display_order == ['/a/a.srt', '/a/b.srt', '/a/c.srt']
+
+    # 取消勾选a，未勾选的文件移到后面
+    entry_id = app.file_items['/a/a.srt']['order']
+    app.selection[entry_id] ^= 1
+    app.on_files_checked([entry_id])
+
+    assert app.display_order == ['/a/b.srt', '/a/c.srt', '/a/a.srt']
+
+
+def test_bulk_selection_only_touches_visible_files(app):
+    add(app, ['/a/keep1.srt', '/a/drop.srt', '/a/keep2.srt'])
+    app.search_var.set('keep')
+    app.filter_file_list()
+
+    app.deselect_all_files()
+    assert app.get_selected_files() == ['/a/drop.srt']
+
+    app.invert_selection()
+    assert app.get_selected_files() == ['/a/keep1.srt', '/a/drop.srt', '/a/keep2.srt']
+
+    app.process_search_only_var.set(True)
+    assert app.get_selected_files() == ['/a/keep1.srt', '/a/keep2.srt']
+
+
+def test_entry_mask_operations():
+    a = converter.EntryMask(b'\x01\x00\x01\x01')
+    b = converter.EntryMask(b'\x01\x01\x00\x00')
+
+    assert a.ids() == [0, 2, 3]
+    assert a.intersection(b).ids() == [0]
+    a.union_update(b)
+    assert a.ids() == [0, 1, 2, 3]
+    a.difference_update(b)
+    assert a.ids() == [2, 3]
+    a.symmetric_difference_update(b)
+    assert a.ids() == [0, 1, 2, 3]
+
+
+def test_rows_in_rect(app):
+    add(app, [f'/a/f{i}.srt' for i in range(10)])
+    height = converter.FILE_ROW_HEIGHT
+
+    assert app.rows_in_rect(10, 1, 50, height * 2 + 5) == (0, 3)
+    assert app.rows_in_rect(50, height * 2 + 5, 10, 1) == (0, 3)
+    # 只落在两行之间的间距里时不包含任何行
+    assert app.rows_in_rect(10, height - 1, 50, height + 1) == (1, 1)
+    # 左右边距之外
+    assert app.rows_in_rect(0, 0, converter.FILE_ROW_PADX, height * 5) == (0, 0)
+    # 超出列表末尾
+    assert app.rows_in_rect(10, height * 8 + 5, 50, height * 50) == (8, 10)
+
+
+def test_drag_selection_toggles_rows(app):
+    add(app, [f'/a/f{i}.srt' for i in range(5)])
+    height = converter.FILE_ROW_HEIGHT
+
+    app.apply_drag_selection(10, height + 5, 50, height * 3 - 5)
+
+    assert app.get_selected_files() == ['/a/f0.srt', '/a/f3.srt', '/a/f4.srt']
+
+
+def test_small_adds_are_inserted_without_resorting(app, monkeypatch):
+    add(app, ['/a/d.srt', '/a/b.srt', '/a/f.srt'])
+    app.sort_name_desc_var.set(True)
+    app.sort_file_list()
+    app.search_var.set('.srt')
+    app.filter_file_list()
+
+    def fail():
+        raise AssertionError("添加少量文件不应整体重新排序")
+
+    monkeypatch.setattr(app, 'sort_file_list', fail)
+    add(app, ['/a/e.srt'])
+    add(app, ['/a/a.srt', '/a/c.srt', '/a/g.txt'])
+
+    assert app.sorted_paths == ['/a/g.txt', '/a/f.srt', '/a/e.srt', '/a/d.srt', '/a/c.srt', '/a/b.srt', '/a/a.srt']
+    assert app.display_order == ['/a/f.srt', '/a/e.srt', '/a/d.srt', '/a/c.srt', '/a/b.srt', '/a/a.srt']
+
+
+def test_large_imports_are_sorted_once(app, monkeypatch):
+    app.sort_name_asc_var.set(True)
+    app.sort_file_list()
+    sort_file_list = app.sort_file_list
+    calls = []
+    monkeypatch.setattr(app, 'sort_file_list', lambda: calls.append(1) or sort_file_list())
+
+    paths = [f'/a/f{i:04d}.srt' for i in range(converter.SORT_INCREMENTAL_LIMIT + 1)]
+    add(app, reversed(paths))
+
+    assert calls == [1]
+    assert app.display_order == paths
+
+
+def test_content_search_uses_stored_absolute_paths(app, tmp_path, monkeypatch):
+    files = [write_srt(tmp_path / 'a.srt', 'hello world'), write_srt(tmp_path / 'b.srt', 'goodbye')]
+    app.content_index = converter.ContentIndex(str(tmp_path / 'content.db'))
+    app.content_index.update(files)
+    scheduled = []
+    monkeypatch.setattr(app, 'schedule_content_index', lambda delay=500: scheduled.append(delay))
+    app.content_search_var.set(True)
+
+    add(app, files)
+    assert len(scheduled) == 1
+
+    # 输入搜索内容时不再检查文件变化，也不再逐个计算绝对路径
+    app.search_var.set('hello')
+    app.on_search_changed()
+    assert len(scheduled) == 1
+    monkeypatch.setattr(converter.os.path, 'abspath', lambda path: pytest.fail("不应在搜索时计算绝对路径"))
+    app.filter_file_list()
+
+    assert app.display_order == [files[0]]
+    app.content_index.close()
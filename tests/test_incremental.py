@@ -0,0 +1,198 @@
+import json
+import os
+
+import pytest
+
+import srt_to_txt_converter as converter
+from conftest import write_srt
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def make_job(files, manifest_path):
+    # 输出到源文件所在目录：a.srt -> a.txt
+    return converter.ConversionJob(files, mode=converter.MODE_SEPARATE, overwrite=converter.OVERWRITE_ASK,
+                                   manifest=converter.ConversionManifest(str(manifest_path)))
+
+
+def resolve(job, chosen=None):
+    """按GUI的流程规划冲突，chosen模拟冲突表中的选择，返回冲突表中列出的输出文件"""
+    shown = []
+
+    def show_conflict_table(conflicts, preview_output):
+        shown.extend(output_file for output_file, _ in conflicts)
+        return dict(chosen or {}, **{output_file: converter.OVERWRITE_NEVER
+                                     for output_file, _ in conflicts if output_file not in (chosen or {})})
+
+    app = converter.SRTToTXTConverter.__new__(converter.SRTToTXTConverter)
+    app.show_conflict_table = show_conflict_table
+    assert app.resolve_output_conflicts(job)
+    return shown
+
+
+def test_incremental_run_does_not_ask_about_own_outputs(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    manifest_path = tmp_path / 'manifest.json'
+    a = write_srt(src / 'a.srt', 'old a')
+    b = write_srt(src / 'b.srt', 'b')
+
+    first = converter.ConversionEngine().run(make_job([a, b], manifest_path))
+    assert len(first.converted) == 2
+
+    # 修改a，b不变
+    write_srt(src / 'a.srt', 'new a')
+    bump_mtime(a)
+    job = make_job([a, b], manifest_path)
+    assert resolve(job) == []
+
+    result = converter.ConversionEngine().run(job)
+
+    assert result.converted == [a]
+    assert result.unchanged == [str(src / 'b.txt')]
+    assert not result.failed
+    assert (src / 'a.txt').read_text(encoding='utf-8') == 'new a，'
+
+
+def test_incremental_run_still_asks_about_foreign_outputs(tmp_path):
+    src = tmp_path / 'src'
+    src.mkdir()
+    manifest_path = tmp_path / 'manifest.json'
+    a = write_srt(src / 'a.srt', 'a')
+    b = write_srt(src / 'b.srt', 'b')
+    converter.ConversionEngine().run(make_job([a], manifest_path))
+
+    # b.txt不是由转换生成的；a.txt生成后被手动修改过
+    (src / 'b.txt').write_text('manual', encoding='utf-8')
+    (src / 'a.txt').write_text('edited', encoding='utf-8')
+    write_srt(src / 'a.srt', 'a2')
+    bump_mtime(a)
+
+    job = make_job([a, b], manifest_path)
+    assert sorted(resolve(job)) == [str(src / 'a.txt'), str(src / 'b.txt')]
+
+    result = converter.ConversionEngine().run(job)
+
+    # 冲突表默认跳过，两个文件都保持不变
+    assert sorted(result.skipped_outputs) == [str(src / 'a.txt'), str(src / 'b.txt')]
+    assert (src / 'a.txt').read_text(encoding='utf-8') == 'edited'
+    assert (src / 'b.txt').read_text(encoding='utf-8') == 'manual'
+
+
+@pytest.mark.parametrize('overwrite', [converter.OVERWRITE_ASK, converter.OVERWRITE_NEVER])
+def test_engine_rewrites_own_outputs_without_resolutions(tmp_path, overwrite):
+    manifest_path = tmp_path / 'manifest.json'
+    a = write_srt(tmp_path / 'a.srt', 'old a')
+    converter.ConversionEngine().run(make_job([a], manifest_path))
+    write_srt(tmp_path / 'a.srt', 'new a')
+    bump_mtime(a)
+
+    # 不经过GUI的冲突规划直接调用引擎，也不会询问由之前的转换生成的输出
+    asked = []
+    engine = converter.ConversionEngine(confirm_overwrite=lambda path, preview: asked.append(path) or False)
+    job = make_job([a], manifest_path)
+    job.overwrite = overwrite
+    result = engine.run(job)
+
+    assert asked == []
+    assert result.converted == [a]
+    assert (tmp_path / 'a.txt').read_text(encoding='utf-8') == 'new a，'
+
+
+def test_gui_planning_leaves_own_outputs_to_the_engine(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    a = write_srt(tmp_path / 'a.srt', 'a')
+    converter.ConversionEngine().run(make_job([a], manifest_path))
+    write_srt(tmp_path / 'a.srt', 'a2')
+    bump_mtime(a)
+
+    job = make_job([a], manifest_path)
+    assert resolve(job) == []
+    assert job.resolutions == {}
+
+
+def test_conflicts_without_manifest(tmp_path):
+    a = write_srt(tmp_path / 'a.srt', 'a')
+    (tmp_path / 'a.txt').write_text('existing', encoding='utf-8')
+    job = converter.ConversionJob([a], mode=converter.MODE_SEPARATE)
+
+    conflicts, rewrites = converter.ConversionEngine().classify_existing_outputs(job)
+
+    assert conflicts == [(str(tmp_path / 'a.txt'), [a])]
+    assert rewrites == []
+
+
+def test_manifest_skips_unchanged_sources(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    a = write_srt(tmp_path / 'a.srt', 'a')
+    converter.ConversionEngine().run(make_job([a], manifest_path))
+    assert manifest_path.exists()
+
+    # 只是修改时间变了，内容相同：按哈希判断为未变化
+    bump_mtime(a)
+    result = converter.ConversionEngine().run(make_job([a], manifest_path))
+    assert result.unchanged == [str(tmp_path / 'a.txt')]
+    assert not result.converted
+
+    # 输出被删除后重新生成
+    os.remove(str(tmp_path / 'a.txt'))
+    result = converter.ConversionEngine().run(make_job([a], manifest_path))
+    assert result.converted == [a]
+
+
+def test_manifest_tracks_options(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    folder = tmp_path / 'd'
+    folder.mkdir()
+    files = [write_srt(folder / 'a.srt', 'a'), write_srt(folder / 'b.srt', 'b')]
+
+    def run(show_merge_path):
+        job = converter.ConversionJob(files, mode=converter.MODE_MERGE_BY_FOLDER, show_merge_path=show_merge_path,
+                                      overwrite=converter.OVERWRITE_ALWAYS,
+                                      manifest=converter.ConversionManifest(str(manifest_path)))
+        return converter.ConversionEngine().run(job)
+
+    assert run(False).outputs == [str(folder / 'summary.txt')]
+    assert run(False).unchanged == [str(folder / 'summary.txt')]
+    # 影响输出内容的选项变化后重新生成
+    assert run(True).outputs == [str(folder / 'summary.txt')]
+
+
+def test_corrupt_manifest_starts_empty(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    manifest_path.write_text('{not json', encoding='utf-8')
+
+    assert converter.ConversionManifest(str(manifest_path)).entries == {}
+
+
+@pytest.mark.parametrize('mode', ['separate', 'merge-by-folder'])
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_cli_incremental_run_refreshes_changed_outputs(tmp_path, capsys, mode, jobs):
+    data = tmp_path / 'data'
+    data.mkdir()
+    files = [write_srt(data / f'f{i:02d}.srt', f'text {i}') for i in range(4)]
+    output = data / ('f03.txt' if mode == 'separate' else 'summary.txt')
+    args = ['convert', str(data), '-r', '--incremental', '--manifest', str(tmp_path / 'manifest.json'),
+            '--mode', mode, '--jobs', jobs]
+
+    def run():
+        with pytest.raises(SystemExit) as exit_info:
+            converter.main(args)
+        assert exit_info.value.code == 0
+        return json.loads(capsys.readouterr().out)
+
+    run()
+    before = output.read_text(encoding='utf-8')
+
+    write_srt(data / 'f03.srt', 'edited')
+    bump_mtime(files[3])
+    # 默认的 --overwrite skip 只针对不是由转换生成的文件
+    summary = run()
+
+    assert summary['skipped_outputs'] == []
+    assert summary['converted'] == (1 if mode == 'separate' else 4)
+    assert output.read_text(encoding='utf-8') != before
+    assert 'edited' in output.read_text(encoding='utf-8')
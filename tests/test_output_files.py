@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+import srt_to_txt_converter as converter
+from conftest import write_srt
+
+
+def leftover_temp_files(folder):
+    return [name for name in os.listdir(folder) if name.endswith('.tmp')]
+
+
+def test_write_text_file_keeps_unrelated_tmp_file(tmp_path):
+    output_file = tmp_path / 'out.txt'
+    # 用户自己的文件恰好叫 out.txt.tmp
+    user_file = tmp_path / 'out.txt.tmp'
+    user_file.write_text('keep me', encoding='utf-8')
+
+    converter.write_text_file(str(output_file), 'content')
+
+    assert output_file.read_text(encoding='utf-8') == 'content'
+    assert user_file.read_text(encoding='utf-8') == 'keep me'
+    assert leftover_temp_files(tmp_path) == ['out.txt.tmp']
+
+
+def test_temp_files_are_unique(tmp_path):
+    output_file = str(tmp_path / 'out.txt')
+    first = converter.create_temp_file(output_file)
+    second = converter.create_temp_file(output_file)
+
+    assert first != second
+    assert os.path.dirname(first) == str(tmp_path)
+    assert os.path.basename(first).startswith('.out.txt.')
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_sources_with_same_output_do_not_collide(tmp_path, jobs):
+    # 文件数达到PARALLEL_MIN_FILES时jobs=2会使用进程池
+    files = [write_srt(tmp_path / f'f{i}.srt', f'f{i}') for i in range(converter.PARALLEL_MIN_FILES)]
+    upper = write_srt(tmp_path / 'a.SRT', 'upper')
+    lower = write_srt(tmp_path / 'a.srt', 'lower')
+    job = converter.ConversionJob(files + [upper, lower], mode=converter.MODE_SEPARATE,
+                                  overwrite=converter.OVERWRITE_ALWAYS)
+
+    result = converter.ConversionEngine(jobs=jobs).run(job)
+
+    assert not result.failed
+    assert (tmp_path / 'a.txt').read_text(encoding='utf-8') == 'upper，'
+    assert (tmp_path / 'a (1).txt').read_text(encoding='utf-8') == 'lower，'
+    assert leftover_temp_files(tmp_path) == []
+
+
+@pytest.mark.parametrize('mode, target', [
+    (converter.MODE_EXPORT, 'cues.db'),
+    (converter.MODE_EXPORT, 'cues.jsonl.gz'),
+    (converter.MODE_SEPARATE, 'texts.zip'),
+])
+def test_single_target_outputs_leave_no_temp_files(tmp_path, mode, target):
+    source = write_srt(tmp_path / 'a.srt', 'hello')
+    target_path = str(tmp_path / target)
+    if mode == converter.MODE_EXPORT:
+        job = converter.ConversionJob([source], mode=mode, export_file=target_path)
+    else:
+        job = converter.ConversionJob([source], mode=mode, archive_file=target_path)
+
+    result = converter.ConversionEngine().run(job)
+
+    assert result.outputs == [target_path]
+    assert leftover_temp_files(tmp_path) == []
+
+
+def test_merge_and_manifest_leave_no_temp_files(tmp_path):
+    source = write_srt(tmp_path / 'a.srt', 'hello')
+    merged = tmp_path / 'merged.txt'
+    merge_job = converter.ConversionJob([source], mode=converter.MODE_MERGE, merge_output_file=str(merged))
+    manifest_path = tmp_path / 'manifest.json'
+    separate_job = converter.ConversionJob([source], mode=converter.MODE_SEPARATE,
+                                           manifest=converter.ConversionManifest(str(manifest_path)))
+
+    converter.ConversionEngine().run(merge_job)
+    converter.ConversionEngine().run(separate_job)
+
+    assert merged.read_text(encoding='utf-8').startswith('a\nhello')
+    assert manifest_path.exists()
+    assert leftover_temp_files(tmp_path) == []
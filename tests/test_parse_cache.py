@@ -0,0 +1,48 @@
+import os
+
+import srt_to_txt_converter as converter
+from conftest import write_srt
+
+
+def test_cache_hits_until_file_changes(tmp_path):
+    cache = converter.ParseCache(1024 * 1024)
+    path = write_srt(tmp_path / 'a.srt', 'one')
+
+    first = cache.get(path)
+    assert cache.get(path) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    write_srt(tmp_path / 'a.srt', 'two', 'three')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert cache.get(path).texts == ['two', 'three']
+    assert cache.misses == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    paths = [write_srt(tmp_path / f'{i}.srt', 'x' * 200) for i in range(3)]
+    size = converter.CueTable.from_file(paths[0]).memory_size()
+    cache = converter.ParseCache(size * 2)
+
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])  # 0最近使用过，淘汰1
+    cache.get(paths[2])
+
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['bytes'] <= size * 2
+    hits = cache.hits
+    cache.get(paths[0])
+    assert cache.hits == hits + 1
+    cache.get(paths[1])
+    assert cache.hits == hits + 1
+
+
+def test_oversized_tables_are_not_cached(tmp_path):
+    path = write_srt(tmp_path / 'big.srt', *['text'] * 100)
+    cache = converter.ParseCache(converter.CueTable.from_file(path).memory_size())
+
+    cache.get(path)
+
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,92 @@
+import io
+import pickle
+import random
+import re
+
+import pytest
+
+import srt_to_txt_converter as converter
+
+
+def reference_texts(content):
+    """原先parse_srt_file的解析规则：读入整个文件后按空行切分"""
+    subtitles = []
+    for block in re.split(r'\n\s*\n', content.strip()):
+        lines = block.strip().split('\n')
+        if len(lines) >= 3:
+            subtitle_text = '\n'.join(lines[2:]).strip()
+            if subtitle_text:
+                subtitles.append(subtitle_text)
+    return subtitles
+
+
+def streamed_texts(content):
+    # newline=None与open()的文本模式一样把\r\n转换为\n
+    return [cue.text for cue in converter.iter_srt_cues(io.StringIO(content, newline=None))]
+
+
+SAMPLES = [
+    "1\n00:00:01,000 --> 00:00:02,000\nhello\n\n2\n00:00:03,000 --> 00:00:04,000\nworld\n",
+    # 没有以空行结尾、多行字幕、行尾空格
+    "1\n00:00:01,000 --> 00:00:02,000\nline one  \nline two\n\n2\n00:00:03,000 --> 00:00:04,000\nlast",
+    # Windows换行符
+    "1\r\n00:00:01,000 --> 00:00:02,000\r\nhello\r\n\r\n2\r\n00:00:03,000 --> 00:00:04,000\r\nworld\r\n",
+    # 多个空行、只含空白字符的分隔行、开头的空行
+    "\n\n1\n00:00:01,000 --> 00:00:02,000\na\n\n\n   \n2\n00:00:03,000 --> 00:00:04,000\nb\n \t \n",
+    # 不足3行的块、没有字幕文本的块
+    "1\n00:00:01,000 --> 00:00:02,000\n\n2\n00:00:03,000 --> 00:00:04,000\n   \nx\n\n3\n00:00:05,000 --> 00:00:06,000\nc\n",
+    "",
+    "\n \n",
+]
+
+
+@pytest.mark.parametrize('content', SAMPLES)
+def test_streaming_parser_matches_whole_file_parser(content):
+    assert streamed_texts(content) == reference_texts(content)
+
+
+def test_streaming_parser_matches_on_random_input():
+    rng = random.Random(1)
+    pieces = ['1', '00:00:01,000 --> 00:00:02,000', 'text', '  indented', 'tail  ', '', ' ', '\t', '你好']
+    for _ in range(500):
+        content = '\n'.join(rng.choice(pieces) for _ in range(rng.randint(0, 30)))
+        assert streamed_texts(content) == reference_texts(content), repr(content)
+
+
+def test_cue_fields():
+    content = "\ufeff7\n01:02:03,450 --> 01:02:04.5\nhello\n\nx\nno timestamp\ntext\n"
+    cues = list(converter.iter_srt_cues(io.StringIO(content)))
+
+    assert cues[0] == converter.Cue(7, 3723450, 3724500, 'hello')
+    assert cues[1] == converter.Cue(-1, -1, -1, 'text')
+
+
+def test_parse_file_matches_reference(tmp_path):
+    content = SAMPLES[1] + "\n\n3\n00:00:05,000 --> 00:00:06,000\n中文字幕\n"
+    path = tmp_path / 'a.srt'
+    path.write_text(content, encoding='utf-8')
+
+    assert converter.CueTable.from_file(str(path)).texts == reference_texts(content)
+
+
+def test_cue_table_columns():
+    table = converter.CueTable([converter.Cue(1, 0, 500, 'a'), converter.Cue(2, 600, 900, 'b')])
+    other = converter.CueTable([converter.Cue(3, 1000, 1500, 'c')])
+    table.extend(other)
+
+    assert len(table) == 3
+    assert table[2] == converter.Cue(3, 1000, 1500, 'c')
+    assert list(table.starts) == [0, 600, 1000]
+    assert table.to_txt() == 'a，b，c，'
+    assert table.to_txt(separator=' ') == 'a b c '
+
+
+def test_cue_table_survives_pickling():
+    # 进程池把解析结果以pickle形式传回主进程
+    table = converter.CueTable([converter.Cue(1, 0, 500, 'a')])
+    table.replaced = True
+
+    copy = pickle.loads(pickle.dumps(table))
+
+    assert list(copy) == list(table)
+    assert copy.replaced